@@ -28,7 +28,7 @@ export default function AdminOrders() {
   const fetchOrders = async (page = 1) => {
     try {
       setLoading(true);
-      const params = { page, limit: 10 };
+      const params = { page, limit: 10, view: "grid" };
       if (status !== "All") params.status = status;
       if (search) params.search = search;
 
@@ -199,10 +199,10 @@ export default function AdminOrders() {
                       <td className="py-4 px-6">
                         <div>
                           <p className="font-semibold text-gray-800">
-                            {order.user?.name || "N/A"}
+                            {order.customerName || "N/A"}
                           </p>
                           <p className="text-sm text-gray-500">
-                            {order.user?.email || "N/A"}
+                            {order.customerEmail || "N/A"}
                           </p>
                         </div>
                       </td>
@@ -211,7 +211,7 @@ export default function AdminOrders() {
                       </td>
                       <td className="py-4 px-6">
                         <span className="bg-gray-100 px-3 py-1 rounded-full text-sm font-semibold">
-                          {order.items.length}
+                          {order.itemCount}
                         </span>
                       </td>
                       <td className="py-4 px-6">
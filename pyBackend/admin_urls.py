@@ -1,6 +1,7 @@
 from django.urls import path
 from users.views import admin_login
 from products.views import get_all_products_admin, admin_product_detail, create_product, bulk_import_products
+from ecommerce_api.views import get_metrics
 from orders.views import get_all_orders, get_admin_order_by_id, update_order_status, add_admin_note, get_dashboard_stats, export_orders_csv
 
 urlpatterns = [
@@ -27,4 +28,8 @@ urlpatterns = [
     path('orders/export/', export_orders_csv, name='export_orders_csv'),
     path('orders/dashboard/stats/', get_dashboard_stats, name='dashboard_stats'),
     path('orders/dashboard/stats', get_dashboard_stats, name='dashboard_stats_no_slash'),
+    
+    # Metrics
+    path('metrics/', get_metrics, name='admin_metrics'),
+    path('metrics', get_metrics, name='admin_metrics_no_slash'),
 ]
@@ -0,0 +1,111 @@
+"""
+Admin order grid queries before and after denormalizing the customer
+columns onto orders.
+
+Seeds --orders orders with `seed_bench`, then times each grid query the
+way get_all_orders ran it before (joined to users for the email, items
+prefetched to count them) and the way it runs now with ?view=grid (the
+orders table alone, customer_email / customer_name / item_count), and
+prints the EXPLAIN QUERY PLAN of both:
+
+  - page: newest --limit orders and the total count
+  - status: the same filtered by status
+  - search: substring search on order id or customer email
+  - email: every order of one customer, by exact email
+
+    python benchmarks/admin_order_grid.py --orders 200k
+    python benchmarks/admin_order_grid.py --orders 5M --users 500k --repeat 3
+
+A substring search cannot use the customer_email index (LIKE '%x%'
+scans either way); it gains by not joining users for every row. The
+index serves the exact email lookup.
+"""
+import argparse
+import io
+import statistics
+import time
+
+from common import benchmark_database
+
+
+def grid_before(queryset, limit):
+    from django.db.models import Prefetch
+    from orders.models import OrderItem
+
+    page = list(
+        queryset.select_related('user')
+        .prefetch_related(Prefetch('items', queryset=OrderItem.objects.only('id', 'order_id')))
+        .order_by('-created_at', '-id')[:limit]
+    )
+    rows = [(order.order_id, order.user.email, order.user.name, len(order.items.all())) for order in page]
+    return queryset.count(), rows
+
+
+def grid_after(queryset, limit):
+    page = (
+        queryset.order_by('-created_at', '-id')
+        .values_list('order_id', 'customer_email', 'customer_name', 'item_count')[:limit]
+    )
+    return queryset.count(), list(page)
+
+
+def plans(queryset):
+    from django.db import connection
+
+    sql, params = queryset.order_by('-created_at', '-id').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', default='200k', help='e.g. 200k or 5M')
+    parser.add_argument('--users', default='20k')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--search', default='user-12', help='substring searched for in order id or email')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from django.core.management import call_command
+        from django.db.models import Q
+        from orders.models import Order
+
+        call_command('seed_bench', '--orders', args.orders, '--users', args.users, '--products', '2k', stdout=io.StringIO())
+        email = Order.objects.order_by('pk').values_list('customer_email', flat=True).first()
+        total = Order.objects.count()
+
+        scenarios = [
+            ('page', Q(), Q()),
+            ('status', Q(status='Shipped'), Q(status='Shipped')),
+            ('search',
+             Q(order_id__icontains=args.search) | Q(user__email__icontains=args.search),
+             Q(order_id__icontains=args.search) | Q(customer_email__icontains=args.search)),
+            ('email', Q(user__email=email), Q(customer_email=email)),
+        ]
+        print(f'{total:,} orders, page of {args.limit}, median of {args.repeat}')
+        for label, before_filter, after_filter in scenarios:
+            before = Order.objects.filter(before_filter)
+            after = Order.objects.filter(after_filter)
+            before_ms, (before_count, before_rows) = timed(lambda: grid_before(before, args.limit), args.repeat)
+            after_ms, (after_count, after_rows) = timed(lambda: grid_after(after, args.limit), args.repeat)
+            assert before_count == after_count and before_rows == after_rows, f'{label}: results differ'
+            print(f'\n{label:<7} {before_count:>10,} rows   before {before_ms:9.1f}ms   after {after_ms:9.1f}ms'
+                  f'   {before_ms / after_ms:5.1f}x')
+            for plan_label, queryset in [('before', before.select_related('user')), ('after', after)]:
+                for line in plans(queryset):
+                    print(f'        {plan_label:<6}  {line}')
+
+
+if __name__ == '__main__':
+    main()
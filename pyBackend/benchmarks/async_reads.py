@@ -0,0 +1,212 @@
+"""
+Load test: async read views under uvicorn vs sync views under gunicorn.
+
+Seeds a throwaway database, then serves it twice - with the async views
+(ASYNC_VIEWS) under uvicorn and with the regular DRF views under gunicorn
+(gthread workers) - and drives the same mix of catalog and order-history
+requests at each with --concurrency clients. Every query sleeps --db-delay
+milliseconds first to stand in for a remote database; the response cache
+is disabled so every request reaches it.
+
+    pip install uvicorn gunicorn
+    python benchmarks/async_reads.py --concurrency 200 --db-delay 20
+"""
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from common import configure_database
+
+
+ASYNC_VIEWS = 'get_products,get_product_by_id,get_user_orders,get_order_by_id'
+
+
+def _setup_server_django():
+    """Configure Django inside a server worker: bench database plus slow queries"""
+    import django
+    from django.db.backends.signals import connection_created
+
+    configure_database(os.environ['BENCH_DB'])
+    django.setup()
+    delay = float(os.environ.get('BENCH_DB_DELAY', '0')) / 1000
+
+    def slow_query(execute, sql, params, many, context):
+        time.sleep(delay)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(slow_query)
+
+    if delay:
+        connection_created.connect(install, weak=False)
+
+
+def build_asgi():
+    """uvicorn --factory entry point"""
+    _setup_server_django()
+    from django.core.asgi import get_asgi_application
+    return get_asgi_application()
+
+
+def build_wsgi():
+    """gunicorn 'async_reads:build_wsgi()' entry point"""
+    _setup_server_django()
+    from django.core.wsgi import get_wsgi_application
+    return get_wsgi_application()
+
+
+def seed(path, products, orders):
+    import django
+    from django.core.management import call_command
+
+    configure_database(path)
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from orders.models import Order, OrderItem
+    from products.models import Product
+    from users.models import User
+
+    user = User.objects.create_user(email='bench@example.com', name='Bench', password='bench-password')
+    catalog = Product.objects.bulk_create([
+        Product(name=f'Product {i}', slug=f'product-{i}', description='Benchmark', price=10, category='Bench', stock=10)
+        for i in range(products)
+    ])
+    address = {'fullName': 'Bench', 'address': '1 Main St', 'city': 'X', 'zipCode': '1', 'country': 'X', 'phone': '1'}
+    created = Order.objects.bulk_create([
+        Order(
+            user=user, customer_email=user.email, customer_name=user.name, item_count=3,
+            order_id=f'ORD-BENCH-{i}', total_amount=30, shipping_address=address,
+        )
+        for i in range(orders)
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, product_name=product.name, quantity=1, price=product.price)
+        for order in created
+        for product in catalog[:3]
+    ])
+    token = str(RefreshToken.for_user(user).access_token)
+    return token, [product.pk for product in catalog], [order.pk for order in created]
+
+
+def request(url, token):
+    req = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            response.read()
+            code = response.status
+    except urllib.error.HTTPError as e:
+        code = e.code
+    except OSError:
+        code = 0
+    return code, time.perf_counter() - started
+
+
+def workload(base, total, product_ids, order_ids):
+    rng = random.Random(7)
+    urls = []
+    for _ in range(total):
+        kind = rng.random()
+        if kind < 0.4:
+            urls.append(f'{base}/api/products/?page={rng.randint(1, 20)}&limit=10')
+        elif kind < 0.7:
+            urls.append(f'{base}/api/products/{rng.choice(product_ids)}/')
+        elif kind < 0.85:
+            urls.append(f'{base}/api/orders/user/?summary=true')
+        else:
+            urls.append(f'{base}/api/orders/{rng.choice(order_ids)}/')
+    return urls
+
+
+def wait_for(base, token, server):
+    for _ in range(300):
+        if server.poll() is not None:
+            raise SystemExit('server exited during startup')
+        if request(f'{base}/api/products/?limit=1', token)[0] == 200:
+            return
+        time.sleep(0.1)
+    raise SystemExit('server did not start')
+
+
+def run(label, command, env, args, token, product_ids, order_ids):
+    server = subprocess.Popen(
+        command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f'http://127.0.0.1:{args.port}'
+        wait_for(base, token, server)
+        urls = workload(base, args.requests, product_ids, order_ids)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda url: request(url, token), urls))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    codes = [code for code, _ in results]
+    latencies = sorted(latency for _, latency in results)
+    print(
+        f'{label:<22} {len(results) / elapsed:8.1f} req/s  '
+        f'p50={latencies[len(latencies) // 2] * 1000:7.1f}ms  '
+        f'p99={latencies[int(len(latencies) * 0.99)] * 1000:7.1f}ms  '
+        f'mean={statistics.mean(latencies) * 1000:7.1f}ms  '
+        + ' '.join(f'{code}={codes.count(code)}' for code in sorted(set(codes)))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--db-delay', type=float, default=20, help='milliseconds added to every query')
+    parser.add_argument('--workers', type=int, default=2, help='server processes for both servers')
+    parser.add_argument('--threads', type=int, default=16, help='threads per gunicorn worker')
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--orders', type=int, default=50)
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.sqlite3')
+        token, product_ids, order_ids = seed(path, args.products, args.orders)
+        env = dict(
+            os.environ,
+            BENCH_DB=path,
+            BENCH_DB_DELAY=str(args.db_delay),
+            DEBUG='False',
+            PRODUCT_CACHE_MAX_ENTRIES='0',
+            PRODUCT_DETAIL_CACHE_TIMEOUT='0',
+        )
+        print(
+            f'{args.requests} requests, {args.concurrency} clients, '
+            f'{args.db_delay:g}ms per query, {args.workers} workers'
+        )
+        run(
+            'uvicorn (async views)',
+            [sys.executable, '-m', 'uvicorn', '--factory', 'async_reads:build_asgi',
+             '--port', str(args.port), '--workers', str(args.workers), '--log-level', 'warning'],
+            dict(env, ASYNC_VIEWS=ASYNC_VIEWS), args, token, product_ids, order_ids,
+        )
+        run(
+            'gunicorn (sync views)',
+            [sys.executable, '-m', 'gunicorn', 'async_reads:build_wsgi()',
+             '--bind', f'127.0.0.1:{args.port}', '--workers', str(args.workers),
+             '--threads', str(args.threads), '--worker-class', 'gthread'],
+            dict(env, ASYNC_VIEWS=''), args, token, product_ids, order_ids,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark JWT user resolution modes on an authenticated endpoint.
+
+Drives an authenticated route (order history by default) with a real Bearer token and reports
+requests/sec and queries/request for:
+  db     - load the user row on every request (plain simplejwt behaviour)
+  cache  - per-process user cache (JWT_USER_RESOLUTION['USER_CACHE_TTL'])
+  claims - user built from token claims (JWT_USER_RESOLUTION['USER_FROM_CLAIMS'])
+
+Usage:
+    python benchmarks/auth.py --requests 2000
+"""
+import argparse
+import time
+
+from common import benchmark_database
+
+
+MODES = {
+    'db': {'USER_FROM_CLAIMS': False, 'USER_CACHE_TTL': 0},
+    'cache': {'USER_FROM_CLAIMS': False, 'USER_CACHE_TTL': 60},
+    'claims': {'USER_FROM_CLAIMS': True, 'USER_CACHE_TTL': 0},
+}
+
+
+def count_queries(connection, fn):
+    # request_started resets connection.queries, so count with a wrapper
+    queries = []
+
+    def wrapper(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        fn()
+    return len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--url', default='/api/orders/user/')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from django.conf import settings
+        from django.db import connection
+        from django.test.utils import override_settings
+        from rest_framework.test import APIClient
+        from users.authentication import UserClaimsRefreshToken
+        from users.models import User
+
+        admin = User.objects.create_user(email='admin@example.com', name='Admin', password='admin', role='admin')
+        token = str(UserClaimsRefreshToken.for_user(admin).access_token)
+        client = APIClient(HTTP_HOST='localhost')
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        for mode, options in MODES.items():
+            with override_settings(JWT_USER_RESOLUTION={**settings.JWT_USER_RESOLUTION, **options}, ALLOWED_HOSTS=['*']):
+                client.get(args.url)  # warm up
+                queries = count_queries(connection, lambda: client.get(args.url))
+                started = time.perf_counter()
+                for _ in range(args.requests):
+                    response = client.get(args.url)
+                elapsed = time.perf_counter() - started
+                assert response.status_code == 200, response.status_code
+            print(f'{mode:<7} {args.requests / elapsed:>8.0f} req/s   {queries} queries/request')
+
+
+if __name__ == '__main__':
+    main()
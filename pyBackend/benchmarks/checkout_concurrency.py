@@ -0,0 +1,83 @@
+"""
+Concurrency benchmark for orders.checkout.place_order.
+
+Fires parallel checkouts at a single hot SKU against a throwaway SQLite
+database, then checks that stock never went negative and that the stock
+sold matches the orders created.
+
+Usage:
+    python benchmarks/checkout_concurrency.py --checkouts 500 --workers 32 --stock 200
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import benchmark_database
+
+
+def run(checkouts, workers, stock, quantity):
+    from django.db import connection
+    from django.db.models import Sum
+    from orders.checkout import place_order, InsufficientStock
+    from orders.models import Order, OrderItem
+    from products.models import Product
+    from users.models import User
+
+    user = User.objects.create_user(email='bench@example.com', name='Bench', password='bench')
+    product = Product.objects.create(
+        name='Hot SKU', description='Benchmark product', price=10, category='Bench', stock=stock
+    )
+    address = {'fullName': 'Bench', 'address': '1 Main St', 'city': 'X', 'zipCode': '1', 'country': 'X', 'phone': '1'}
+
+    def checkout(_):
+        try:
+            place_order(user, [{'product': product.pk, 'quantity': quantity}], address)
+            return True
+        except InsufficientStock:
+            return False
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(checkout, range(checkouts)))
+    elapsed = time.perf_counter() - started
+
+    succeeded = sum(results)
+    product.refresh_from_db()
+    sold = OrderItem.objects.filter(product=product).aggregate(total=Sum('quantity'))['total'] or 0
+
+    print(f'checkouts:   {checkouts} ({workers} workers)')
+    print(f'succeeded:   {succeeded}')
+    print(f'rejected:    {checkouts - succeeded}')
+    print(f'final stock: {product.stock}')
+    print(f'throughput:  {checkouts / elapsed:.1f} checkouts/sec')
+
+    expected_success = min(checkouts, stock // quantity)
+    ok = (
+        product.stock >= 0
+        and sold == stock - product.stock
+        and sold == succeeded * quantity
+        and Order.objects.count() == succeeded
+        and succeeded == expected_success
+    )
+    print('oversell:    none' if ok else 'oversell:    DETECTED')
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checkouts', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--stock', type=int, default=200)
+    parser.add_argument('--quantity', type=int, default=1)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        ok = run(args.checkouts, args.workers, args.stock, args.quantity)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
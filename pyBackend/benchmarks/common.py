@@ -0,0 +1,40 @@
+"""
+Shared setup for the benchmark scripts: every benchmark runs against a
+throwaway SQLite database so the development db.sqlite3 is never touched.
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce_api.settings')
+
+import django
+from django.conf import settings
+
+
+def configure_database(path):
+    options = {'timeout': 60}
+    if django.VERSION >= (5, 1):
+        # Take the write lock at BEGIN so waiting writers queue on busy_timeout
+        options['transaction_mode'] = 'IMMEDIATE'
+    settings.DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': path,
+            'OPTIONS': options,
+        }
+    }
+
+
+@contextmanager
+def benchmark_database():
+    """Set up Django on a migrated temporary database"""
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_database(os.path.join(tmp, 'bench.sqlite3'))
+        django.setup()
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+        yield
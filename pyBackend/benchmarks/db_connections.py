@@ -0,0 +1,191 @@
+"""
+Load test: GET /api/products/<id>/ throughput per database configuration.
+
+Serves the API with gunicorn (gthread workers) once per configuration of
+the DATABASE settings block and drives product detail requests at it with
+--concurrency clients. The response cache is disabled so every request
+queries the database.
+
+SQLite (default): a seeded throwaway database, served
+  - bare:       no pragmas, a new connection per request (the old settings)
+  - pragmas:    WAL (DB_SQLITE_WAL), synchronous=NORMAL, mmap, a new
+                connection per request
+  - persistent: pragmas plus CONN_MAX_AGE connection reuse
+--connect-delay adds a sleep to every new connection to stand in for the
+TCP + auth handshake of a remote database.
+
+Postgres (--postgres): point DB_NAME, DB_USER, DB_PASSWORD, DB_HOST and
+DB_PORT at a scratch database (it is migrated and seeded), then compare
+per-request connections, CONN_MAX_AGE and the psycopg pool (DB_POOL).
+
+    pip install gunicorn
+    python benchmarks/db_connections.py --concurrency 32 --connect-delay 5
+    DB_NAME=bench DB_USER=... python benchmarks/db_connections.py --postgres
+"""
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import common  # noqa: F401 - puts the project on sys.path
+
+import django
+
+
+SQLITE_CONFIGURATIONS = [
+    ('bare', {'DB_SQLITE_PRAGMAS': 'False', 'DB_CONN_MAX_AGE': '0'}),
+    ('pragmas', {'DB_SQLITE_PRAGMAS': 'True', 'DB_SQLITE_WAL': 'True', 'DB_CONN_MAX_AGE': '0'}),
+    ('persistent', {'DB_SQLITE_PRAGMAS': 'True', 'DB_SQLITE_WAL': 'True', 'DB_CONN_MAX_AGE': '60'}),
+]
+
+POSTGRES_CONFIGURATIONS = [
+    ('per-request', {'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '0'}),
+    ('persistent', {'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '60'}),
+    ('pool', {'DB_POOL': 'True'}),
+]
+
+
+def build_wsgi():
+    """gunicorn 'db_connections:build_wsgi()' entry point"""
+    from django.db.backends.signals import connection_created
+
+    django.setup()
+    delay = float(os.environ.get('BENCH_CONNECT_DELAY', '0')) / 1000
+
+    def slow_connect(sender, connection, **kwargs):
+        time.sleep(delay)
+
+    if delay:
+        connection_created.connect(slow_connect, weak=False)
+    from django.core.wsgi import get_wsgi_application
+    return get_wsgi_application()
+
+
+def seed(products):
+    """Migrate and seed the database the DB_* environment points at"""
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+    from django.db import connection
+    from products.models import Product
+
+    rng = random.Random(42)
+    catalog = Product.objects.bulk_create([
+        Product(
+            name=f'Product {i}', slug=f'bench-product-{i}', description='Benchmark product ' * 5,
+            price=rng.randint(100, 99999) / 100, category=rng.choice(['Electronics', 'Home', 'Toys']),
+            weight=rng.randint(1, 500) / 100, stock=rng.randint(0, 500),
+            images=[f'https://example.com/{i}/{n}.jpg' for n in range(3)],
+        )
+        for i in range(products)
+    ])
+    connection.close()
+    return [product.pk for product in catalog]
+
+
+def request(url):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            response.read()
+            code = response.status
+    except urllib.error.HTTPError as error:
+        code = error.code
+    except OSError:
+        code = 'error'
+    return code, time.perf_counter() - started
+
+
+def wait_for(base, product_id, server):
+    for _ in range(100):
+        if server.poll() is not None:
+            raise SystemExit('server exited during startup')
+        if request(f'{base}/api/products/{product_id}/')[0] == 200:
+            return
+        time.sleep(0.1)
+    raise SystemExit('server did not start')
+
+
+def run(label, env, args, product_ids):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'db_connections:build_wsgi()',
+         '--bind', f'127.0.0.1:{args.port}', '--workers', str(args.workers),
+         '--threads', str(args.threads), '--worker-class', 'gthread'],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f'http://127.0.0.1:{args.port}'
+        wait_for(base, product_ids[0], server)
+        rng = random.Random(7)
+        urls = [f'{base}/api/products/{rng.choice(product_ids)}/' for _ in range(args.requests)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(request, urls))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    codes = [code for code, _ in results]
+    latencies = sorted(latency for _, latency in results)
+    print(
+        f'{label:<12} {len(results) / elapsed:8.1f} req/s  '
+        f'p50={latencies[len(latencies) // 2] * 1000:7.1f}ms  '
+        f'p99={latencies[int(len(latencies) * 0.99)] * 1000:7.1f}ms  '
+        f'mean={statistics.mean(latencies) * 1000:7.1f}ms  '
+        + ' '.join(f'{code}={codes.count(code)}' for code in sorted(set(codes), key=str))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--postgres', action='store_true', help='benchmark the Postgres database in DB_* instead')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--connect-delay', type=float, default=0, help='milliseconds added to every new connection')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='threads per gunicorn worker')
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--port', type=int, default=8767)
+    args = parser.parse_args()
+
+    env = dict(
+        os.environ,
+        BENCH_CONNECT_DELAY=str(args.connect_delay),
+        DEBUG='False',
+        PRODUCT_CACHE_MAX_ENTRIES='0',
+        PRODUCT_DETAIL_CACHE_TIMEOUT='0',
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.postgres:
+            env['DB_ENGINE'] = os.environ['DB_ENGINE'] = 'postgresql'
+            configurations = POSTGRES_CONFIGURATIONS
+        else:
+            env['DB_ENGINE'] = os.environ['DB_ENGINE'] = 'sqlite'
+            env['DB_NAME'] = os.environ['DB_NAME'] = os.path.join(tmp, 'bench.sqlite3')
+            configurations = SQLITE_CONFIGURATIONS
+        product_ids = seed(args.products)
+
+        print(
+            f'{args.requests} x GET /api/products/<id>/ on {env["DB_ENGINE"]}, {args.concurrency} clients, '
+            f'{args.workers} workers x {args.threads} threads, {args.connect_delay:g}ms per connect'
+        )
+        try:
+            for label, overrides in configurations:
+                run(label, dict(env, **overrides), args, product_ids)
+        finally:
+            from products.models import Product
+            Product.objects.filter(pk__in=product_ids).delete()
+
+
+if __name__ == '__main__':
+    main()
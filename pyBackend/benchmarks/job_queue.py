@@ -0,0 +1,122 @@
+"""
+Background job queue throughput: enqueue rate, drain rate, checkout latency.
+
+  - enqueue: --jobs jobs, one transaction each (as requests enqueue them)
+    and all in one transaction
+  - drain: the same jobs run by `run_jobs`-style worker threads for each
+    --concurrency level, with a no-op handler and with the real
+    orders.jobs.order_created handler (daily stats update)
+  - checkout: place_order() time with the stats update inline
+    (JOBS_INLINE) vs queued
+
+    python benchmarks/job_queue.py --jobs 5000 --concurrency 1,2,4
+"""
+import argparse
+import statistics
+import time
+
+from common import benchmark_database
+from serializers import seed
+
+
+ADDRESS = {'fullName': 'Bench', 'address': '1 Main St', 'city': 'X', 'zipCode': '1', 'country': 'X', 'phone': '1'}
+
+
+def noop(payload):
+    pass
+
+
+def order_created_payload(order):
+    from orders.stats import stats_row
+
+    pk, order_id, created_at, status, total_amount = order
+    return {'order': pk, 'orderId': order_id, 'stats': stats_row(created_at, status, total_amount)}
+
+
+def enqueue_jobs(handler, payloads, single_transaction):
+    from django.db import transaction
+    from jobs.queue import enqueue
+
+    started = time.perf_counter()
+    if single_transaction:
+        with transaction.atomic():
+            for payload in payloads:
+                enqueue(handler, payload)
+    else:
+        for payload in payloads:
+            with transaction.atomic():
+                enqueue(handler, payload)
+    return time.perf_counter() - started
+
+
+def drain(concurrency, batch_size):
+    from jobs.models import Job
+    from jobs.worker import run_workers
+
+    started = time.perf_counter()
+    succeeded, failed = run_workers(concurrency, batch_size, poll_interval=0.05, drain=True)
+    elapsed = time.perf_counter() - started
+    assert not failed and not Job.objects.exists(), 'jobs left over'
+    return succeeded, elapsed
+
+
+def checkout_times(user, product_ids, count):
+    from orders.checkout import place_order
+
+    times = []
+    for n in range(count):
+        started = time.perf_counter()
+        place_order(user, [{'product': product_ids[n % len(product_ids)], 'quantity': 1}], ADDRESS)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=5000)
+    parser.add_argument('--concurrency', default='1,2,4', help='comma separated worker thread counts')
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--orders', type=int, default=300, help='orders placed for the checkout comparison')
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    with benchmark_database():
+        from django.conf import settings
+        from orders.models import Order
+        from products.models import Product
+
+        settings.JOBS['INLINE'] = False  # measure the queue, whatever JOBS_INLINE says
+        user = seed(products=200, orders=100, items=2)
+        orders = list(Order.objects.values_list('pk', 'order_id', 'created_at', 'status', 'total_amount'))
+        product_ids = list(Product.objects.filter(stock__gt=0).values_list('pk', flat=True))
+        Product.objects.update(stock=10 ** 6)
+
+        handlers = {
+            'noop': ('job_queue.noop', lambda n: {'n': n}),
+            'order_created': (
+                'orders.jobs.order_created',
+                lambda n: order_created_payload(orders[n % len(orders)]),
+            ),
+        }
+        print(f'{args.jobs} jobs, batch size {args.batch_size}')
+        for label, (handler, make_payload) in handlers.items():
+            payloads = [make_payload(n) for n in range(args.jobs)]
+            enqueue_rates = []
+            for level in levels:
+                enqueue_rates.append(args.jobs / enqueue_jobs(handler, payloads, single_transaction=False))
+                done, elapsed = drain(level, args.batch_size)
+                print(f'{label:<14} drain    {level} worker thread(s)   {done / elapsed:10,.0f} jobs/s')
+            print(f'{label:<14} enqueue  one per transaction {statistics.median(enqueue_rates):10,.0f} jobs/s')
+            elapsed = enqueue_jobs(handler, payloads, single_transaction=True)
+            print(f'{label:<14} enqueue  one transaction     {args.jobs / elapsed:10,.0f} jobs/s')
+            drain(levels[-1], args.batch_size)
+
+        settings.JOBS['INLINE'] = True
+        inline = checkout_times(user, product_ids, args.orders)
+        settings.JOBS['INLINE'] = False
+        queued = checkout_times(user, product_ids, args.orders)
+        print(f'checkout       place_order median: stats inline {inline:.2f}ms, queued {queued:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
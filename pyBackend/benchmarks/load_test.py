@@ -0,0 +1,332 @@
+"""
+Load test of the real API routes with JSON results for regression tracking.
+
+Drives the catalog, order history, admin order list, dashboard and export
+routes and reports throughput and latency percentiles per scenario. Data
+comes from `manage.py seed_bench`; either seed the configured database
+first or pass --temp to seed a throwaway one.
+
+In-process (DRF test client, one request at a time):
+    python manage.py seed_bench --products 500k --users 200k --orders 5M
+    python benchmarks/load_test.py --output results/baseline.json
+
+Against a running server, with concurrent clients:
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --concurrency 32
+
+Compare with an earlier run; exits 1 if any scenario's p95 or throughput
+got worse by more than --tolerance:
+    python benchmarks/load_test.py --baseline results/baseline.json
+
+Poll like a client that keeps ETags (If-None-Match on repeat requests), and
+compare notModified, kbPerRequest and cpuMsPerRequest with a plain run:
+    python benchmarks/load_test.py --conditional --output results/conditional.json
+
+Product list responses are cached, so repeated list scenarios mostly
+measure cache hits, as in production.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+from common import benchmark_database
+
+import django
+
+
+NOUNS = ['Headphones', 'Watch', 'Backpack', 'Keyboard', 'Mouse', 'Speaker', 'Lamp', 'Charger', 'Camera', 'Bottle']
+
+
+def build_scenarios(rng, context):
+    """name -> (role, callable returning (method, path, body))"""
+    return {
+        'products_list': ('anon', lambda: ('GET', f'/api/products/?page={rng.randint(1, 50)}&limit=12', None)),
+        'products_category': ('anon', lambda: ('GET', f'/api/products/?category=Category {rng.randrange(40)}', None)),
+        'products_search': ('anon', lambda: ('GET', f'/api/products/?search={rng.choice(NOUNS)}', None)),
+        'product_detail': ('anon', lambda: ('GET', f'/api/products/{rng.choice(context["products"])}/', None)),
+        'product_facets': ('anon', lambda: ('GET', '/api/products/facets/', None)),
+        'user_orders': ('user', lambda: ('GET', '/api/orders/user/', None)),
+        'admin_orders': ('admin', lambda: ('GET', f'/api/admin/orders/?page={rng.randint(1, 20)}', None)),
+        'admin_orders_status': ('admin', lambda: ('GET', '/api/admin/orders/?status=Pending', None)),
+        'dashboard_stats': ('admin', lambda: ('GET', '/api/admin/orders/dashboard/stats/', None)),
+        'export_orders': ('admin', lambda: (
+            'POST', '/api/admin/orders/export/', {'orderIds': rng.sample(context['orders'], min(500, len(context['orders'])))}
+        )),
+    }
+
+
+def sample_pks(queryset, size, rng):
+    """Random existing pks without ORDER BY RANDOM() over the whole table"""
+    from django.db.models import Max, Min
+
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    span = range(bounds['low'], bounds['high'] + 1)
+    candidates = rng.sample(span, min(len(span), size * 2))
+    return sorted(queryset.filter(pk__in=candidates).values_list('pk', flat=True))[:size]
+
+
+def load_context(rng):
+    from orders.models import Order
+    from products.models import Product
+    from users.models import User
+
+    admin = User.objects.filter(email='bench-admin@example.com').first()
+    if admin is None:
+        raise SystemExit('No benchmark data found: run `manage.py seed_bench` first or pass --temp')
+    bench_users = User.objects.filter(email__startswith='bench-user-')
+    return {
+        'admin': admin,
+        'users': list(User.objects.filter(pk__in=sample_pks(bench_users, 50, rng))),
+        'products': sample_pks(Product.objects.filter(is_deleted=False), 1000, rng),
+        'orders': sample_pks(Order.objects.all(), 5000, rng),
+        'counts': {
+            'products': Product.objects.count(),
+            'users': User.objects.count(),
+            'orders': Order.objects.count(),
+        },
+    }
+
+
+class ETagStore:
+    """ETags seen per (credentials, path), replayed as If-None-Match"""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self._etags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._etags.get(key) if self.enabled else None
+
+    def remember(self, key, etag):
+        if self.enabled and etag:
+            with self._lock:
+                self._etags[key] = etag
+
+
+class InProcessClient:
+    """DRF test client through the full middleware stack"""
+
+    def __init__(self, context, rng, conditional=False):
+        from rest_framework.test import APIClient
+
+        self.context = context
+        self.rng = rng
+        self.client = APIClient()
+        self.etags = ETagStore(conditional)
+
+    def request(self, role, method, path, body):
+        if role == 'admin':
+            user = self.context['admin']
+        elif role == 'user':
+            user = self.rng.choice(self.context['users'])
+        else:
+            user = None
+        self.client.force_authenticate(user)
+        key = (user.pk if user else None, path)
+        headers = {}
+        if self.etags.get(key):
+            headers['If-None-Match'] = self.etags.get(key)
+        started = time.perf_counter()
+        if method == 'GET':
+            response = self.client.get(path, headers=headers)
+        else:
+            response = self.client.post(path, body, format='json')
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        elapsed = time.perf_counter() - started
+        self.etags.remember(key, response.get('ETag'))
+        return response.status_code, elapsed, size
+
+
+class HTTPClient:
+    """urllib against a running server, authenticated with JWTs"""
+
+    def __init__(self, base_url, context, rng, conditional=False):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        self.base_url = base_url.rstrip('/')
+        self.rng = rng
+        self.admin_token = str(RefreshToken.for_user(context['admin']).access_token)
+        self.user_tokens = [str(RefreshToken.for_user(user).access_token) for user in context['users']]
+        self.etags = ETagStore(conditional)
+
+    def request(self, role, method, path, body):
+        headers = {'Content-Type': 'application/json'}
+        if role == 'admin':
+            headers['Authorization'] = f'Bearer {self.admin_token}'
+        elif role == 'user':
+            headers['Authorization'] = f'Bearer {self.rng.choice(self.user_tokens)}'
+        key = (headers.get('Authorization'), path)
+        if method == 'GET' and self.etags.get(key):
+            headers['If-None-Match'] = self.etags.get(key)
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path.replace(' ', '%20'), data=data, headers=headers, method=method)
+        started = time.perf_counter()
+        etag, size = None, 0
+        try:
+            with urllib.request.urlopen(req, timeout=120) as response:
+                size = len(response.read())
+                code = response.status
+                etag = response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            # urllib reports 304 Not Modified as an error too
+            size = len(e.read())
+            code = e.code
+            etag = e.headers.get('ETag')
+        except OSError:
+            code = 0
+        elapsed = time.perf_counter() - started
+        self.etags.remember(key, etag)
+        return code, elapsed, size
+
+
+def percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_scenario(client, role, make_request, requests, concurrency):
+    calls = [make_request() for _ in range(requests)]
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda call: client.request(role, *call), calls))
+    else:
+        results = [client.request(role, *call) for call in calls]
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    latencies = sorted(latency * 1000 for _, latency, _ in results)
+    return {
+        'requests': len(results),
+        'errors': sum(1 for code, _, _ in results if not (200 <= code < 300 or code == 304)),
+        'notModified': sum(1 for code, _, _ in results if code == 304),
+        # Response bodies; CPU of this process (client and, in-process, the server)
+        'kbPerRequest': round(sum(size for _, _, size in results) / len(results) / 1024, 2),
+        'cpuMsPerRequest': round(cpu * 1000 / len(results), 2),
+        'rps': round(len(results) / elapsed, 1),
+        'meanMs': round(statistics.mean(latencies), 2),
+        'p50Ms': round(percentile(latencies, 50), 2),
+        'p95Ms': round(percentile(latencies, 95), 2),
+        'p99Ms': round(percentile(latencies, 99), 2),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Print changes against a baseline run; return the regressed scenario names"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if not before:
+            continue
+        p95_change = (current['p95Ms'] - before['p95Ms']) / before['p95Ms'] if before['p95Ms'] else 0
+        rps_change = (current['rps'] - before['rps']) / before['rps'] if before['rps'] else 0
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        if regressed:
+            regressions.append(name)
+        print(f'{name:<22} p95 {p95_change:+7.1%}  rps {rps_change:+7.1%}{"  REGRESSION" if regressed else ""}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='base URL of a running server; default is in-process')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='client threads (with --url)')
+    parser.add_argument('--conditional', action='store_true', help='send If-None-Match with ETags seen earlier')
+    parser.add_argument('--scenario', action='append', help='run only these scenarios')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='compare against an earlier JSON result')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--temp', action='store_true', help='seed a throwaway database with the sizes below')
+    parser.add_argument('--products', default='10k')
+    parser.add_argument('--users', default='2k')
+    parser.add_argument('--orders', default='50k')
+    args = parser.parse_args()
+
+    if args.url and args.temp:
+        parser.error('--temp seeds a local database and cannot be combined with --url')
+
+    with benchmark_database() if args.temp else nullcontext():
+        if args.temp:
+            from django.core.management import call_command
+            call_command(
+                'seed_bench', '--products', args.products, '--users', args.users, '--orders', args.orders,
+                stdout=open(os.devnull, 'w'),
+            )
+        else:
+            django.setup()
+
+        rng = random.Random(args.seed)
+        context = load_context(rng)
+        if args.url:
+            client = HTTPClient(args.url, context, rng, conditional=args.conditional)
+        else:
+            client = InProcessClient(context, rng, conditional=args.conditional)
+        concurrency = args.concurrency if args.url else 1
+        scenarios = build_scenarios(rng, context)
+        selected = args.scenario or list(scenarios)
+
+        results = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'revision': git_revision(),
+                'mode': 'http' if args.url else 'in-process',
+                'concurrency': concurrency,
+                'conditional': args.conditional,
+                'requestsPerScenario': args.requests,
+                'dataset': context['counts'],
+            },
+            'scenarios': {},
+        }
+        print(f'dataset: {context["counts"]}  mode: {results["meta"]["mode"]}  concurrency: {concurrency}')
+        for name in selected:
+            role, make_request = scenarios[name]
+            summary = run_scenario(client, role, make_request, args.requests, concurrency)
+            results['scenarios'][name] = summary
+            print(
+                f'{name:<22} {summary["rps"]:8.1f} req/s  p50={summary["p50Ms"]:8.2f}ms  '
+                f'p95={summary["p95Ms"]:8.2f}ms  p99={summary["p99Ms"]:8.2f}ms  errors={summary["errors"]}  '
+                f'304={summary["notModified"]}  {summary["kbPerRequest"]:.2f}KB  cpu={summary["cpuMsPerRequest"]:.2f}ms'
+            )
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'results written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Load test: catalog latency during a login burst.
+
+Starts a threaded WSGI server on a throwaway database, measures
+GET /api/products/ latency on its own, then again while a burst of login
+requests arrives at --rate per second. Run it once with hashing in the
+pool and once inline to compare:
+
+    python benchmarks/login_burst.py --hash-workers 2
+    python benchmarks/login_burst.py --hash-workers 0
+
+Login throttling is relaxed for the run so every login reaches the hasher;
+logins beyond the hashing queue limit are answered 503 immediately.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def serve(port, hash_workers):
+    from common import benchmark_database
+
+    with benchmark_database():
+        from django.core.servers.basehttp import run
+        from django.core.wsgi import get_wsgi_application
+        from products.models import Product
+        from users.models import User
+
+        User.objects.create_user(email='bench@example.com', name='Bench', password='bench-password')
+        Product.objects.bulk_create([
+            Product(name=f'Product {i}', slug=f'product-{i}', description='Benchmark', price=10, category='Bench', stock=10)
+            for i in range(200)
+        ])
+        print('ready', flush=True)
+        run('127.0.0.1', port, get_wsgi_application(), threading=True)
+
+
+def request(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            code = response.status
+    except urllib.error.HTTPError as e:
+        code = e.code
+    return code, time.perf_counter() - started
+
+
+def probe_catalog(base, stop, latencies):
+    page = 0
+    while not stop.is_set():
+        page = page % 20 + 1
+        _, elapsed = request(f'{base}/api/products/?page={page}&limit=10')
+        latencies.append(elapsed)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000
+
+
+def report(label, latencies):
+    print(
+        f'{label:<16} n={len(latencies):<6} '
+        f'p50={percentile(latencies, 50):7.1f}ms  p99={percentile(latencies, 99):7.1f}ms  '
+        f'mean={statistics.mean(latencies) * 1000:7.1f}ms'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate', type=int, default=500, help='login attempts per second')
+    parser.add_argument('--duration', type=float, default=5.0, help='burst length in seconds')
+    parser.add_argument('--hash-workers', type=int, default=2)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.hash_workers)
+        return
+
+    env = dict(
+        os.environ,
+        PASSWORD_HASHING_WORKERS=str(args.hash_workers),
+        LOGIN_THROTTLE_IP='1000000/s',
+        LOGIN_THROTTLE_EMAIL='1000000/s',
+        DEBUG='False',
+    )
+    server = subprocess.Popen(
+        [sys.executable, __file__, '--serve', '--port', str(args.port), '--hash-workers', str(args.hash_workers)],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        server.stdout.readline()
+        base = f'http://127.0.0.1:{args.port}'
+        time.sleep(0.5)
+
+        stop = threading.Event()
+        baseline = []
+        probe = threading.Thread(target=probe_catalog, args=(base, stop, baseline))
+        probe.start()
+        time.sleep(args.duration)
+        stop.set()
+        probe.join()
+
+        stop = threading.Event()
+        during = []
+        probe = threading.Thread(target=probe_catalog, args=(base, stop, during))
+        probe.start()
+        codes = []
+        login = {'email': 'bench@example.com', 'password': 'wrong-password'}
+        with ThreadPoolExecutor(max_workers=128) as pool:
+            futures = []
+            started = time.perf_counter()
+            total = int(args.rate * args.duration)
+            for i in range(total):
+                delay = started + i / args.rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(pool.submit(request, f'{base}/api/auth/login/', login))
+            codes = [future.result()[0] for future in futures]
+        stop.set()
+        probe.join()
+
+        print(f'hash workers: {args.hash_workers}   logins: {len(codes)} at {args.rate}/s')
+        print('login responses: ' + ', '.join(f'{code}={codes.count(code)}' for code in sorted(set(codes))))
+        report('catalog idle', baseline)
+        report('catalog burst', during)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
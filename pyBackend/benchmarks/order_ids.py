@@ -0,0 +1,164 @@
+"""
+Order id collision check across processes.
+
+Generator mode: --processes workers each generate --ids order ids as fast
+as they can; the sorted streams are merged and checked for duplicates.
+With --legacy the same burst runs through the previous scheme
+(millisecond timestamp + 4 random characters) for comparison.
+
+Insert mode (--insert N): every worker saves N orders through
+Order.objects.create() into one shared database, then the table is
+checked for duplicate order_ids and lost orders.
+
+    python benchmarks/order_ids.py --processes 4 --ids 1000000
+    python benchmarks/order_ids.py --processes 4 --ids 1000000 --legacy
+    python benchmarks/order_ids.py --processes 4 --insert 2000
+"""
+import argparse
+import heapq
+import multiprocessing
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from array import array
+
+from common import benchmark_database, configure_database
+
+import django
+
+
+def legacy_id():
+    timestamp = str(int(time.time() * 1000))
+    random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
+    return f'ORD-{timestamp}-{random_str}'
+
+
+def generate(args):
+    count, path, legacy = args
+    started = time.perf_counter()
+    if legacy:
+        # Encode "<ms>-<4 chars>" as an int so both schemes share the checker
+        alphabet = string.ascii_uppercase + string.digits
+        values = []
+        for _ in range(count):
+            ms, suffix = legacy_id()[4:].split('-')
+            code = 0
+            for char in suffix:
+                code = code * 36 + alphabet.index(char)
+            values.append(int(ms) * 36 ** 4 + code)
+        values.sort()
+        node = None
+    else:
+        from orders.ids import order_ids
+        values = [order_ids.next_int() for _ in range(count)]
+        node = order_ids.node
+    with open(path, 'wb') as f:
+        array('Q', values).tofile(f)
+    return os.getpid(), node, time.perf_counter() - started
+
+
+def read_stream(path, chunk=1 << 16):
+    with open(path, 'rb') as f:
+        while True:
+            block = array('Q')
+            try:
+                block.fromfile(f, chunk)
+            except EOFError:
+                pass
+            if not block:
+                return
+            yield from block
+
+
+def count_duplicates(paths):
+    duplicates = 0
+    previous = None
+    for value in heapq.merge(*(read_stream(path) for path in paths)):
+        if value == previous:
+            duplicates += 1
+        previous = value
+    return duplicates
+
+
+def run_generators(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f'{n}.ids') for n in range(args.processes)]
+        with multiprocessing.Pool(args.processes) as pool:
+            results = pool.map(generate, [(args.ids, path, args.legacy) for path in paths])
+        total = args.ids * args.processes
+        slowest = max(elapsed for _, _, elapsed in results)
+        scheme = 'legacy timestamp+random' if args.legacy else 'snowflake'
+        print(f'{scheme}: {total} ids from {args.processes} processes in {slowest:.1f}s ({total / slowest:,.0f} ids/s)')
+        if not args.legacy:
+            print('node ids: ' + ', '.join(f'pid {pid} -> {node}' for pid, node, _ in results))
+        duplicates = count_duplicates(paths)
+        print(f'duplicates: {duplicates}')
+        return duplicates
+
+
+def insert_orders(args):
+    count, db_path = args
+    configure_database(db_path)
+    django.setup()
+    from django.db import IntegrityError
+    from orders.models import Order
+    from users.models import User
+
+    user = User.objects.get(email='bench@example.com')
+    address = {'fullName': 'Bench', 'address': '1 Main St', 'city': 'X', 'zipCode': '1', 'country': 'X', 'phone': '1'}
+    failures = 0
+    for _ in range(count):
+        try:
+            Order.objects.create(user=user, total_amount=10, shipping_address=address)
+        except IntegrityError:
+            failures += 1
+    return failures
+
+
+def run_inserts(args):
+    with benchmark_database():
+        from django.conf import settings
+        from django.db import connection
+        from django.db.models import Count
+        from orders.models import Order
+        from users.models import User
+
+        User.objects.create_user(email='bench@example.com', name='Bench', password='bench')
+        db_path = settings.DATABASES['default']['NAME']
+        connection.close()
+
+        started = time.perf_counter()
+        # spawn, so each worker sets Django up on its own like a real server process
+        with multiprocessing.get_context('spawn').Pool(args.processes) as pool:
+            failures = sum(pool.map(insert_orders, [(args.insert, db_path)] * args.processes))
+        elapsed = time.perf_counter() - started
+
+        total = Order.objects.count()
+        distinct = Order.objects.aggregate(n=Count('order_id', distinct=True))['n']
+        expected = args.insert * args.processes
+        print(f'inserted {total}/{expected} orders from {args.processes} processes in {elapsed:.1f}s')
+        print(f'failed inserts: {failures}  duplicate order_ids: {total - distinct}')
+        return failures + (total - distinct) + (expected - total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--ids', type=int, default=1000000, help='ids per process (generator mode)')
+    parser.add_argument('--legacy', action='store_true', help='use the old timestamp + random suffix scheme')
+    parser.add_argument('--insert', type=int, help='orders per process to insert instead')
+    args = parser.parse_args()
+
+    if args.insert:
+        problems = run_inserts(args)
+    else:
+        django.setup()
+        problems = run_generators(args)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Product detail cache: hit rates, latency and stampede coalescing.
+
+Seeds --products products and requests /api/products/<id> and
+/api/products/<slug> with a Zipf-like popularity (exponent --skew), so a
+few SKUs take most of the traffic, with the detail cache:
+
+  - off: every request reads the database
+  - shared: the CACHES alias only (no per-process tier)
+  - two-tier: per-process LRU in front of the CACHES alias
+
+Then runs the stampede check: --threads threads request the same cold
+product at once with --db-delay ms added to each load, with and without
+request coalescing, and counts the database loads.
+
+The shared tier is the default CACHES alias: an in-process LocMemCache
+unless settings configure e.g. Redis, where every shared hit also pays a
+network round trip that the local tier saves.
+
+    python benchmarks/product_detail_cache.py --products 5000 --requests 20000
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from common import benchmark_database
+
+
+class NoFlight:
+    """Stand-in for SingleFlight without coalescing"""
+    coalesced = 0
+
+    def do(self, key, function):
+        return function()
+
+
+def configure(mode):
+    from django.core.cache import caches
+    from products.cache import LRUBackend, SingleFlight, product_cache
+
+    caches['default'].clear()
+    product_cache.timeout = 0 if mode == 'off' else 3600
+    product_cache.local = LRUBackend(max_entries=0 if mode == 'shared' else 1024)
+    product_cache.flight = SingleFlight()
+    product_cache.local_hits = product_cache.shared_hits = product_cache.misses = 0
+
+
+def run_requests(paths, client):
+    from django.db import connection
+
+    times, queries = [], []
+
+    def count(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        for path in paths:
+            started = time.perf_counter()
+            response = client.get(path)
+            times.append(time.perf_counter() - started)
+            assert response.status_code == 200, path
+    return times, len(queries)
+
+
+def stampede(pk, threads, db_delay, coalesce):
+    from django.db import connections
+    from products import detail
+    from products.cache import SingleFlight, product_cache
+
+    product_cache.invalidate([pk])
+    product_cache.flight = SingleFlight() if coalesce else NoFlight()
+    loads = []
+
+    def slow_load(pk):
+        loads.append(pk)
+        time.sleep(db_delay / 1000)
+        return detail.load_product(pk)
+
+    barrier = threading.Barrier(threads)
+
+    def request():
+        barrier.wait()
+        try:
+            assert product_cache.get(pk, slow_load) is not None
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=request) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return len(loads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--skew', type=float, default=1.2, help='Zipf exponent of SKU popularity')
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--db-delay', type=float, default=20, help='ms added to each load in the stampede check')
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from django.test import Client
+        from products.cache import product_cache
+        from products.models import Product
+        from serializers import seed
+
+        seed(products=args.products, orders=0, items=0)
+        products = list(Product.objects.order_by('pk').values_list('pk', 'slug'))
+        rng = random.Random(42)
+        rng.shuffle(products)
+        weights = [1 / rank ** args.skew for rank in range(1, len(products) + 1)]
+        picks = rng.choices(products, weights, k=args.requests)
+        paths = [f'/api/products/{pk}/' if n % 2 else f'/api/products/{slug}/' for n, (pk, slug) in enumerate(picks)]
+        top = sum(weights[:max(1, len(products) // 100)]) / sum(weights)
+        print(f'{args.products} products, {args.requests} requests, top 1% of SKUs get {top:.0%} of them')
+
+        client = Client()
+        for mode in ['off', 'shared', 'two-tier']:
+            configure(mode)
+            times, queries = run_requests(paths, client)
+            stats = product_cache.stats()
+            print(
+                f'{mode:<9} median {statistics.median(times) * 1000:6.3f}ms  '
+                f'p99 {statistics.quantiles(times, n=100)[98] * 1000:6.3f}ms  '
+                f'{len(times) / sum(times):8,.0f} req/s  {queries / len(paths):5.2f} queries/req  '
+                f'local hits {stats["localHits"]:6}  shared hits {stats["sharedHits"]:6}'
+            )
+
+        configure('two-tier')
+        hot = products[0][0]
+        for coalesce in [False, True]:
+            loads = stampede(hot, args.threads, args.db_delay, coalesce)
+            print(f'stampede  {args.threads} concurrent misses, coalescing {"on " if coalesce else "off"}: {loads} database load(s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+JSON render time and bytes on the wire for large API responses.
+
+Fetches a 100-product catalog page and a 50-order history page through
+the API, then compares:
+  - render time of DRF's JSONRenderer vs ORJSONRenderer (and checks the
+    bytes are identical)
+  - body size and compression time uncompressed, gzip and brotli
+  - what CompressionMiddleware actually sends for each Accept-Encoding
+
+    python benchmarks/render_compress.py --repeat 200
+"""
+import argparse
+import sys
+import time
+
+from common import benchmark_database
+from serializers import seed
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def report(label, client, path, repeat, headers):
+    from rest_framework.renderers import JSONRenderer
+    from ecommerce_api import compression, renderers
+    from ecommerce_api.compression import compress_body
+
+    data = client.get(path, headers=headers).data
+    drf_ms, drf_bytes = best_of(lambda: JSONRenderer().render(data), repeat)
+    fast_ms, fast_bytes = best_of(lambda: renderers.ORJSONRenderer().render(data), repeat)
+    identical = drf_bytes == fast_bytes
+    engine = 'orjson' if renderers.orjson else 'orjson not installed'
+    print(f'{label} ({len(drf_bytes):,} bytes)')
+    print(
+        f'  render   drf {drf_ms:7.3f}ms   {engine} {fast_ms:7.3f}ms   '
+        f'speedup {drf_ms / fast_ms:4.1f}x   identical={identical}'
+    )
+
+    encodings = ['gzip', 'br'] if compression.brotli else ['gzip']
+    for encoding in encodings:
+        ms, body = best_of(lambda: compress_body(fast_bytes, encoding), repeat)
+        print(f'  {encoding:<8} {len(body):>9,} bytes ({len(body) / len(fast_bytes):5.1%})   compress {ms:7.3f}ms')
+
+    for accept in ['identity', 'gzip', 'gzip, deflate, br']:
+        response = client.get(path, headers={**headers, 'Accept-Encoding': accept})
+        print(
+            f'  wire     Accept-Encoding: {accept:<18} -> '
+            f'{response.get("Content-Encoding", "identity"):<8} {len(response.content):>9,} bytes'
+        )
+    return identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from django.test import Client
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        user = seed(products=500, orders=50, items=4)
+        headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        client = Client()
+
+        identical = report('GET /api/products/?limit=100', client, '/api/products/?limit=100', args.repeat, {})
+        identical &= report('GET /api/orders/user/ (50 orders)', client, '/api/orders/user/', args.repeat, headers)
+    sys.exit(0 if identical else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Read replica routing check with local SQLite files as primary and replicas.
+
+Migrates and seeds a primary database, copies it into --replicas replica
+files, then renames every product in each replica copy ("... @replica1")
+so responses show which database served them. Checks that:
+  - catalog lists and admin report views read from the replicas, in turn
+  - product details (loaded into their cache) always read the primary
+  - other views and all writes use the primary
+  - after creating an order the user reads from the primary for
+    DB_REPLICA_PIN_SECONDS, then from the replicas again
+  - the streamed CSV export queries the replica while it is consumed
+  - lists read from a replica stay in the response cache for at most
+    DB_REPLICA_CACHE_TIMEOUT seconds
+
+    python benchmarks/replica_routing.py
+    python benchmarks/replica_routing.py --replicas 2 --async-views
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import common  # noqa: F401 - puts the project on sys.path
+
+import django
+
+
+PIN_SECONDS = 1
+CACHE_TIMEOUT = 1
+
+failures = []
+
+
+def check(label, ok):
+    print(f'  {"ok  " if ok else "FAIL"} {label}')
+    if not ok:
+        failures.append(label)
+
+
+class QueryCounter:
+    """Queries per database alias, across every connection"""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.counts[context['connection'].alias] += 1
+        return execute(sql, params, many, context)
+
+    def install(self):
+        from django.db import connections
+        for alias in connections:
+            connections[alias].execute_wrappers.append(self)
+
+    def take(self):
+        counts, self.counts = self.counts, Counter()
+        return counts
+
+
+def copy_database(source, target, alias):
+    with sqlite3.connect(source) as primary, sqlite3.connect(target) as replica:
+        primary.backup(replica)
+        replica.execute("UPDATE products SET name = name || ' @' || ?", [alias])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--replicas', type=int, default=2)
+    parser.add_argument('--async-views', action='store_true', help='serve the catalog with the async views')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        primary = os.path.join(tmp, 'primary.sqlite3')
+        replicas = [os.path.join(tmp, f'replica{n}.sqlite3') for n in range(1, args.replicas + 1)]
+        os.environ.update(
+            DB_ENGINE='sqlite',
+            DB_NAME=primary,
+            DB_REPLICAS=','.join(replicas),
+            DB_REPLICA_SELECTION='round_robin',
+            DB_REPLICA_PIN_SECONDS=str(PIN_SECONDS),
+            DB_REPLICA_CACHE_TIMEOUT=str(CACHE_TIMEOUT),
+            PRODUCT_CACHE_MAX_ENTRIES='0',
+            PRODUCT_DETAIL_CACHE_TIMEOUT='0',
+            ASYNC_VIEWS='get_products,get_product_by_id' if args.async_views else '',
+        )
+        django.setup()
+        from django.core.management import call_command
+        from django.db import connections
+        from django.test import Client
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from serializers import seed
+        from users.models import User
+
+        call_command('migrate', verbosity=0)
+        user = seed(products=50, orders=10, items=2)
+        admin = User.objects.create_user(email='admin@example.com', name='Admin', password='admin', role='admin')
+        product_id = user.orders.first().items.first().product_id
+        connections.close_all()
+        for number, path in enumerate(replicas, start=1):
+            copy_database(primary, path, f'replica{number}')
+
+        queries = QueryCounter()
+        queries.install()
+        client = Client()
+
+        def get(path, as_user=None):
+            headers = {}
+            if as_user is not None:
+                headers['Authorization'] = f'Bearer {RefreshToken.for_user(as_user).access_token}'
+            response = client.get(path, headers=headers)
+            return response, queries.take()
+
+        def served_by(response):
+            body = json.loads(response.content)
+            name = body['product']['name'] if 'product' in body else body['products'][0]['name']
+            return name.rpartition(' @')[2] if ' @' in name else 'default'
+
+        first_product = '/api/products/?limit=1'
+
+        print(f'{args.replicas} replica(s), {"async" if args.async_views else "sync"} catalog views')
+
+        print('catalog reads')
+        seen = [served_by(get(first_product)[0]) for _ in range(args.replicas * 2)]
+        check(f'anonymous product list rotates over replicas: {seen}', seen == [f'replica{n}' for n in range(1, args.replicas + 1)] * 2)
+        response, counts = get(f'/api/products/{product_id}/')
+        check(f'product detail loads from the primary: {dict(counts)}', served_by(response) == 'default' and set(counts) == {'default'})
+        response, counts = get('/api/products/?limit=5')
+        names = [product['name'] for product in json.loads(response.content)['products']]
+        check(f'product list from a replica: {dict(counts)}', all(' @replica' in name for name in names) and not counts['default'])
+        _, counts = get('/api/orders/user/', as_user=user)
+        check(f'order history stays on the primary: {dict(counts)}', set(counts) == {'default'})
+
+        print('admin reports')
+        for path in ['/api/admin/orders/', '/api/admin/orders/dashboard/stats/']:
+            response, counts = get(path, as_user=admin)
+            replica_queries = sum(count for alias, count in counts.items() if alias != 'default')
+            check(f'{path} {response.status_code} reads replicas: {dict(counts)}', response.status_code == 200 and replica_queries)
+        response = client.post(
+            '/api/admin/orders/export/', {'includeItems': 'true'}, content_type='application/json',
+            headers={'Authorization': f'Bearer {RefreshToken.for_user(admin).access_token}'},
+        )
+        body = b''.join(response.streaming_content)
+        counts = queries.take()
+        replica_queries = sum(count for alias, count in counts.items() if alias != 'default')
+        check(f'CSV export ({len(body.splitlines())} lines) streamed from a replica: {dict(counts)}', replica_queries >= 1)
+
+        print('response cache')
+        from products.cache import LRUBackend, response_cache
+        response_cache.backend = LRUBackend(max_entries=100)
+        response, counts = get('/api/products/?limit=3')
+        check(f'list from a replica: {dict(counts)}', served_by(response) != 'default')
+        _, counts = get('/api/products/?limit=3')
+        check(f'then from the response cache: {dict(counts)}', not counts)
+        time.sleep(CACHE_TIMEOUT + 0.1)
+        _, counts = get('/api/products/?limit=3')
+        check(f'after {CACHE_TIMEOUT}s read again: {dict(counts)}', counts)
+        response_cache.backend = LRUBackend(max_entries=0)
+
+        print('read-your-writes')
+        token = f'Bearer {RefreshToken.for_user(user).access_token}'
+        response = client.post(
+            '/api/orders/',
+            {'items': [{'product': product_id, 'quantity': 1}],
+             'shippingAddress': {'fullName': 'a', 'address': 'b', 'city': 'c', 'zipCode': '1', 'country': 'x', 'phone': '1'}},
+            content_type='application/json', headers={'Authorization': token},
+        )
+        counts = queries.take()
+        check(f'create_order {response.status_code} writes to the primary: {dict(counts)}', response.status_code == 201 and set(counts) == {'default'})
+        response, counts = get(first_product, as_user=user)
+        check(f'the writer reads the primary: {dict(counts)}', served_by(response) == 'default')
+        response, _ = get(first_product, as_user=admin)
+        check('other users keep reading replicas', served_by(response) != 'default')
+        response, _ = get(first_product)
+        check('anonymous users keep reading replicas', served_by(response) != 'default')
+        time.sleep(PIN_SECONDS + 0.1)
+        response, _ = get(first_product, as_user=user)
+        check(f'after {PIN_SECONDS}s the writer is back on a replica', served_by(response) != 'default')
+
+    print('all checks passed' if not failures else f'{len(failures)} check(s) failed')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
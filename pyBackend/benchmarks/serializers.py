@@ -0,0 +1,111 @@
+"""
+Micro-benchmark: DRF serializers vs the .values()-based fast serializers.
+
+Serializes the same products and orders both ways, checks that the
+rendered JSON is byte-identical and reports objects/sec for each path.
+
+Usage:
+    python benchmarks/serializers.py --products 2000 --orders 500 --items 4
+"""
+import argparse
+import random
+import sys
+import time
+
+from common import benchmark_database
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def seed(products, orders, items):
+    from orders.models import Order, OrderItem, AdminNote
+    from products.models import Product
+    from users.models import User
+
+    rng = random.Random(42)
+    user = User.objects.create_user(email='bench@example.com', name='Bench', password='bench')
+    catalog = Product.objects.bulk_create([
+        Product(
+            name=f'Product {i}', slug=f'product-{i}', description='Benchmark product ' * 5,
+            price=rng.randint(100, 99999) / 100, category=rng.choice(['Electronics', 'Home', 'Toys']),
+            weight=rng.randint(1, 500) / 100, stock=rng.randint(0, 500),
+            images=[f'https://example.com/{i}/{n}.jpg' for n in range(3)],
+        )
+        for i in range(products)
+    ])
+    address = {'fullName': 'Bench', 'address': '1 Main St', 'city': 'X', 'zipCode': '1', 'country': 'X', 'phone': '1'}
+    created = Order.objects.bulk_create([
+        Order(
+            user=user, customer_email=user.email, customer_name=user.name, item_count=items,
+            order_id=f'ORD-BENCH-{i}', total_amount=rng.randint(100, 99999) / 100, shipping_address=address,
+        )
+        for i in range(orders)
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, product_name=product.name, quantity=rng.randint(1, 3), price=product.price)
+        for order in created
+        for product in rng.sample(catalog, items)
+    ])
+    AdminNote.objects.bulk_create([AdminNote(order=order, note='Checked') for order in created[::5]])
+    return user
+
+
+def compare(label, count, slow, fast, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    renderer = JSONRenderer()
+    slow_time, slow_data = timed(slow, repeat)
+    fast_time, fast_data = timed(fast, repeat)
+    identical = renderer.render(slow_data) == renderer.render(fast_data)
+    print(
+        f'{label:<10} {count:>7} objs   '
+        f'drf {count / slow_time:>10.0f}/s   fast {count / fast_time:>10.0f}/s   '
+        f'speedup {slow_time / fast_time:>5.1f}x   identical={identical}'
+    )
+    return identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--orders', type=int, default=500)
+    parser.add_argument('--items', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from orders.fast_serializers import serialize_orders
+        from orders.models import Order
+        from orders.serializers import OrderSerializer
+        from products.fast_serializers import serialize_products
+        from products.models import Product
+        from products.serializers import ProductSerializer
+
+        user = seed(args.products, args.orders, args.items)
+        products = Product.objects.filter(is_deleted=False)
+        orders = Order.objects.filter(user=user)
+
+        ok = compare(
+            'products', args.products,
+            lambda: ProductSerializer(products.all(), many=True).data,
+            lambda: serialize_products(products.all()),
+            args.repeat,
+        )
+        ok &= compare(
+            'orders', args.orders,
+            lambda: OrderSerializer(orders.with_details(), many=True).data,
+            lambda: serialize_orders(orders.all()),
+            args.repeat,
+        )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import exceptions
+
+from users.authentication import ClaimsJWTAuthentication
+from .renderers import ORJSONRenderer
+
+
+_renderer = ORJSONRenderer()
+
+
+def select_view(name, sync_view, async_view):
+    """Route to the async version of a view when it is listed in settings.ASYNC_VIEWS"""
+    if name in getattr(settings, 'ASYNC_VIEWS', ()):
+        return async_view
+    return sync_view
+
+
+def json_response(data, status=200):
+    """Render like DRF's Response so sync and async routes return the same bytes"""
+    return HttpResponse(_renderer.render(data), status=status, content_type='application/json')
+
+
+async def authenticate(request):
+    """Resolve request.user from the Bearer token, or return a 401 response.
+
+    Returns (user, None) on success and (None, response) on failure.
+    """
+    try:
+        result = await sync_to_async(ClaimsJWTAuthentication().authenticate)(request)
+    except exceptions.APIException as e:
+        data = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+        return None, json_response(data, status=e.status_code)
+    if result is None:
+        return None, json_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+    return result[0], None
@@ -0,0 +1,141 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip is offered
+    brotli = None
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from .profiling import timed
+
+
+GZIP_LEVEL = 6
+# Random gzip header padding against BREACH, as in Django's GZipMiddleware
+GZIP_MAX_RANDOM_BYTES = 100
+
+
+def choose_encoding(accept_encoding):
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, or None.
+
+    The highest q-value wins; on a tie brotli is preferred.
+    """
+    offered = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        offered[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ('br', 'gzip') if brotli else ('gzip',):
+        quality = offered.get(encoding, offered.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(content, encoding, brotli_quality=5):
+    if encoding == 'br':
+        return brotli.compress(content, quality=brotli_quality)
+    return compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def _stream_compressor(encoding, brotli_quality):
+    """(process, finish) callables of an incremental compressor"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, compressor.flush
+
+
+def compress_stream(chunks, encoding, brotli_quality=5):
+    process, finish = _stream_compressor(encoding, brotli_quality)
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_stream(chunks, encoding, brotli_quality=5):
+    process, finish = _stream_compressor(encoding, brotli_quality)
+    async for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware:
+    """Brotli or gzip response compression, negotiated on Accept-Encoding.
+
+    Replaces django.middleware.gzip.GZipMiddleware: adds brotli (when the
+    brotli package is installed), a configurable size threshold and async
+    support without a thread hop. Place it right after ProfilingMiddleware
+    so compression time shows up as the 'compress' Server-Timing span.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        options = getattr(settings, 'COMPRESSION', {})
+        if not options.get('ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.min_size = options.get('MIN_SIZE', 1024)
+        self.brotli_quality = options.get('BROTLI_QUALITY', 5)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _compress(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            wrap = acompress_stream if response.is_async else compress_stream
+            response.streaming_content = wrap(response.streaming_content, encoding, self.brotli_quality)
+            # The compressed length is unknown until the stream ends
+            del response.headers['Content-Length']
+        else:
+            with timed('compress'):
+                compressed = compress_body(response.content, encoding, self.brotli_quality)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag must not be shared by different encodings (RFC 9110
+        # 8.8.1); If-None-Match uses weak comparison, so 304s still work
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._compress(request, await self.get_response(request))
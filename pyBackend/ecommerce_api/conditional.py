@@ -0,0 +1,48 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+# Conditional GET for polled read endpoints. Validators come from a cheap
+# aggregate over the rows behind a response (ProductQuerySet.version(),
+# OrderQuerySet.version()) or from the (pk, updated_at) of rows already
+# fetched, so a client that has the current representation gets a 304
+# without anything being serialized.
+
+
+def make_etag(*parts):
+    """Strong ETag over everything that determines a response body"""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def row_versions(rows):
+    """(pk, updated_at) pairs and the newest updated_at of fetched rows.
+
+    rows may be model instances or .values() dicts.
+    """
+    versions = [
+        (row['id'], row['updated_at']) if isinstance(row, dict) else (row.pk, row.updated_at)
+        for row in rows
+    ]
+    return versions, max((updated_at for _, updated_at in versions), default=None)
+
+
+def not_modified(request, etag, last_modified):
+    """A 304 (or 412) response if the request's preconditions say so, else None"""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
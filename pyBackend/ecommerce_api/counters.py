@@ -0,0 +1,20 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def add_to_counter(model, lookup, **deltas):
+    """Add deltas to the fields of the counter row matching lookup.
+
+    An UPDATE ... SET field = field + delta, so concurrent writers never
+    lose an increment; the row is created on first use. lookup must match
+    a unique constraint of model. Call inside the write's transaction.
+    """
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another transaction created the row first
+        model.objects.filter(**lookup).update(**increments)
@@ -0,0 +1,110 @@
+import django
+
+try:
+    import psycopg_pool
+except ImportError:  # optional; without it Postgres falls back to persistent connections
+    psycopg_pool = None
+
+
+# Builds settings.DATABASES entries from the DATABASE block in settings.py.
+# Imported by settings, so nothing here may touch django.conf.settings.
+
+ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgresql': 'django.db.backends.postgresql',
+}
+
+# Applied to every new SQLite connection. A negative cache_size is in KiB.
+SQLITE_PRAGMAS = {
+    'temp_store': 'MEMORY',
+    'cache_size': -20000,
+}
+
+# Added with SQLITE_WAL. WAL lets readers run alongside the single writer.
+# synchronous=NORMAL skips the fsync on every commit; in WAL mode only a
+# power loss (not a process crash) can lose the last commits. WAL is a
+# property of the database file, written into its header, so it is opt-in
+# rather than applied to whatever file NAME points at.
+SQLITE_WAL_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+
+
+def sqlite_options(options):
+    # sqlite3.connect(timeout=) is SQLite's busy_timeout, in seconds
+    result = {'timeout': options.get('SQLITE_BUSY_TIMEOUT', 5)}
+    if django.VERSION < (5, 1):
+        return result
+    # Take the write lock at BEGIN: a deferred transaction that reads and
+    # then writes fails at once with "database is locked" under contention
+    # instead of waiting out busy_timeout
+    result['transaction_mode'] = 'IMMEDIATE'
+    if options.get('SQLITE_PRAGMAS', True):
+        pragmas = dict(SQLITE_PRAGMAS, mmap_size=options.get('SQLITE_MMAP_SIZE', 0))
+        if options.get('SQLITE_WAL', False):
+            pragmas.update(SQLITE_WAL_PRAGMAS)
+        result['init_command'] = ';'.join(f'PRAGMA {name}={value}' for name, value in pragmas.items())
+    return result
+
+
+def uses_pool(options):
+    return (
+        options.get('POOL', False)
+        and options['ENGINE'] == 'postgresql'
+        and psycopg_pool is not None
+        and django.VERSION >= (5, 1)
+    )
+
+
+def database_config(options):
+    """A settings.DATABASES entry for a DATABASE-style options dict"""
+    engine = options['ENGINE']
+    config = {
+        'ENGINE': ENGINES.get(engine, engine),
+        'NAME': options['NAME'],
+        'CONN_MAX_AGE': options.get('CONN_MAX_AGE', 0),
+        # Ping a reused connection before its first query in a request, so a
+        # connection the server dropped is replaced instead of erroring
+        'CONN_HEALTH_CHECKS': options.get('CONN_HEALTH_CHECKS', False),
+    }
+    if engine == 'sqlite':
+        config['OPTIONS'] = sqlite_options(options)
+        return config
+
+    config.update({key: options.get(key, '') for key in ('USER', 'PASSWORD', 'HOST', 'PORT')})
+    config['OPTIONS'] = {}
+    if uses_pool(options):
+        # Connections are returned to the pool at the end of each request,
+        # which Django requires CONN_MAX_AGE = 0 for; CONN_HEALTH_CHECKS
+        # makes the pool check a connection before handing it out
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': options.get('POOL_MIN_SIZE', 2),
+            'max_size': options.get('POOL_MAX_SIZE', 10),
+            'timeout': options.get('POOL_TIMEOUT', 10),
+        }
+    return config
+
+
+REPLICA_PREFIX = 'replica'
+
+
+def replica_databases(options, replicas):
+    """DATABASES entries 'replica1', 'replica2', ... for read replicas.
+
+    Each entry of replicas is the replica's NAME (a file, for sqlite) or
+    HOST (postgresql); everything else is shared with the primary.
+    """
+    field = 'NAME' if options['ENGINE'] == 'sqlite' else 'HOST'
+    databases = {}
+    for number, replica in enumerate(replicas, start=1):
+        config = database_config(dict(options, **{field: replica}))
+        # Tests run against the primary's test database only
+        config['TEST'] = {'MIRROR': 'default'}
+        databases[f'{REPLICA_PREFIX}{number}'] = config
+    return databases
+
+
+def replica_aliases(databases):
+    return [alias for alias in databases if alias.startswith(REPLICA_PREFIX)]
@@ -0,0 +1,76 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(obj, direction):
+    """Build an opaque cursor pointing at obj's (created_at, id) position.
+
+    obj may be a model instance or a .values() row.
+    """
+    if isinstance(obj, dict):
+        created_at, pk = obj['created_at'], obj['id']
+    else:
+        created_at, pk = obj.created_at, obj.pk
+    payload = json.dumps({'t': created_at.isoformat(), 'id': pk, 'd': direction})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id, direction) for a cursor built by encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload['d']
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(payload['t']), int(payload['id']), direction
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def paginate_by_cursor(queryset, cursor, limit):
+    """Keyset-paginate a queryset on (-created_at, -id).
+
+    Skips the COUNT(*) and OFFSET of Paginator, so deep pages cost the same
+    as the first one. Any existing ordering (e.g. search relevance) is
+    replaced. An empty cursor returns the first page. Returns the page's
+    objects and the pagination block with next/prev cursors.
+    """
+    direction = 'next'
+    queryset = queryset.order_by('-created_at', '-id')
+
+    if cursor:
+        created_at, pk, direction = decode_cursor(cursor)
+        if direction == 'next':
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+        else:
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            ).order_by('created_at', 'id')
+
+    items = list(queryset[:limit + 1])
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    if direction == 'prev':
+        items.reverse()
+        has_next = bool(items)
+        has_prev = has_more
+    else:
+        has_next = has_more
+        has_prev = bool(cursor) and bool(items)
+
+    return items, {
+        'limit': limit,
+        'next': encode_cursor(items[-1], 'next') if has_next else None,
+        'prev': encode_cursor(items[0], 'prev') if has_prev else None,
+    }
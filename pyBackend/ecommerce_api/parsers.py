@@ -0,0 +1,48 @@
+import codecs
+import io
+import re
+
+try:
+    import orjson
+except ImportError:  # optional; parsing falls back to DRF's JSONParser
+    orjson = None
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+
+# orjson turns integers beyond 64 bits into floats instead of failing
+LONG_NUMBER = re.compile(rb'\d{19}')
+
+
+def _is_utf8(encoding):
+    try:
+        return codecs.lookup(encoding).name == 'utf-8'
+    except LookupError:
+        return False
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser on top of orjson when it is installed.
+
+    Non UTF-8 bodies, bodies orjson rejects (malformed JSON, lone
+    surrogates) and bodies with 19+ digit numbers, which orjson would
+    round to floats, go through the stock parser, so results and error
+    messages stay the same.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not _is_utf8(encoding):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if not LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,250 @@
+"""
+Per-request profiling: wall time, SQL count and time, duplicate queries and
+serialization time, reported as a Server-Timing header and aggregated into
+rolling per-view percentiles for /api/admin/metrics.
+
+Enabled with settings.PROFILING['ENABLED']. Metrics are kept per worker
+process. Queries run while a StreamingHttpResponse is being consumed happen
+after the middleware returns and are not counted.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """Timings collected while one request is handled"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.spans = defaultdict(float)
+        self._open = set()
+
+    def record_query(self, sql, elapsed):
+        self.queries += 1
+        self.db_time += elapsed
+        self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        """Queries that repeat an earlier statement with different parameters"""
+        return self.queries - len(self.statements)
+
+    def most_repeated(self):
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+    def server_timing(self, total):
+        metrics = [
+            f'total;dur={total * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries, {self.duplicates} duplicate"',
+        ]
+        metrics += [f'{span};dur={elapsed * 1000:.1f}' for span, elapsed in self.spans.items()]
+        return ', '.join(metrics)
+
+
+@contextmanager
+def timed(span):
+    """Add the time spent in the block to the current request's span.
+
+    Usable as a decorator. Nested use of the same span is counted once, so
+    a serializer that nests other serializers is not double counted.
+    """
+    profile = _current.get()
+    if profile is None or span in profile._open:
+        yield
+        return
+    profile._open.add(span)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.spans[span] += time.perf_counter() - started
+        profile._open.discard(span)
+
+
+class ProfiledSerializerMixin:
+    """Count a serializer's to_representation() as 'serialize' time"""
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    return {
+        f'p{pct}': round(values[min(len(values) - 1, int(len(values) * pct / 100))], 2)
+        for pct in (50, 95, 99)
+    }
+
+
+class MetricsRegistry:
+    """Rolling window of the last WINDOW requests per URL name"""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def _new_view(self):
+        return {
+            'count': 0,
+            'errors': 0,
+            'wall': deque(maxlen=self.window),
+            'db': deque(maxlen=self.window),
+            'queries': deque(maxlen=self.window),
+            'serialize': deque(maxlen=self.window),
+            'duplicates': 0,
+            'most_repeated': (None, 0),
+        }
+
+    def record(self, name, status_code, total, profile):
+        with self._lock:
+            view = self._views.get(name)
+            if view is None:
+                view = self._views[name] = self._new_view()
+            view['count'] += 1
+            if status_code >= 500:
+                view['errors'] += 1
+            view['wall'].append(total * 1000)
+            view['db'].append(profile.db_time * 1000)
+            view['queries'].append(profile.queries)
+            view['serialize'].append(profile.spans.get('serialize', 0) * 1000)
+            view['duplicates'] += profile.duplicates
+            sql, repeats = profile.most_repeated()
+            if repeats > 1 and repeats >= view['most_repeated'][1]:
+                view['most_repeated'] = (sql, repeats)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    'count': view['count'],
+                    'errors': view['errors'],
+                    'wallMs': percentiles(view['wall']),
+                    'dbMs': percentiles(view['db']),
+                    'queries': percentiles(view['queries']),
+                    'serializeMs': percentiles(view['serialize']),
+                    'duplicateQueries': view['duplicates'],
+                    'mostRepeatedQuery': {
+                        'sql': view['most_repeated'][0],
+                        'count': view['most_repeated'][1],
+                    } if view['most_repeated'][0] else None,
+                }
+                for name, view in sorted(self._views.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+def profiling_enabled():
+    return getattr(settings, 'PROFILING', {}).get('ENABLED', False)
+
+
+metrics = MetricsRegistry(window=getattr(settings, 'PROFILING', {}).get('WINDOW', 1000))
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record_query(sql, time.perf_counter() - started)
+
+
+def _install_query_recorder(sender=None, connection=None, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class ProfilingMiddleware:
+    """Profile every request; place it first in MIDDLEWARE"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not profiling_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.duplicate_threshold = settings.PROFILING.get('DUPLICATE_QUERY_THRESHOLD', 5)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        # Connections are per thread (async views query from worker threads),
+        # so the recorder goes on every connection as it is opened and stays
+        # there; it does nothing outside a profiled request.
+        connection_created.connect(_install_query_recorder, dispatch_uid='profiling')
+        for connection in connections.all(initialized_only=True):
+            _install_query_recorder(connection=connection)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered (JSON encoded) right after this hook
+        profile = _current.get()
+        if profile is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                profile.spans['render'] += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def _finish(self, request, response, profile):
+        total = time.perf_counter() - profile.started
+        response['Server-Timing'] = profile.server_timing(total)
+
+        match = getattr(request, 'resolver_match', None)
+        name = match.url_name if match and match.url_name else 'unresolved'
+        name = name.removesuffix('_no_slash')
+        metrics.record(name, response.status_code, total, profile)
+
+        sql, repeats = profile.most_repeated()
+        if repeats >= self.duplicate_threshold:
+            logger.warning('%s ran the same query %d times (possible N+1): %s', name, repeats, sql)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, profile)
@@ -0,0 +1,37 @@
+try:
+    import orjson
+except ImportError:  # optional; rendering falls back to DRF's JSONRenderer
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer on top of orjson when it is installed.
+
+    Produces the same bytes as DRF's renderer for our payloads: compact
+    separators, UTF-8, \\u2028/\\u2029 escaped. Datetimes, Decimals and
+    anything else orjson does not handle natively go through DRF's
+    encoder. Indented output (browsable API, `; indent=` in Accept) and
+    payloads orjson rejects, such as ints over 64 bits, use the stock
+    renderer. One difference is float exponents, e.g. orjson writes 1e-7
+    where json writes 1e-07.
+    """
+
+    options = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or not self.compact or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except (orjson.JSONEncodeError, ValueError):
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,255 @@
+import itertools
+import threading
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .database import replica_aliases
+
+
+# Read replica routing. ReplicaMiddleware marks requests to the views in
+# settings.REPLICA_ROUTING['VIEWS'] as replica reads; ReplicaRouter then
+# sends their reads to one replica per request. Every write goes to the
+# primary, and a request that writes pins its user to the primary for
+# PIN_SECONDS so they read their own writes on the next requests too.
+
+_request_state = ContextVar('replica_request_state', default=None)
+
+
+class ReplicaSelector:
+    """Picks a replica per request: in turn, or the one with the fewest
+    requests in flight in this process ('least_loaded')"""
+
+    def __init__(self, aliases, strategy='round_robin'):
+        self.aliases = list(aliases)
+        self.strategy = strategy
+        self._in_flight = dict.fromkeys(self.aliases, 0)
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            start = next(self._turn) % len(self.aliases)
+            candidates = self.aliases[start:] + self.aliases[:start]
+            if self.strategy == 'least_loaded':
+                alias = min(candidates, key=self._in_flight.__getitem__)
+            else:
+                alias = candidates[0]
+            self._in_flight[alias] += 1
+            return alias
+
+    def release(self, alias):
+        with self._lock:
+            self._in_flight[alias] -= 1
+
+    def in_flight(self):
+        with self._lock:
+            return dict(self._in_flight)
+
+
+def read_from_replica():
+    """True while the current request is reading from a replica"""
+    state = _request_state.get()
+    return state is not None and state.alias is not None
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    options = settings.REPLICA_ROUTING
+    caches[options['PIN_CACHE']].set(_pin_key(user_id), True, options['PIN_SECONDS'])
+
+
+def is_pinned(user_id):
+    return bool(caches[settings.REPLICA_ROUTING['PIN_CACHE']].get(_pin_key(user_id)))
+
+
+def token_user_id(request):
+    """User id from the request's Bearer token, or None.
+
+    Routing runs before (and, for the async views, without) DRF
+    authentication, so the token is validated here; no query is made.
+    """
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        validated_token = authenticator.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    return validated_token.get(api_settings.USER_ID_CLAIM)
+
+
+class RequestState:
+    """Routing state of one request, shared by its sync and async parts"""
+
+    def __init__(self, request, selector):
+        self.request = request
+        self.selector = selector
+        self.replica_view = False
+        self.wrote = False
+        self.alias = None
+        self._user_id = None
+        self._pinned = None
+
+    def user_id(self):
+        if self._user_id is None:
+            self._user_id = token_user_id(self.request) or ''
+        return self._user_id or None
+
+    def read_alias(self):
+        if not self.replica_view or self.wrote:
+            return None
+        if self._pinned is None:
+            user_id = self.user_id()
+            self._pinned = user_id is not None and is_pinned(user_id)
+        if self._pinned:
+            return None
+        if self.alias is None:
+            self.alias = self.selector.acquire()
+        return self.alias
+
+    def finish(self):
+        if self.alias is not None:
+            self.selector.release(self.alias)
+            self.alias = None
+        if self.wrote:
+            user_id = self.user_id()
+            if user_id is not None:
+                pin_to_primary(user_id)
+
+
+class ReplicaRouter:
+    """Reads from a replica inside replica views, everything else on the primary.
+
+    Users are always read from the primary: authentication has to see an
+    account (or a role change) as soon as it is written.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or model._meta.label == settings.AUTH_USER_MODEL:
+            return None
+        return state.read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases(settings.DATABASES):
+            return False
+        return None
+
+
+def view_name(view_func):
+    # DRF's @api_view wraps the function in a class named after it
+    view_class = getattr(view_func, 'cls', None)
+    return view_class.__name__ if view_class is not None else view_func.__name__
+
+
+def _stream_with_state(chunks, state):
+    """Keep routing streamed responses (CSV export) while they are consumed"""
+    iterator = iter(chunks)
+    try:
+        while True:
+            token = _request_state.set(state)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _request_state.reset(token)
+            yield chunk
+    finally:
+        state.finish()
+
+
+async def _astream_with_state(chunks, state):
+    iterator = aiter(chunks)
+    try:
+        while True:
+            token = _request_state.set(state)
+            try:
+                chunk = await anext(iterator)
+            except StopAsyncIteration:
+                return
+            finally:
+                _request_state.reset(token)
+            yield chunk
+    finally:
+        state.finish()
+
+
+class ReplicaMiddleware:
+    """Sets up ReplicaRouter's per-request state; place it before anything
+    that queries the database."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        aliases = replica_aliases(settings.DATABASES)
+        if not aliases:
+            raise MiddlewareNotUsed
+        options = settings.REPLICA_ROUTING
+        self.get_response = get_response
+        self.views = set(options['VIEWS'])
+        self.selector = ReplicaSelector(aliases, options['SELECTION'])
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _request_state.get()
+        if state is not None and view_name(view_func) in self.views:
+            state.replica_view = True
+
+    def _finish(self, response, state):
+        if response.streaming:
+            wrap = _astream_with_state if response.is_async else _stream_with_state
+            response.streaming_content = wrap(response.streaming_content, state)
+        else:
+            state.finish()
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestState(request, self.selector)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            state.finish()
+            raise
+        finally:
+            _request_state.reset(token)
+        return self._finish(response, state)
+
+    async def __acall__(self, request):
+        state = RequestState(request, self.selector)
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            state.finish()
+            raise
+        finally:
+            _request_state.reset(token)
+        return self._finish(response, state)
@@ -11,9 +11,11 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 from datetime import timedelta
 
+from .database import database_config, replica_databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,9 +47,13 @@ INSTALLED_APPS = [
     'users',
     'products',
     'orders',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'ecommerce_api.profiling.ProfilingMiddleware',
+    'ecommerce_api.compression.CompressionMiddleware',
+    'ecommerce_api.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -95,12 +101,65 @@ WSGI_APPLICATION = 'ecommerce_api.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-# Using MongoDB with pymongo directly
+# ENGINE 'sqlite' is the local mode: the file in NAME, tuned with the
+# pragmas in ecommerce_api.database unless SQLITE_PRAGMAS is off. SQLITE_WAL
+# switches the file to WAL mode, which lets requests read while another
+# writes; it is off by default because it rewrites the header of the file
+# (the db.sqlite3 checked into the repo). Turn it on wherever the database
+# is served.
+# ENGINE 'postgresql' is production. Connections are kept open for
+# CONN_MAX_AGE seconds (0 closes them after every request), or with POOL each
+# process keeps a psycopg pool of POOL_MIN_SIZE..POOL_MAX_SIZE connections
+# (needs psycopg[pool]; CONN_MAX_AGE is then ignored). Prefer POOL under
+# ASGI, where persistent connections are not reused across requests.
+# CONN_HEALTH_CHECKS checks a reused connection before the request's first
+# query.
+DATABASE = {
+    'ENGINE': config('DB_ENGINE', default='sqlite'),
+    'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+    'USER': config('DB_USER', default=''),
+    'PASSWORD': config('DB_PASSWORD', default=''),
+    'HOST': config('DB_HOST', default=''),
+    'PORT': config('DB_PORT', default=''),
+    'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+    'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+    'POOL': config('DB_POOL', default=False, cast=bool),
+    'POOL_MIN_SIZE': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+    'POOL_MAX_SIZE': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+    'POOL_TIMEOUT': 10,
+    'SQLITE_PRAGMAS': config('DB_SQLITE_PRAGMAS', default=True, cast=bool),
+    'SQLITE_WAL': config('DB_SQLITE_WAL', default=False, cast=bool),
+    'SQLITE_MMAP_SIZE': config('DB_SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int),
+    'SQLITE_BUSY_TIMEOUT': 5,
+}
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(DATABASE),
+    # Read replicas: the NAME (sqlite) or HOST (postgresql) of each, comma
+    # separated; everything else is shared with the primary
+    **replica_databases(DATABASE, config('DB_REPLICAS', default='', cast=Csv())),
+}
+DATABASE_ROUTERS = ['ecommerce_api.replicas.ReplicaRouter']
+
+# Read replica routing (ecommerce_api.replicas), active when DB_REPLICAS is
+# set. Reads in VIEWS go to one replica per request, chosen in turn
+# ('round_robin') or by fewest requests in flight ('least_loaded'). A user
+# who writes is pinned to the primary for PIN_SECONDS; pins are kept in the
+# PIN_CACHE alias, which has to be shared between workers (e.g. Redis) for
+# pins to follow the user across processes. Responses read from a replica
+# go into the product response cache for at most CACHE_TIMEOUT seconds (0
+# keeps them out), since a lagging replica can still return rows changed
+# before the last invalidation. Product details are not listed: their
+# cache always loads from the primary.
+REPLICA_ROUTING = {
+    'VIEWS': config(
+        'DB_REPLICA_VIEWS',
+        default='get_products,get_dashboard_stats,export_orders_csv,get_all_orders',
+        cast=Csv(),
+    ),
+    'SELECTION': config('DB_REPLICA_SELECTION', default='least_loaded'),
+    'PIN_SECONDS': config('DB_REPLICA_PIN_SECONDS', default=5, cast=int),
+    'PIN_CACHE': 'default',
+    'CACHE_TIMEOUT': config('DB_REPLICA_CACHE_TIMEOUT', default=5, cast=int),
 }
 
 # MongoDB Configuration
@@ -109,13 +168,127 @@ MONGODB_URI = config('MONGODB_URI', default='mongodb://localhost:27017/ecommerce
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    # orjson-backed JSON when orjson is installed; same output as DRF's
+    'DEFAULT_RENDERER_CLASSES': [
+        'ecommerce_api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'ecommerce_api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Used by users.throttling on login, admin login and registration
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('LOGIN_THROTTLE_IP', default='30/min'),
+        'login_email': config('LOGIN_THROTTLE_EMAIL', default='5/min'),
+    },
+}
+
+# Cache shared by every worker: product caches, replica pins. Set REDIS_URL
+# (e.g. redis://localhost:6379/0) whenever more than one process serves
+# requests; without it each process gets its own LocMemCache and nothing
+# cached is shared or invalidated across processes.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Product response cache (lists, facets)
+# BACKEND: 'locmem' for a per-process LRU, or 'django' to use the CACHES
+# alias in ALIAS (e.g. Redis, shared between workers). The default is
+# 'django' when REDIS_URL is set. With 'locmem' an invalidation only
+# reaches the worker that made the change: the others keep serving their
+# copies for up to TIMEOUT seconds after a product edit or stock change.
+PRODUCT_CACHE = {
+    'BACKEND': config('PRODUCT_CACHE_BACKEND', default='django' if REDIS_URL else 'locmem'),
+    'ALIAS': 'default',
+    'MAX_ENTRIES': config('PRODUCT_CACHE_MAX_ENTRIES', default=1024, cast=int),
+    'TIMEOUT': 300,
+}
+
+# Product detail cache (/api/products/<id> and /api/products/<slug>): a
+# per-process LRU of LOCAL_MAX_ENTRIES kept for LOCAL_TIMEOUT seconds, in
+# front of the CACHES alias in ALIAS (TIMEOUT seconds). Entries are dropped
+# per product on save, soft delete and stock changes; other workers' local
+# copies can lag by up to LOCAL_TIMEOUT. The alias must be shared (Redis,
+# see REDIS_URL) for that: with a per-process LocMemCache, entries are kept
+# no longer than LOCAL_TIMEOUT instead. TIMEOUT 0 turns caching off.
+PRODUCT_DETAIL_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': config('PRODUCT_DETAIL_CACHE_TIMEOUT', default=3600, cast=int),
+    'LOCAL_MAX_ENTRIES': config('PRODUCT_DETAIL_LOCAL_MAX_ENTRIES', default=1024, cast=int),
+    'LOCAL_TIMEOUT': config('PRODUCT_DETAIL_LOCAL_TIMEOUT', default=5, cast=int),
+}
+
+# Lower bounds of the price ranges on /api/products/facets. Changing them
+# requires rebuilding the counter table (products.facets.rebuild_facet_counts)
+PRODUCT_PRICE_BUCKETS = [0, 25, 50, 100, 250, 500, 1000]
+
+# Soft-deleted products older than this are moved to archived_products by
+# `manage.py archive_products` (run it from cron)
+PRODUCT_ARCHIVE_AFTER_DAYS = config('PRODUCT_ARCHIVE_AFTER_DAYS', default=90, cast=int)
+
+# Views that serialize with the .values()-based fast path instead of DRF
+# serializers (products.fast_serializers / orders.fast_serializers)
+FAST_SERIALIZER_ENDPOINTS = config('FAST_SERIALIZER_ENDPOINTS', default='get_products,get_user_orders', cast=Csv())
+
+# Read views served by their native async versions (products.async_views /
+# orders.async_views). Only worthwhile under an ASGI server such as uvicorn;
+# under WSGI each async view runs in its own event loop.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default='', cast=Csv())
+
+# Node id (0-1023) in generated order ids (orders.ids). Unset means the
+# worker's pid is used; set it where pids can clash across machines, e.g.
+# one process per container, giving every container its own value.
+ORDER_ID_NODE = config('ORDER_ID_NODE', default=None, cast=lambda value: int(value) if value else None)
+
+# Background jobs (jobs app): follow-up work queued with jobs.queue.enqueue()
+# in the same transaction as the change that caused it, and run by
+# `manage.py run_jobs` workers. A failing job is retried up to MAX_ATTEMPTS
+# times, BACKOFF_SECONDS * 2^n apart (at most MAX_BACKOFF_SECONDS), then
+# kept as dead. A job whose worker died is retried once its lease of
+# LEASE_SECONDS has run out. INLINE runs jobs right away inside the
+# enqueuing transaction instead. It is on by default so a deployment
+# without a worker keeps its dashboard stats current; set JOBS_INLINE=False
+# where `run_jobs` is deployed (see DEPLOYMENT.md).
+JOBS = {
+    'INLINE': config('JOBS_INLINE', default=True, cast=bool),
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 2,
+    'MAX_BACKOFF_SECONDS': 600,
+    'LEASE_SECONDS': 300,
+}
+
+# Per-request profiling (ecommerce_api.profiling): Server-Timing headers and
+# rolling per-view percentiles at /api/admin/metrics. WINDOW is the number of
+# recent requests kept per view; a request repeating one query at least
+# DUPLICATE_QUERY_THRESHOLD times is logged as a likely N+1.
+PROFILING = {
+    'ENABLED': config('PROFILING_ENABLED', default=False, cast=bool),
+    'WINDOW': 1000,
+    'DUPLICATE_QUERY_THRESHOLD': 5,
+}
+
+# Response compression (ecommerce_api.compression): brotli when the client
+# accepts it and the brotli package is installed, otherwise gzip. Bodies
+# smaller than MIN_SIZE bytes are sent uncompressed. Disable it when a
+# reverse proxy already compresses.
+COMPRESSION = {
+    'ENABLED': config('COMPRESSION_ENABLED', default=True, cast=bool),
+    'MIN_SIZE': config('COMPRESSION_MIN_SIZE', default=1024, cast=int),
+    'BROTLI_QUALITY': 5,
 }
 
 # JWT Settings
@@ -129,6 +302,29 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# JWT user resolution (users.authentication.ClaimsJWTAuthentication)
+# USER_FROM_CLAIMS builds request.user from the access token's
+# email/name/role/is_active claims with no DB lookup. A role change or
+# deactivation then only applies once the user's current access token has
+# expired, so in this mode access tokens live CLAIMS_ACCESS_TOKEN_LIFETIME
+# instead of SIMPLE_JWT's ACCESS_TOKEN_LIFETIME (users log in again after
+# it). Otherwise users are loaded by id and kept in a per-process cache for
+# USER_CACHE_TTL seconds (0 disables it), invalidated on User.save().
+JWT_USER_RESOLUTION = {
+    'USER_FROM_CLAIMS': config('JWT_USER_FROM_CLAIMS', default=False, cast=bool),
+    'CLAIMS_ACCESS_TOKEN_LIFETIME': timedelta(hours=config('JWT_CLAIMS_ACCESS_TOKEN_HOURS', default=24, cast=int)),
+    'USER_CACHE_TTL': config('JWT_USER_CACHE_TTL', default=60, cast=int),
+}
+
+# Password hashing pool (users.hashing): login and registration hash in
+# WORKERS processes, with at most MAX_QUEUE hashes waiting or running;
+# beyond that they answer 503. WORKERS = 0 hashes inline in the request.
+PASSWORD_HASHING = {
+    'WORKERS': config('PASSWORD_HASHING_WORKERS', default=2, cast=int),
+    'MAX_QUEUE': config('PASSWORD_HASHING_MAX_QUEUE', default=16, cast=int),
+    'TIMEOUT': 10,
+}
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
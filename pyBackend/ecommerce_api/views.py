@@ -0,0 +1,22 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from products.cache import product_cache, response_cache
+from .profiling import metrics, profiling_enabled
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_metrics(request):
+    """Admin: Get per-view latency, query and serialization percentiles"""
+    if request.user.role != 'admin':
+        return Response({'message': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
+    
+    return Response({
+        'profiling': profiling_enabled(),
+        'views': metrics.snapshot(),
+        'productCache': response_cache.stats(),
+        'productDetailCache': product_cache.stats(),
+    })
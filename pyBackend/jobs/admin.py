@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import Job
+from .queue import requeue
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('handler', 'status', 'attempts', 'run_at', 'locked_by', 'created_at')
+    list_filter = ('status', 'handler')
+    readonly_fields = ('locked_by', 'locked_at', 'last_error', 'created_at')
+    ordering = ('run_at',)
+    actions = ['requeue_jobs']
+
+    @admin.action(description='Run selected jobs again')
+    def requeue_jobs(self, request, queryset):
+        count = requeue(queryset)
+        self.message_user(request, f'{count} jobs queued')
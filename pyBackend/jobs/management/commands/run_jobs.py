@@ -0,0 +1,34 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from jobs.models import Job
+from jobs.queue import requeue
+from jobs.worker import run_workers
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (see settings.JOBS) until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='worker threads')
+        parser.add_argument('--batch-size', type=int, default=10, help='jobs claimed per query')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds to wait when the queue is empty')
+        parser.add_argument('--drain', action='store_true', help='exit once no job is due')
+        parser.add_argument('--requeue-dead', action='store_true', help='queue dead jobs again, then exit')
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            count = requeue(Job.objects.filter(status=Job.DEAD))
+            self.stdout.write(self.style.SUCCESS(f'Queued {count} dead jobs again'))
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            # Finish the jobs in hand, then exit
+            signal.signal(signum, lambda *args: stop.set())
+        succeeded, failed = run_workers(
+            options['concurrency'], options['batch_size'], options['poll_interval'], options['drain'], stop,
+        )
+        self.stdout.write(self.style.SUCCESS(f'{succeeded} jobs done, {failed} failed'))
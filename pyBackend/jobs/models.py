@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A call of handler(payload) waiting to run, running, or given up on.
+
+    Jobs are deleted once they succeed; see jobs.queue and jobs.worker.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DEAD = 'dead'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DEAD, 'Dead'),
+    ]
+
+    handler = models.CharField(max_length=200)  # dotted path of a function
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'jobs'
+        indexes = [
+            # Workers poll for status='pending' AND run_at <= now in run_at order
+            models.Index(fields=['status', 'run_at', 'id'], name='jobs_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.handler} #{self.pk} ({self.status})'
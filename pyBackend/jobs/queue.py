@@ -0,0 +1,48 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+# A transactional outbox: enqueue() inserts the job in the caller's
+# transaction, so it exists if and only if the changes that caused it were
+# committed, and the request returns without waiting for it. Workers
+# (`manage.py run_jobs`, jobs.worker) run it afterwards.
+
+
+def enqueue(handler, payload=None, delay=0, max_attempts=None):
+    """Queue handler(payload); handler is the dotted path of a function.
+
+    payload must be JSON serializable. With settings.JOBS['INLINE'] the
+    handler runs right away instead, inside the current transaction.
+    """
+    options = settings.JOBS
+    payload = payload or {}
+    function = import_string(handler)  # fail here rather than in the worker
+    if options['INLINE']:
+        function(payload)
+        return None
+    return Job.objects.create(
+        handler=handler,
+        payload=payload,
+        max_attempts=max_attempts or options['MAX_ATTEMPTS'],
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def backoff(attempts):
+    """Seconds before retry number `attempts`: exponential, capped, jittered"""
+    options = settings.JOBS
+    delay = min(options['MAX_BACKOFF_SECONDS'], options['BACKOFF_SECONDS'] * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def requeue(queryset):
+    """Run jobs (typically dead ones) again with a fresh set of attempts"""
+    return queryset.update(
+        status=Job.PENDING, attempts=0, run_at=timezone.now(), locked_by='', locked_at=None,
+    )
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import enqueue
+from .worker import Worker
+
+
+def noop(payload):
+    pass
+
+
+def fail(payload):
+    raise ValueError('handler failed')
+
+
+def write(payload):
+    Job.objects.create(handler='jobs.tests.noop', payload={'written_by': payload['n']})
+
+
+def written():
+    return list(Job.objects.filter(payload__has_key='written_by').values_list('payload__written_by', flat=True))
+
+
+@override_settings(JOBS={**settings.JOBS, 'INLINE': False})
+class WorkerTests(TestCase):
+    """Claiming, retrying, dead-lettering and lease handling of jobs.worker"""
+
+    def setUp(self):
+        self.worker = Worker('worker-1')
+
+    def run_due(self):
+        return [self.worker.run_job(job) for job in self.worker.claim()]
+
+    def test_enqueue_inline(self):
+        with self.settings(JOBS={**settings.JOBS, 'INLINE': True}):
+            self.assertIsNone(enqueue('jobs.tests.write', {'n': 1}))
+        self.assertEqual(written(), [1])
+        self.assertFalse(Job.objects.exclude(payload__has_key='written_by').exists())
+
+    def test_success_deletes_the_job_with_the_handler_writes(self):
+        job = enqueue('jobs.tests.write', {'n': 1})
+        self.assertEqual(self.run_due(), [True])
+        self.assertFalse(Job.objects.filter(pk=job.pk).exists())
+        self.assertEqual(written(), [1])
+
+    def test_claim_skips_jobs_that_are_not_due_or_taken(self):
+        enqueue('jobs.tests.noop', delay=60)
+        taken = enqueue('jobs.tests.noop')
+        self.assertEqual([job.pk for job in Worker('worker-2').claim()], [taken.pk])
+        self.assertEqual(self.worker.claim(), [])
+
+    def test_failure_retries_with_backoff(self):
+        job = enqueue('jobs.tests.fail', max_attempts=3)
+        before = timezone.now()
+        self.assertEqual(self.run_due(), [False])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (Job.PENDING, 1, ''))
+        self.assertGreater(job.run_at, before)
+        self.assertIn('handler failed', job.last_error)
+        # Not due again until the backoff has passed
+        self.assertEqual(self.worker.claim(), [])
+
+    def test_failure_goes_dead_after_max_attempts(self):
+        job = enqueue('jobs.tests.fail', max_attempts=2)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(self.run_due(), [False])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.assertEqual(self.run_due(), [False])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DEAD)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(self.run_due(), [])
+
+    def test_expired_lease_is_requeued(self):
+        job = enqueue('jobs.tests.noop')
+        self.worker.claim()
+        self.assertEqual(self.worker.requeue_expired(), 0)
+        expired = timezone.now() - self.worker.lease - timedelta(seconds=1)
+        Job.objects.filter(pk=job.pk).update(locked_at=expired)
+        self.assertEqual(self.worker.requeue_expired(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.attempts), (Job.PENDING, '', 1))
+        other = Worker('worker-2')
+        self.assertEqual([other.run_job(claimed) for claimed in other.claim()], [True])
+
+    def test_expired_lease_goes_dead_after_max_attempts(self):
+        job = enqueue('jobs.tests.noop', max_attempts=1)
+        self.worker.claim()
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - self.worker.lease - timedelta(seconds=1))
+        self.worker.requeue_expired()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DEAD)
+
+    def test_lease_lost_rolls_back_the_handler(self):
+        job = enqueue('jobs.tests.write', {'n': 1})
+        [claimed] = self.worker.claim()
+        # The lease ran out and another worker claimed the job meanwhile
+        Job.objects.filter(pk=job.pk).update(locked_by='worker-2', locked_at=timezone.now())
+        with self.assertLogs('jobs.worker', 'WARNING'):
+            self.assertFalse(self.worker.run_job(claimed))
+        self.assertEqual(written(), [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (Job.RUNNING, 'worker-2'))
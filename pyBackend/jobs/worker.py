@@ -0,0 +1,178 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+from .queue import backoff
+
+
+logger = logging.getLogger(__name__)
+
+# Longest traceback kept in Job.last_error
+MAX_ERROR_LENGTH = 10000
+
+
+class LeaseLost(Exception):
+    """The job was taken over by another worker after its lease ran out"""
+
+
+class Worker:
+    """Claims due jobs in batches and runs them one by one.
+
+    Each job's handler runs in the same transaction that deletes the job,
+    so its database changes are committed exactly once; side effects
+    outside the database (e-mail, HTTP calls) are at-least-once. A failing
+    job goes back to pending with an exponential backoff, and to dead once
+    it has used up max_attempts.
+    """
+
+    def __init__(self, name=None, batch_size=10):
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.batch_size = batch_size
+        self.lease = timedelta(seconds=settings.JOBS['LEASE_SECONDS'])
+        self._handlers = {}
+
+    def claim(self):
+        now = timezone.now()
+        with transaction.atomic():
+            due = Job.objects.filter(status=Job.PENDING, run_at__lte=now).order_by('run_at', 'id')
+            if connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            ids = list(due.values_list('pk', flat=True)[:self.batch_size])
+            if not ids:
+                return []
+            # The status condition keeps two workers from claiming the same
+            # job where SKIP LOCKED is not available (SQLite)
+            Job.objects.filter(pk__in=ids, status=Job.PENDING).update(
+                status=Job.RUNNING, locked_by=self.name, locked_at=now, attempts=F('attempts') + 1,
+            )
+        return list(
+            Job.objects.filter(pk__in=ids, status=Job.RUNNING, locked_by=self.name, locked_at=now)
+            .order_by('run_at', 'id')
+        )
+
+    def requeue_expired(self):
+        """Give jobs of workers that died mid-job back to the queue"""
+        cutoff = timezone.now() - self.lease
+        expired = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+        dead = expired.filter(attempts__gte=F('max_attempts')).update(
+            status=Job.DEAD, last_error='Lease expired while running', locked_by='', locked_at=None,
+        )
+        pending = expired.update(status=Job.PENDING, run_at=timezone.now(), locked_by='', locked_at=None)
+        return dead + pending
+
+    def _handler(self, path):
+        if path not in self._handlers:
+            self._handlers[path] = import_string(path)
+        return self._handlers[path]
+
+    def run_job(self, job):
+        """Run one claimed job; returns True if it succeeded"""
+        try:
+            with transaction.atomic():
+                self._handler(job.handler)(job.payload)
+                if not Job.objects.filter(pk=job.pk, locked_by=self.name, locked_at=job.locked_at).delete()[0]:
+                    raise LeaseLost
+        except LeaseLost:
+            logger.warning('Job %s ran past its lease and was rolled back', job.pk)
+            return False
+        except Exception:
+            self.fail(job, traceback.format_exc())
+            return False
+        return True
+
+    def fail(self, job, error):
+        owned = Job.objects.filter(pk=job.pk, locked_by=self.name, locked_at=job.locked_at)
+        if job.attempts >= job.max_attempts:
+            logger.error('Job %s (%s) failed %d times, giving up', job.pk, job.handler, job.attempts)
+            owned.update(status=Job.DEAD, last_error=error[-MAX_ERROR_LENGTH:], locked_by='', locked_at=None)
+        else:
+            owned.update(
+                status=Job.PENDING,
+                last_error=error[-MAX_ERROR_LENGTH:],
+                run_at=timezone.now() + timedelta(seconds=backoff(job.attempts)),
+                locked_by='',
+                locked_at=None,
+            )
+
+    def run_once(self):
+        """Claim and run one batch; returns (succeeded, failed)"""
+        close_old_connections()
+        succeeded = failed = 0
+        for job in self.claim():
+            if self.run_job(job):
+                succeeded += 1
+            else:
+                failed += 1
+        return succeeded, failed
+
+    def run(self, stop, poll_interval=1.0, drain=False):
+        """Work until the stop event is set, or with drain until nothing is due"""
+        totals = [0, 0]
+        try:
+            while not stop.is_set():
+                try:
+                    succeeded, failed = self.run_once()
+                except DatabaseError:
+                    # e.g. the database restarted; the claimed jobs are
+                    # picked up again when their lease runs out
+                    logger.exception('Worker %s lost its database connection', self.name)
+                    connection.close()
+                    stop.wait(poll_interval)
+                    continue
+                totals[0] += succeeded
+                totals[1] += failed
+                if not succeeded + failed:
+                    if drain:
+                        break
+                    stop.wait(poll_interval)
+        finally:
+            connection.close()
+        return tuple(totals)
+
+
+def run_workers(concurrency, batch_size=10, poll_interval=1.0, drain=False, stop=None):
+    """Run `concurrency` worker threads until stop is set (or, with drain,
+    the queue is empty); returns (succeeded, failed) over all of them."""
+    stop = stop or threading.Event()
+    base = f'{socket.gethostname()}:{os.getpid()}'
+    results = []
+
+    def work(number):
+        worker = Worker(f'{base}:{number}', batch_size)
+        results.append(worker.run(stop, poll_interval, drain))
+
+    def requeue_expired():
+        interval = max(1.0, settings.JOBS['LEASE_SECONDS'] / 10)
+        worker = Worker(base)
+        try:
+            while not stop.wait(interval):
+                close_old_connections()
+                requeued = worker.requeue_expired()
+                if requeued:
+                    logger.warning('Requeued %d jobs whose worker stopped responding', requeued)
+        finally:
+            connection.close()
+
+    Worker(base).requeue_expired()
+    connection.close()
+    threads = [threading.Thread(target=work, args=(number,)) for number in range(concurrency)]
+    reaper = threading.Thread(target=requeue_expired, daemon=True)
+    reaper.start()
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    finally:
+        stop.set()
+    return sum(result[0] for result in results), sum(result[1] for result in results)
@@ -15,9 +15,9 @@ class AdminNoteInline(admin.TabularInline):
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ('order_id', 'user', 'status', 'total_amount', 'created_at')
+    list_display = ('order_id', 'customer_email', 'status', 'item_count', 'total_amount', 'created_at')
     list_filter = ('status', 'created_at')
-    search_fields = ('order_id', 'user__email')
+    search_fields = ('order_id', 'customer_email')
     inlines = [OrderItemInline, AdminNoteInline]
     readonly_fields = ('order_id', 'created_at', 'updated_at')
     ordering = ('-created_at',)
@@ -0,0 +1,41 @@
+from django.views.decorators.http import require_GET
+
+from ecommerce_api.async_views import authenticate, json_response
+from ecommerce_api.conditional import make_etag, not_modified, set_validators
+from .fast_serializers import aserialize_orders
+from .models import Order
+
+
+# Async (ASGI) versions of the order history views in orders.views; enable
+# them per route with settings.ASYNC_VIEWS.
+
+
+@require_GET
+async def get_user_orders(request):
+    """Get all orders for current user"""
+    user, error = await authenticate(request)
+    if error:
+        return error
+    summary = request.GET.get('summary', 'false').lower() == 'true'
+    orders = Order.objects.filter(user_id=user.pk)
+
+    count, linked, last_modified = await orders.aversion()
+    etag = make_etag('orders', user.pk, summary, count, linked, last_modified)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    data = await aserialize_orders(orders, summary=summary)
+    return set_validators(json_response(data), etag, last_modified)
+
+
+@require_GET
+async def get_order_by_id(request, pk):
+    """Get single order by ID"""
+    user, error = await authenticate(request)
+    if error:
+        return error
+    orders = await aserialize_orders(Order.objects.filter(pk=pk, user_id=user.pk))
+    if not orders:
+        return json_response({'message': 'Order not found'}, status=404)
+    return json_response(orders[0])
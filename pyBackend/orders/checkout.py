@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from products.models import Product
+from .models import Order, OrderItem
+
+
+class CheckoutError(Exception):
+    pass
+
+
+class ProductNotFound(CheckoutError):
+    def __init__(self, product_ids):
+        super().__init__('Product not found')
+        self.product_ids = product_ids
+
+
+class InsufficientStock(CheckoutError):
+    """Raised with one shortfall entry per SKU that cannot be fulfilled"""
+
+    def __init__(self, shortfalls):
+        first = shortfalls[0]
+        super().__init__(f"{first['name']} is out of stock. Available: {first['available']}")
+        self.shortfalls = shortfalls
+
+
+def _merge_quantities(items_data):
+    """Sum quantities per product id, keeping first-seen order"""
+    quantities = OrderedDict()
+    for item_data in items_data:
+        try:
+            product_id = int(item_data['product'])
+            quantity = int(item_data['quantity'])
+        except (KeyError, TypeError, ValueError):
+            raise CheckoutError('Each item needs a product and a quantity')
+        if quantity <= 0:
+            raise CheckoutError('Quantity must be at least 1')
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+def _shortfall(product, requested, available):
+    return {
+        'product': product.pk,
+        'name': product.name,
+        'requested': requested,
+        'available': available,
+    }
+
+
+def place_order(user, items_data, shipping_address):
+    """Reserve stock and create an order in a single transaction.
+
+    Products are loaded with one pk__in query and stock is decremented with
+    conditional UPDATE ... SET stock = stock - n WHERE stock >= n statements,
+    so concurrent checkouts can never oversell. If any SKU is short, nothing
+    is written and InsufficientStock lists every shortfall.
+    """
+    quantities = _merge_quantities(items_data)
+
+    products = Product.objects.in_bulk(quantities.keys())
+    missing = [pk for pk in quantities if pk not in products]
+    if missing:
+        raise ProductNotFound(missing)
+
+    # Fail fast on stock that is already gone before taking any write lock
+    shortfalls = [
+        _shortfall(products[pk], quantity, products[pk].stock)
+        for pk, quantity in quantities.items()
+        if products[pk].stock < quantity
+    ]
+    if shortfalls:
+        raise InsufficientStock(shortfalls)
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Lock rows in primary key order so concurrent orders cannot deadlock
+        for pk in sorted(quantities):
+            quantity = quantities[pk]
+            updated = Product.objects.filter(pk=pk, stock__gte=quantity).update(
+                stock=F('stock') - quantity, updated_at=now
+            )
+            if not updated:
+                available = Product.objects.filter(pk=pk).values_list('stock', flat=True).first()
+                shortfalls.append(_shortfall(products[pk], quantity, available or 0))
+
+        if shortfalls:
+            # Raising inside atomic() rolls back the decrements applied above
+            raise InsufficientStock(shortfalls)
+
+        total_amount = sum(
+            (Decimal(str(products[pk].price)) * quantity for pk, quantity in quantities.items()),
+            Decimal('0.00'),
+        )
+        order = Order.objects.create(
+            user=user,
+            customer_email=user.email,
+            customer_name=user.name,
+            item_count=len(quantities),
+            total_amount=total_amount,
+            shipping_address=shipping_address,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=products[pk],
+                product_name=products[pk].name,
+                quantity=quantity,
+                price=products[pk].price,
+            )
+            for pk, quantity in quantities.items()
+        ])
+    return order
@@ -0,0 +1,46 @@
+import csv
+
+
+ORDER_HEADER = ['Order ID', 'Customer Email', 'Total Amount', 'Status', 'Created At']
+ITEM_HEADER = ['Product Name', 'Quantity', 'Price']
+
+ORDER_FIELDS = ('order_id', 'customer_email', 'total_amount', 'status', 'created_at')
+
+
+class Echo:
+    """File-like object whose write() returns the value instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def _format(row):
+    row = list(row)
+    row[4] = row[4].strftime('%Y-%m-%d %H:%M:%S')
+    return row
+
+
+def iter_orders_csv(orders, include_items=False, chunk_size=2000):
+    """Yield CSV lines for an Order queryset without loading it into memory.
+
+    Rows come straight from values_list() on the orders table (the customer
+    email is copied onto each order), so no model instances are built and
+    there is no per-row query. With include_items, every order line item
+    gets its own row; the items are LEFT JOINed, so an order without items
+    still gets one row with empty item columns.
+    """
+    writer = csv.writer(Echo())
+
+    if not include_items:
+        yield writer.writerow(ORDER_HEADER)
+        rows = orders.values_list(*ORDER_FIELDS).iterator(chunk_size=chunk_size)
+        for row in rows:
+            yield writer.writerow(_format(row))
+        return
+
+    yield writer.writerow(ORDER_HEADER + ITEM_HEADER)
+    rows = orders.values_list(
+        *ORDER_FIELDS, 'items__product_name', 'items__quantity', 'items__price'
+    ).order_by('-created_at', 'pk', 'items__id').iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield writer.writerow(_format(row))
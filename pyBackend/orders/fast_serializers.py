@@ -0,0 +1,126 @@
+"""
+Plain-function serializers for orders, mirroring OrderSerializer and
+OrderSummarySerializer from .values() rows. See products.fast_serializers.
+"""
+from collections import defaultdict
+
+from ecommerce_api.profiling import timed
+from products.fast_serializers import PRODUCT_FIELDS, format_datetime, format_decimal, product_to_dict
+from .models import OrderItem, AdminNote
+
+
+ORDER_FIELDS = (
+    'id', 'order_id', 'user_id', 'customer_email', 'total_amount', 'status',
+    'shipping_address', 'created_at', 'updated_at',
+)
+
+ITEM_FIELDS = ('id', 'order_id', 'product_name', 'quantity', 'price') + tuple(
+    f'product__{field}' for field in PRODUCT_FIELDS
+)
+
+NOTE_FIELDS = ('id', 'order_id', 'note', 'created_at')
+
+
+def _product_summary(row):
+    images = row['product__images']
+    return {
+        'id': row['product__id'],
+        '_id': row['product__id'],
+        'name': row['product__name'],
+        'image': images[0] if images else None,
+    }
+
+
+def item_to_dict(row, summary=False):
+    if row['product__id'] is None:
+        product = None
+    elif summary:
+        product = _product_summary(row)
+    else:
+        product = product_to_dict(row, prefix='product__')
+    return {
+        'id': row['id'],
+        '_id': row['id'],
+        'product': product,
+        'product_name': row['product_name'],
+        'productName': row['product_name'],
+        'quantity': row['quantity'],
+        'price': float(format_decimal(row['price'])),
+    }
+
+
+def note_to_dict(row):
+    created_at = format_datetime(row['created_at'])
+    return {
+        'id': row['id'],
+        '_id': row['id'],
+        'note': row['note'],
+        'created_at': created_at,
+        'createdAt': created_at,
+    }
+
+
+def order_to_dict(row, items, notes):
+    created_at = format_datetime(row['created_at'])
+    updated_at = format_datetime(row['updated_at'])
+    return {
+        'id': row['id'],
+        '_id': row['id'],
+        'order_id': row['order_id'],
+        'orderId': row['order_id'],
+        'user': row['user_id'],
+        'user_email': row['customer_email'],
+        'total_amount': format_decimal(row['total_amount']),
+        'totalAmount': float(row['total_amount']),
+        'status': row['status'],
+        'shipping_address': row['shipping_address'],
+        'shippingAddress': row['shipping_address'],
+        'items': items,
+        'admin_notes': [note['id'] for note in notes],
+        'adminNotes': notes,
+        'created_at': created_at,
+        'createdAt': created_at,
+        'updated_at': updated_at,
+        'updatedAt': updated_at,
+    }
+
+
+def _item_rows(order_ids):
+    return OrderItem.objects.filter(order_id__in=order_ids).order_by('id').values(*ITEM_FIELDS)
+
+
+def _note_rows(order_ids):
+    return AdminNote.objects.filter(order_id__in=order_ids).values(*NOTE_FIELDS)
+
+
+@timed('serialize')
+def serialize_orders(orders, summary=False):
+    """Serialize an Order queryset in three queries (orders, items, notes)"""
+    rows = list(orders.values(*ORDER_FIELDS))
+    order_ids = [row['id'] for row in rows]
+
+    items = defaultdict(list)
+    for row in _item_rows(order_ids):
+        items[row['order_id']].append(item_to_dict(row, summary))
+
+    notes = defaultdict(list)
+    for row in _note_rows(order_ids):
+        notes[row['order_id']].append(note_to_dict(row))
+
+    return [order_to_dict(row, items[row['id']], notes[row['id']]) for row in rows]
+
+
+async def aserialize_orders(orders, summary=False):
+    """Async counterpart of serialize_orders"""
+    rows = [row async for row in orders.values(*ORDER_FIELDS)]
+    order_ids = [row['id'] for row in rows]
+
+    items = defaultdict(list)
+    async for row in _item_rows(order_ids):
+        items[row['order_id']].append(item_to_dict(row, summary))
+
+    notes = defaultdict(list)
+    async for row in _note_rows(order_ids):
+        notes[row['order_id']].append(note_to_dict(row))
+
+    return [order_to_dict(row, items[row['id']], notes[row['id']]) for row in rows]
@@ -0,0 +1,107 @@
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+
+
+# Custom epoch (2024-01-01 UTC) so 41 bits of milliseconds last until 2093
+EPOCH_MS = 1704067200000
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Crockford base32: no I, L, O or U, and sorts in the same order as the values
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+ENCODED_LENGTH = 13
+
+
+def encode(value):
+    """Fixed-width base32, so string order matches numeric order"""
+    chars = []
+    for _ in range(ENCODED_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def decode(text):
+    value = 0
+    for char in text:
+        value = value * 32 + ALPHABET.index(char)
+    return value
+
+
+class OrderIdGenerator:
+    """Snowflake-style order ids: milliseconds | node | sequence.
+
+    Ids from one generator strictly increase, and generators with different
+    node ids never produce the same id, so every worker process needs its
+    own node id. Because the ids are time-ordered, new orders are appended at
+    the right edge of the order_id index instead of landing on random pages.
+    """
+
+    def __init__(self, node=None, prefix='ORD-'):
+        self.prefix = prefix
+        self._fixed_node = node
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+        self._set_node()
+
+    def _set_node(self, node=None):
+        if node is None:
+            node = self._fixed_node if self._fixed_node is not None else os.getpid()
+        self.node = node & MAX_NODE
+
+    def after_fork(self):
+        # The parent's lock may have been held mid-fork, and the pid changed
+        self._lock = threading.Lock()
+        self._set_node()
+
+    def reroll(self):
+        """Switch to a random node id; used when another process shares ours"""
+        with self._lock:
+            self._set_node(random.SystemRandom().randrange(MAX_NODE + 1))
+
+    def next_int(self):
+        with self._lock:
+            now = int(time.time() * 1000) - EPOCH_MS
+            # Never go backwards, even if the wall clock does
+            if now <= self._last_ms:
+                now = self._last_ms
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # 4096 ids in this millisecond already; borrow the next one
+                    now += 1
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            return (now << (NODE_BITS + SEQUENCE_BITS)) | (self.node << SEQUENCE_BITS) | self._sequence
+
+    def next_id(self):
+        return self.prefix + encode(self.next_int())
+
+
+def parse_order_id(order_id, prefix='ORD-'):
+    """Split a generated order id into (timestamp ms, node, sequence)"""
+    value = decode(order_id[len(prefix):])
+    return (
+        (value >> (NODE_BITS + SEQUENCE_BITS)) + EPOCH_MS,
+        (value >> SEQUENCE_BITS) & MAX_NODE,
+        value & MAX_SEQUENCE,
+    )
+
+
+def build_order_id_generator():
+    """Create the order id generator from settings.ORDER_ID_NODE"""
+    return OrderIdGenerator(node=getattr(settings, 'ORDER_ID_NODE', None))
+
+
+order_ids = build_order_id_generator()
+
+if hasattr(os, 'register_at_fork'):
+    # Workers forked from a preloaded master must not share its node id
+    os.register_at_fork(after_in_child=order_ids.after_fork)
@@ -0,0 +1,38 @@
+import logging
+
+from .models import AdminNote
+from .stats import record_stats_change
+
+
+# Follow-up work for order changes, queued with jobs.queue.enqueue() by
+# Order.save(), the order delete signal and the order views, and run by the
+# jobs workers. Payloads carry the order's stats row (see
+# orders.stats.stats_row) as of the change, since the order may have moved
+# on or be gone by the time a job runs. Order events are logged to
+# 'orders.events'; attach a handler there to feed e-mail or analytics.
+
+events = logging.getLogger('orders.events')
+
+
+def order_created(payload):
+    record_stats_change(None, payload['stats'])
+    events.info('order_created %s total=%s', payload['orderId'], payload['stats'][2])
+
+
+def order_changed(payload):
+    old_row, new_row = payload['from'], payload['to']
+    record_stats_change(old_row, new_row)
+    if old_row[1] != new_row[1]:
+        events.info('order_status_changed %s %s -> %s', payload['orderId'], old_row[1], new_row[1])
+
+
+def order_deleted(payload):
+    record_stats_change(payload['stats'], None)
+    events.info('order_deleted %s', payload['orderId'])
+
+
+def admin_note_added(payload):
+    note = AdminNote.objects.select_related('order').filter(pk=payload['note']).first()
+    if note is None:
+        return
+    events.info('admin_note_added %s note=%s', note.order.order_id, note.pk)
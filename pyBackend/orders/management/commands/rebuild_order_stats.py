@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from orders.models import DailyOrderStats
+from orders.stats import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily_order_stats table from the orders table'
+
+    def handle(self, *args, **options):
+        rebuild_daily_stats()
+        total = DailyOrderStats.objects.count()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} daily stats rows'))
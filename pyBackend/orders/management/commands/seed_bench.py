@@ -0,0 +1,228 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from orders.models import Order, OrderItem, AdminNote
+from orders.stats import rebuild_daily_stats
+from products.cache import product_cache, response_cache
+from products.facets import rebuild_facet_counts
+from products.models import Product
+from users.models import User
+
+
+USER_EMAIL = 'bench-user-{}@example.com'
+ADMIN_EMAIL = 'bench-admin@example.com'
+PASSWORD = 'Bench@12345'
+PRODUCT_SLUG = 'bench-product-{}'
+ORDER_ID = 'ORD-BENCH-{:09d}'
+
+ADJECTIVES = ['Wireless', 'Smart', 'Portable', 'Ergonomic', 'Compact', 'Premium', 'Classic', 'Rugged', 'Slim', 'Eco']
+NOUNS = ['Headphones', 'Watch', 'Backpack', 'Keyboard', 'Mouse', 'Speaker', 'Lamp', 'Charger', 'Camera', 'Bottle']
+STATUS_WEIGHTS = {'Pending': 15, 'Processing': 10, 'Shipped': 15, 'Delivered': 50, 'Cancelled': 10}
+ADDRESS = {
+    'fullName': 'Bench Customer', 'address': '1 Benchmark Road', 'city': 'Testville',
+    'zipCode': '560001', 'country': 'India', 'phone': '9999999999',
+}
+
+
+def count(value):
+    """Parse 500, 500k or 5M"""
+    value = value.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1:], 1)
+    if multiplier != 1:
+        value = value[:-1]
+    return int(float(value) * multiplier)
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at values we set"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a large, deterministic benchmark dataset with bulk_create, '
+        'e.g. seed_bench --products 500k --users 200k --orders 5M'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=count, default=count('10k'))
+        parser.add_argument('--users', type=count, default=count('5k'))
+        parser.add_argument('--orders', type=count, default=count('50k'))
+        parser.add_argument('--max-items', type=int, default=4, help='line items per order, 1 to N')
+        parser.add_argument('--categories', type=int, default=40)
+        parser.add_argument('--days', type=int, default=365, help='spread created_at over this many days')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--clear', action='store_true', help='delete a previous benchmark dataset first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        # Timestamps are offsets from midnight so reruns on the same day match
+        self.anchor = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.span = options['days'] * 86400
+
+        existing = User.objects.filter(email=ADMIN_EMAIL).exists()
+        if existing and not options['clear']:
+            raise CommandError('A benchmark dataset already exists; rerun with --clear to replace it')
+        if existing:
+            self.clear()
+
+        started = time.monotonic()
+        self.seed_users(options['users'])
+        self.seed_products(options['products'], options['categories'])
+        self.seed_orders(options['orders'], options['max_items'])
+
+        self.stdout.write('Rebuilding facet counts and daily order stats...')
+        rebuild_facet_counts()
+        rebuild_daily_stats()
+        response_cache.invalidate()
+        if connection.vendor in ('sqlite', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {options["users"]} users, {options["products"]} products and '
+            f'{options["orders"]} orders in {time.monotonic() - started:.0f}s'
+        ))
+        self.stdout.write(f'Admin: {ADMIN_EMAIL} / {PASSWORD}')
+        self.stdout.write(f'Users: {USER_EMAIL.format(0)} ... / {PASSWORD}')
+
+    def timestamp(self):
+        return self.anchor - timedelta(seconds=self.rng.randrange(self.span))
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield range(start, min(start + self.batch_size, total))
+
+    def progress(self, label, done, total):
+        self.stdout.write(f'  {label}: {done}/{total}', ending='\r' if done < total else '\n')
+        self.stdout.flush()
+
+    def _delete_in_chunks(self, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
+        for start in range(0, len(pks), self.batch_size):
+            with transaction.atomic():
+                queryset.model.objects.filter(pk__in=pks[start:start + self.batch_size]).delete()
+        return pks
+
+    def clear(self):
+        self.stdout.write('Deleting previous benchmark dataset...')
+        self._delete_in_chunks(Order.objects.filter(order_id__startswith='ORD-BENCH-'))
+        # SQLite reuses freed rowids, so the new products may get these pks
+        product_cache.invalidate(self._delete_in_chunks(Product.objects.filter(slug__startswith='bench-product-')))
+        self._delete_in_chunks(User.objects.filter(email__startswith='bench-'))
+
+    def seed_users(self, total):
+        # Hash once: every benchmark account shares the same password
+        password = make_password(PASSWORD)
+        User.objects.create(email=ADMIN_EMAIL, name='Bench Admin', password=password, role='admin')
+        with explicit_timestamps(User):
+            for batch in self.batches(total):
+                users = []
+                for i in batch:
+                    joined = self.timestamp()
+                    users.append(User(
+                        email=USER_EMAIL.format(i), name=f'Bench User {i}', password=password,
+                        created_at=joined, updated_at=joined,
+                    ))
+                User.objects.bulk_create(users)
+                self.progress('users', batch.stop, total)
+        # user id -> (email, name), copied onto each order
+        self.customers = {
+            pk: (email, name)
+            for pk, email, name in User.objects.filter(email__startswith='bench-user-')
+            .order_by('pk').values_list('pk', 'email', 'name')
+        }
+        self.user_ids = list(self.customers)
+
+    def seed_products(self, total, categories):
+        with explicit_timestamps(Product):
+            for batch in self.batches(total):
+                products = []
+                for i in batch:
+                    created = self.timestamp()
+                    name = f'{self.rng.choice(ADJECTIVES)} {self.rng.choice(NOUNS)} {i}'
+                    products.append(Product(
+                        name=name, slug=PRODUCT_SLUG.format(i),
+                        description=f'{name} for benchmarking. ' * 3,
+                        price=Decimal(self.rng.randint(99, 99999)) / 100,
+                        category=f'Category {self.rng.randrange(categories)}',
+                        weight=Decimal(self.rng.randint(5, 500)) / 100,
+                        stock=self.rng.randint(0, 500),
+                        images=[f'https://picsum.photos/seed/{i}-{n}/500' for n in range(3)],
+                        is_deleted=self.rng.random() < 0.02,
+                        created_at=created, updated_at=created,
+                    ))
+                    if products[-1].is_deleted:
+                        products[-1].deleted_at = created
+                with transaction.atomic():
+                    Product.objects.bulk_create(products)
+                self.progress('products', batch.stop, total)
+        self.catalog = list(
+            Product.objects.filter(slug__startswith='bench-product-').order_by('pk').values_list('pk', 'name', 'price')
+        )
+
+    def seed_orders(self, total, max_items):
+        if not total:
+            return
+        if not self.user_ids or not self.catalog:
+            raise CommandError('Orders need at least one user and one product')
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+
+        with explicit_timestamps(Order, AdminNote):
+            for batch in self.batches(total):
+                orders, lines = [], []
+                for i in batch:
+                    picks = {self.rng.randrange(len(self.catalog)) for _ in range(self.rng.randint(1, max_items))}
+                    items = [(self.catalog[n], self.rng.randint(1, 3)) for n in sorted(picks)]
+                    created = self.timestamp()
+                    user_id = self.rng.choice(self.user_ids)
+                    email, name = self.customers[user_id]
+                    orders.append(Order(
+                        user_id=user_id,
+                        customer_email=email,
+                        customer_name=name,
+                        item_count=len(items),
+                        order_id=ORDER_ID.format(i),
+                        total_amount=sum(price * quantity for (_, _, price), quantity in items),
+                        status=self.rng.choices(statuses, weights)[0],
+                        shipping_address=ADDRESS,
+                        created_at=created,
+                        updated_at=created,
+                    ))
+                    lines.append(items)
+
+                with transaction.atomic():
+                    Order.objects.bulk_create(orders)
+                    OrderItem.objects.bulk_create([
+                        OrderItem(order=order, product_id=pk, product_name=name, quantity=quantity, price=price)
+                        for order, items in zip(orders, lines)
+                        for (pk, name, price), quantity in items
+                    ])
+                    AdminNote.objects.bulk_create([
+                        AdminNote(order=order, note='Customer called about delivery', created_at=order.created_at)
+                        for order in orders if self.rng.random() < 0.05
+                    ])
+                self.progress('orders', batch.stop, total)
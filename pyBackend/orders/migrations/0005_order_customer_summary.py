@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+from orders.summary import backfill_order_summaries
+
+
+def backfill(apps, schema_editor):
+    backfill_order_summaries(
+        apps.get_model('orders', 'Order'),
+        apps.get_model(settings.AUTH_USER_MODEL),
+        apps.get_model('orders', 'OrderItem'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    # The backfill commits batch by batch instead of in one long transaction
+    atomic = False
+
+    dependencies = [
+        ('orders', '0004_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='customer_email',
+            field=models.EmailField(blank=True, default='', max_length=254),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='customer_name',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        # Built after the backfill rather than maintained during it
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer_email'], name='orders_customer_email_idx'),
+        ),
+    ]
@@ -1,8 +1,51 @@
-from django.db import models
+from django.db import models, IntegrityError, transaction
+from django.db.models import Count, Max
 from django.conf import settings
+from django.utils import timezone
 from products.models import Product
-import random
-import string
+from .ids import order_ids
+
+
+# Inserts to try before giving up on a generated order_id
+ORDER_ID_ATTEMPTS = 3
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_details(self):
+        """Load everything OrderSerializer reads in a fixed number of queries"""
+        return self.prefetch_related(
+            models.Prefetch('items', queryset=OrderItem.objects.select_related('product')),
+            'admin_notes',
+        )
+
+    def version(self):
+        """Return (order count, linked product count, last modified), for ETags.
+
+        An order's JSON also embeds its items' products, so their
+        updated_at counts towards last modified. Linked products are
+        counted because archiving a product sets OrderItem.product to NULL
+        without touching any timestamp. (The customer's email and name are
+        copied onto the order, and User.save() bumps updated_at when they
+        change.)
+        """
+        return self._version(self.aggregate(**self._version_aggregates()))
+
+    async def aversion(self):
+        return self._version(await self.aaggregate(**self._version_aggregates()))
+
+    @staticmethod
+    def _version_aggregates():
+        return {
+            'count': Count('pk', distinct=True),
+            'linked': Count('items__product'),
+            'modified': Max('updated_at'),
+            'products_modified': Max('items__product__updated_at'),
+        }
+
+    @staticmethod
+    def _version(row):
+        stamps = [row[key] for key in ('modified', 'products_modified') if row[key]]
+        return row['count'], row['linked'], max(stamps, default=None)
 
 
 class Order(models.Model):
@@ -19,19 +62,67 @@ class Order(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
     shipping_address = models.JSONField()  # Store full address as JSON
+    # Copies of user.email, user.name and the number of line items, so the
+    # admin grid and search read the orders table alone. Kept in step by
+    # place_order() and User.save(); see orders.summary.
+    customer_email = models.EmailField(blank=True, default='')
+    customer_name = models.CharField(max_length=100, blank=True, default='')
+    item_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
         db_table = 'orders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='orders_user_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='orders_status_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='orders_created_idx'),
+            models.Index(fields=['customer_email'], name='orders_customer_email_idx'),
+        ]
 
     def save(self, *args, **kwargs):
-        if not self.order_id:
-            timestamp = str(int(self.created_at.timestamp() * 1000)) if self.created_at else str(int(__import__('time').time() * 1000))
-            random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-            self.order_id = f"ORD-{timestamp}-{random_str}"
-        super().save(*args, **kwargs)
+        from jobs.queue import enqueue
+        from .stats import stats_row, stored_stats_row
+
+        if not self.customer_email and self.user_id:
+            self.customer_email, self.customer_name = self.user.email, self.user.name
+        update_fields = kwargs.get('update_fields')
+        track_stats = update_fields is None or {'status', 'total_amount'} & set(update_fields)
+        with transaction.atomic():
+            adding = self._state.adding
+            old_row = stored_stats_row(self.pk) if track_stats and not adding else None
+            self._save_with_order_id(*args, **kwargs)
+            # Daily stats and order events are updated by a background job
+            if adding:
+                enqueue('orders.jobs.order_created', {
+                    'order': self.pk, 'orderId': self.order_id, 'stats': stats_row(self.created_at, self.status, self.total_amount),
+                })
+            elif track_stats:
+                new_row = stats_row(self.created_at, self.status, self.total_amount)
+                if old_row != new_row:
+                    enqueue('orders.jobs.order_changed', {
+                        'order': self.pk, 'orderId': self.order_id, 'from': old_row, 'to': new_row,
+                    })
+
+    def _save_with_order_id(self, *args, **kwargs):
+        if self.order_id:
+            return super().save(*args, **kwargs)
+
+        for attempt in range(ORDER_ID_ATTEMPTS):
+            self.order_id = order_ids.next_id()
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                conflict = Order.objects.filter(order_id=self.order_id).exists()
+                self.order_id = ''
+                if not conflict or attempt == ORDER_ID_ATTEMPTS - 1:
+                    raise
+                # Another process is generating ids with our node id
+                order_ids.reroll()
 
     def __str__(self):
         return self.order_id
@@ -60,5 +151,27 @@ class AdminNote(models.Model):
         db_table = 'admin_notes'
         ordering = ['-created_at']
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Notes are part of the order's JSON; bump it so its ETag changes
+            Order.objects.filter(pk=self.order_id).update(updated_at=timezone.now())
+
     def __str__(self):
         return f"Note for {self.order.order_id}"
+
+
+class DailyOrderStats(models.Model):
+    """Order count and revenue per day and status, maintained incrementally"""
+    date = models.DateField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'daily_order_stats'
+        ordering = ['-date']
+        unique_together = [('date', 'status')]
+
+    def __str__(self):
+        return f"{self.date} {self.status}: {self.order_count}"
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from ecommerce_api.profiling import ProfiledSerializerMixin
 from .models import Order, OrderItem, AdminNote
 from products.serializers import ProductSerializer
 
@@ -19,6 +20,21 @@ class OrderItemSerializer(serializers.ModelSerializer):
         return representation
 
 
+class ProductSummarySerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    _id = serializers.IntegerField(source='id', read_only=True)
+    name = serializers.CharField(read_only=True)
+    image = serializers.SerializerMethodField()
+
+    def get_image(self, product):
+        return product.images[0] if product.images else None
+
+
+class OrderItemSummarySerializer(OrderItemSerializer):
+    """Order item with only the product's id, name and first image"""
+    product = ProductSummarySerializer(read_only=True)
+
+
 class AdminNoteSerializer(serializers.ModelSerializer):
     _id = serializers.IntegerField(source='id', read_only=True)
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
@@ -29,12 +45,12 @@ class AdminNoteSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'createdAt']
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     _id = serializers.IntegerField(source='id', read_only=True)
     orderId = serializers.CharField(source='order_id', read_only=True)
     items = OrderItemSerializer(many=True, read_only=True)
     adminNotes = AdminNoteSerializer(many=True, read_only=True, source='admin_notes')
-    user_email = serializers.EmailField(source='user.email', read_only=True)
+    user_email = serializers.EmailField(source='customer_email', read_only=True)
     totalAmount = serializers.FloatField(source='total_amount', read_only=True)
     shippingAddress = serializers.JSONField(source='shipping_address', read_only=True)
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
@@ -52,6 +68,49 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', '_id', 'order_id', 'orderId', 'created_at', 'createdAt', 'updated_at', 'updatedAt']
 
 
+class OrderSummarySerializer(OrderSerializer):
+    """Lighter OrderSerializer for list views (?summary=true)"""
+    items = OrderItemSummarySerializer(many=True, read_only=True)
+
+
+class OrderGridSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
+    """One row of the admin order table, read from the orders table only"""
+    _id = serializers.IntegerField(source='id', read_only=True)
+    orderId = serializers.CharField(source='order_id', read_only=True)
+    user_email = serializers.EmailField(source='customer_email', read_only=True)
+    customerEmail = serializers.EmailField(source='customer_email', read_only=True)
+    customerName = serializers.CharField(source='customer_name', read_only=True)
+    itemCount = serializers.IntegerField(source='item_count', read_only=True)
+    totalAmount = serializers.FloatField(source='total_amount', read_only=True)
+    createdAt = serializers.DateTimeField(source='created_at', read_only=True)
+    updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            'id', '_id', 'order_id', 'orderId', 'user', 'user_email',
+            'customer_email', 'customerEmail', 'customer_name', 'customerName',
+            'item_count', 'itemCount', 'total_amount', 'totalAmount', 'status',
+            'created_at', 'createdAt', 'updated_at', 'updatedAt'
+        ]
+        read_only_fields = fields
+
+
+def wants_summary(request):
+    return request.GET.get('summary', 'false').lower() == 'true'
+
+
+def wants_grid(request):
+    return request.GET.get('view', '') == 'grid'
+
+
+def get_order_serializer_class(request):
+    """Pick the summary serializer when the client asks for ?summary=true"""
+    if wants_summary(request):
+        return OrderSummarySerializer
+    return OrderSerializer
+
+
 class OrderCreateSerializer(serializers.Serializer):
     items = serializers.ListField(child=serializers.DictField())
     shippingAddress = serializers.DictField(source='shipping_address')
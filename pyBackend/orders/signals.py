@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+from .models import Order
+from .stats import stats_row
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    """Take deleted orders out of the daily stats, including the ones a
+    queryset delete() or a deleted user cascades to"""
+    enqueue('orders.jobs.order_deleted', {
+        'order': instance.pk, 'orderId': instance.order_id,
+        'stats': stats_row(instance.created_at, instance.status, instance.total_amount),
+    })
@@ -0,0 +1,113 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ecommerce_api.counters import add_to_counter
+from .models import Order, DailyOrderStats
+
+
+def _windows(today):
+    """Start dates of the today / last 7 days / last 30 days windows"""
+    return {
+        'today': today,
+        'last7Days': today - timedelta(days=6),
+        'last30Days': today - timedelta(days=29),
+    }
+
+
+def _summarize(rows):
+    """Fold per-status aggregate rows into dashboard totals"""
+    summary = {
+        'total_orders': 0,
+        'by_status': {},
+        'revenue': Decimal('0'),
+        'revenue_windows': {'today': Decimal('0'), 'last7Days': Decimal('0'), 'last30Days': Decimal('0')},
+    }
+    for row in rows:
+        summary['total_orders'] += row['count'] or 0
+        summary['by_status'][row['status']] = row['count'] or 0
+        summary['revenue'] += row['total'] or 0
+        for window in summary['revenue_windows']:
+            summary['revenue_windows'][window] += row[window] or 0
+    return summary
+
+
+def daily_order_stats(today=None):
+    """Dashboard totals from the materialized daily_order_stats table.
+
+    One grouped query over (days x statuses) rows, so the cost does not grow
+    with the number of orders.
+    """
+    today = today or timezone.localdate()
+    windows = _windows(today)
+    # Rows emptied by status changes and deletes are left in place
+    rows = DailyOrderStats.objects.filter(order_count__gt=0).values('status').annotate(
+        count=Sum('order_count'),
+        total=Sum('revenue'),
+        **{
+            window: Sum('revenue', filter=Q(date__gte=start))
+            for window, start in windows.items()
+        }
+    ).order_by()
+    return _summarize(rows)
+
+
+def live_order_stats(today=None):
+    """Same totals as daily_order_stats, computed in one pass over orders"""
+    today = today or timezone.localdate()
+    windows = _windows(today)
+    rows = Order.objects.values('status').annotate(
+        count=Count('id'),
+        total=Sum('total_amount'),
+        **{
+            window: Sum('total_amount', filter=Q(created_at__gte=timezone.make_aware(datetime.combine(start, time.min))))
+            for window, start in windows.items()
+        }
+    ).order_by()
+    return _summarize(rows)
+
+
+def _apply(day, status, count, revenue):
+    add_to_counter(DailyOrderStats, {'date': day, 'status': status}, order_count=count, revenue=revenue)
+
+
+def stats_row(created_at, status, total_amount):
+    """[day, status, revenue] an order counts towards, in JSON-friendly form
+    so it can travel in a job payload"""
+    return [timezone.localdate(created_at).isoformat(), status, str(total_amount)]
+
+
+def stored_stats_row(pk):
+    """stats_row() of the order as currently stored"""
+    row = Order.objects.filter(pk=pk).values_list('created_at', 'status', 'total_amount').first()
+    return stats_row(*row) if row else None
+
+
+def record_stats_change(old_row, new_row):
+    """Move an order between stats rows; either side may be None for an
+    order that was created or deleted"""
+    if old_row == new_row:
+        return
+    if old_row is not None:
+        day, status, revenue = old_row
+        _apply(date.fromisoformat(day), status, -1, -Decimal(revenue))
+    if new_row is not None:
+        day, status, revenue = new_row
+        _apply(date.fromisoformat(day), status, 1, Decimal(revenue))
+
+
+def rebuild_daily_stats(order_model=Order, stats_model=DailyOrderStats):
+    """Recompute the daily stats table from the orders table"""
+    rows = order_model.objects.annotate(day=TruncDate('created_at')).values('day', 'status').annotate(
+        count=Count('id'), revenue=Sum('total_amount')
+    ).order_by()
+    with transaction.atomic():
+        stats_model.objects.all().delete()
+        stats_model.objects.bulk_create([
+            stats_model(date=row['day'], status=row['status'], order_count=row['count'], revenue=row['revenue'] or 0)
+            for row in rows
+        ], batch_size=1000)
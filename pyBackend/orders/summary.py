@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def sync_customer(user):
+    """Copy a user's email and name onto their orders after they change.
+
+    Bumps updated_at so the orders' ETags change with them.
+    """
+    from .models import Order
+
+    return (
+        Order.objects.filter(user=user)
+        .exclude(customer_email=user.email, customer_name=user.name)
+        .update(customer_email=user.email, customer_name=user.name, updated_at=timezone.now())
+    )
+
+
+def backfill_order_summaries(order_model, user_model, item_model, batch_size=10000):
+    """Fill customer_email, customer_name and item_count of every order.
+
+    Works through primary key ranges of batch_size orders, one UPDATE and
+    transaction per range, so no long lock is held on a large table. The
+    models are parameters so the migration can pass its historical ones.
+    """
+    user = user_model.objects.filter(pk=OuterRef('user_id'))
+    items = (
+        item_model.objects.filter(order=OuterRef('pk'))
+        .order_by().values('order').annotate(count=Count('pk')).values('count')
+    )
+    pks = order_model.objects.order_by('pk').values_list('pk', flat=True)
+    first, last = pks.first(), pks.last()
+    if first is None:
+        return 0
+    updated = 0
+    for start in range(first, last + 1, batch_size):
+        with transaction.atomic():
+            updated += order_model.objects.filter(pk__gte=start, pk__lt=start + batch_size).update(
+                customer_email=Subquery(user.values('email')[:1]),
+                customer_name=Subquery(user.values('name')[:1]),
+                item_count=Coalesce(Subquery(items), Value(0)),
+            )
+    return updated
@@ -1,3 +1,284 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from jobs.worker import Worker
+from products.cache import product_cache, response_cache
+from products.models import Product
+from tests.query_plans import QueryPlanAssertions, seed
+from users.models import User
+from .checkout import InsufficientStock, place_order
+from .models import AdminNote, Order, OrderItem
+from .stats import daily_order_stats, live_order_stats
+
+
+ADDRESS = {'fullName': 'Test', 'address': '1 Main St', 'city': 'X', 'zipCode': '1', 'country': 'X', 'phone': '1'}
+
+
+def create_orders(user, products, count):
+    for n in range(count):
+        order = Order.objects.create(user=user, total_amount=10, shipping_address=ADDRESS, item_count=len(products))
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, product_name=product.name, quantity=1, price=product.price)
+            for product in products
+        ])
+        if n % 2:
+            AdminNote.objects.create(order=order, note='Checked')
+
+
+def run_pending_jobs():
+    worker = Worker('test')
+    while jobs := worker.claim():
+        for job in jobs:
+            worker.run_job(job)
+
+
+class PlaceOrderTests(TestCase):
+    """Stock is reserved for every line of an order or for none of them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='buyer@example.com', name='Buyer', password='x')
+        cls.lamp = Product.objects.create(name='Lamp', description='d', price=10, category='C', stock=5)
+        cls.desk = Product.objects.create(name='Desk', description='d', price=90, category='C', stock=1)
+        cls.chair = Product.objects.create(name='Chair', description='d', price=40, category='C', stock=0)
+
+    def stock(self):
+        return dict(Product.objects.values_list('name', 'stock'))
+
+    def post(self, items):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.post('/api/orders/', {'items': items, 'shippingAddress': ADDRESS}, format='json')
+
+    def test_every_shortfall_is_listed(self):
+        response = self.post([
+            {'product': self.lamp.pk, 'quantity': 2},
+            {'product': self.desk.pk, 'quantity': 3},
+            {'product': self.chair.pk, 'quantity': 1},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['shortfalls'], [
+            {'product': self.desk.pk, 'name': 'Desk', 'requested': 3, 'available': 1},
+            {'product': self.chair.pk, 'name': 'Chair', 'requested': 1, 'available': 0},
+        ])
+        self.assertEqual(self.stock(), {'Lamp': 5, 'Desk': 1, 'Chair': 0})
+        self.assertFalse(Order.objects.exists())
+
+    def test_shortfall_during_reservation_rolls_back(self):
+        # Stock read before the transaction says there is enough; another
+        # checkout takes the desk before the conditional UPDATE runs
+        in_bulk = Product.objects.in_bulk
+
+        def stale_in_bulk(ids):
+            products = in_bulk(ids)
+            Product.objects.filter(pk=self.desk.pk).update(stock=0)
+            return products
+
+        with mock.patch.object(Product.objects, 'in_bulk', side_effect=stale_in_bulk):
+            with self.assertRaises(InsufficientStock) as raised:
+                place_order(self.user, [
+                    {'product': self.lamp.pk, 'quantity': 2},
+                    {'product': self.desk.pk, 'quantity': 1},
+                ], ADDRESS)
+        self.assertEqual(raised.exception.shortfalls, [
+            {'product': self.desk.pk, 'name': 'Desk', 'requested': 1, 'available': 0},
+        ])
+        self.assertEqual(self.stock()['Lamp'], 5)
+        self.assertFalse(Order.objects.exists())
+
+    def test_duplicate_lines_are_merged(self):
+        order = place_order(self.user, [
+            {'product': self.lamp.pk, 'quantity': 1},
+            {'product': self.desk.pk, 'quantity': 1},
+            {'product': self.lamp.pk, 'quantity': 2},
+        ], ADDRESS)
+        self.assertEqual(
+            list(order.items.order_by('pk').values_list('product_name', 'quantity')), [('Lamp', 3), ('Desk', 1)]
+        )
+        self.assertEqual((order.item_count, order.total_amount), (2, 120))
+        self.assertEqual(self.stock(), {'Lamp': 2, 'Desk': 0, 'Chair': 0})
+
+    def test_unknown_product(self):
+        response = self.post([{'product': self.lamp.pk, 'quantity': 1}, {'product': 999999, 'quantity': 1}])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.stock()['Lamp'], 5)
+
+    def test_caches_are_invalidated_on_commit(self):
+        with mock.patch.object(product_cache, 'invalidate') as invalidate, \
+                mock.patch.object(response_cache, 'invalidate') as invalidate_list:
+            with self.captureOnCommitCallbacks(execute=True):
+                order = place_order(self.user, [{'product': self.lamp.pk, 'quantity': 1}], ADDRESS)
+                invalidate.assert_not_called()
+                invalidate_list.assert_not_called()
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
+        invalidate.assert_called_with([self.lamp.pk])
+        invalidate_list.assert_called()
+
+
+class OrderListQueryCountTests(TestCase):
+    """Order lists issue the same number of queries whatever their length,
+    so nested items, products, notes and users are never loaded per row"""
+
+    @classmethod
+    def setUpTestData(cls):
+        products = [
+            Product.objects.create(name=f'Product {n}', description='d', price=5, category='C', stock=10)
+            for n in range(3)
+        ]
+        cls.admin = User.objects.create_user(email='admin@example.com', name='Admin', password='x', role='admin')
+        cls.few = User.objects.create_user(email='few@example.com', name='Few', password='x')
+        cls.many = User.objects.create_user(email='many@example.com', name='Many', password='x')
+        create_orders(cls.few, products, 2)
+        create_orders(cls.many, products, 12)
+
+    def get(self, user, url, queries):
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.assertNumQueries(queries):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_user_orders(self):
+        # version() aggregate, orders, items with products, admin notes
+        for user, count in [(self.few, 2), (self.many, 12)]:
+            self.assertEqual(len(self.get(user, '/api/orders/user/', 4)), count)
+            self.assertEqual(len(self.get(user, '/api/orders/user/?summary=true', 4)), count)
+
+    @override_settings(FAST_SERIALIZER_ENDPOINTS=[])
+    def test_user_orders_drf_serializers(self):
+        for user, count in [(self.few, 2), (self.many, 12)]:
+            self.assertEqual(len(self.get(user, '/api/orders/user/', 4)), count)
+
+    def test_all_orders(self):
+        # count, orders, items with products, admin notes
+        for limit in [2, 10]:
+            data = self.get(self.admin, f'/api/admin/orders/?limit={limit}', 4)
+            self.assertEqual(len(data['orders']), limit)
+            data = self.get(self.admin, f'/api/admin/orders/?limit={limit}&summary=true', 4)
+            self.assertEqual(len(data['orders']), limit)
+
+    def test_all_orders_grid(self):
+        for limit in [2, 10]:
+            data = self.get(self.admin, f'/api/admin/orders/?limit={limit}&view=grid', 2)
+            self.assertEqual(len(data['orders']), limit)
+
+
+class ExportTests(TestCase):
+    """The CSV export has a row for every order, with or without items"""
+
+    @classmethod
+    def setUpTestData(cls):
+        products = [
+            Product.objects.create(name=f'Product {n}', description='d', price=5, category='C', stock=10)
+            for n in range(2)
+        ]
+        cls.admin = User.objects.create_user(email='admin@example.com', name='Admin', password='x', role='admin')
+        create_orders(cls.admin, products, 2)
+        cls.empty = Order.objects.create(user=cls.admin, total_amount=0, shipping_address=ADDRESS)
+
+    def export(self, data):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post('/api/admin/orders/export/', data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [line.split(',') for line in b''.join(response.streaming_content).decode().splitlines()[1:]]
+
+    def test_orders(self):
+        self.assertEqual(len(self.export({})), 3)
+
+    def test_orders_with_items(self):
+        rows = self.export({'includeItems': True})
+        self.assertEqual(len(rows), 5)
+        self.assertEqual([row[5:] for row in rows if row[0] == self.empty.order_id], [['', '', '']])
+        self.assertEqual(sorted(row[5] for row in rows if row[5]), ['Product 0', 'Product 0', 'Product 1', 'Product 1'])
+
+
+class DailyOrderStatsTests(TestCase):
+    """daily_order_stats follows every way an order is written or deleted"""
+
+    @classmethod
+    def setUpTestData(cls):
+        products = [Product.objects.create(name='Product', description='d', price=5, category='C', stock=10)]
+        cls.first = User.objects.create_user(email='first@example.com', name='First', password='x')
+        cls.second = User.objects.create_user(email='second@example.com', name='Second', password='x')
+        create_orders(cls.first, products, 3)
+        create_orders(cls.second, products, 2)
+
+    def assertStatsMatch(self):
+        self.assertEqual(daily_order_stats(), live_order_stats())
+
+    def test_created(self):
+        self.assertEqual(daily_order_stats()['by_status'], {'Pending': 5})
+        self.assertStatsMatch()
+
+    def test_status_and_total_change(self):
+        order = Order.objects.filter(user=self.first).first()
+        order.status = 'Shipped'
+        order.total_amount = 25
+        order.save()
+        self.assertEqual(daily_order_stats()['by_status'], {'Pending': 4, 'Shipped': 1})
+        self.assertStatsMatch()
+
+    def test_save_without_stats_fields(self):
+        order = Order.objects.filter(user=self.first).first()
+        order.status = 'Shipped'
+        order.save(update_fields=['updated_at'])
+        self.assertEqual(daily_order_stats()['by_status'], {'Pending': 5})
+
+    def test_deleted(self):
+        Order.objects.filter(user=self.first).first().delete()
+        self.assertStatsMatch()
+        Order.objects.filter(user=self.first).delete()
+        self.assertStatsMatch()
+        self.second.delete()
+        self.assertEqual(daily_order_stats()['total_orders'], 0)
+        self.assertStatsMatch()
+
+    @override_settings(JOBS={**settings.JOBS, 'INLINE': False})
+    def test_queued(self):
+        order = Order.objects.filter(user=self.second).first()
+        order.status = 'Cancelled'
+        order.save()
+        self.first.delete()
+        run_pending_jobs()
+        self.assertEqual(daily_order_stats()['by_status'], {'Pending': 1, 'Cancelled': 1})
+        self.assertStatsMatch()
+
+
+class OrderQueryPlanTests(QueryPlanAssertions, TestCase):
+    """The order lists and dashboard read orders through their indexes. The
+    admin search (?search=) is a substring match on order id and email, which
+    is a scan by design, so it is not checked"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.customer = seed(products=2000, users=200, orders=5000)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_user_orders(self):
+        client = self.client_for(self.customer)
+        for url in ['/api/orders/user/', '/api/orders/user/?summary=true']:
+            with self.subTest(url=url):
+                self.assertNoFullScans(client, url)
+
+    def test_all_orders(self):
+        client = self.client_for(self.admin)
+        for url in [
+            '/api/admin/orders/',
+            '/api/admin/orders/?status=Pending',
+            '/api/admin/orders/?status=Shipped&cursor=',
+            '/api/admin/orders/?page=3&summary=true',
+        ]:
+            with self.subTest(url=url):
+                self.assertNoFullScans(client, url)
+
+    def test_dashboard_stats(self):
+        self.assertNoFullScans(self.client_for(self.admin), '/api/admin/orders/dashboard/stats/')
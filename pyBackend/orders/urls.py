@@ -1,9 +1,13 @@
 from django.urls import path
-from . import views
+from ecommerce_api.async_views import select_view
+from . import views, async_views
+
+get_user_orders = select_view('get_user_orders', views.get_user_orders, async_views.get_user_orders)
+get_order_by_id = select_view('get_order_by_id', views.get_order_by_id, async_views.get_order_by_id)
 
 urlpatterns = [
     path('', views.create_order, name='create_order'),
-    path('user/', views.get_user_orders, name='get_user_orders'),
-    path('user', views.get_user_orders, name='get_user_orders_no_slash'),
-    path('<int:pk>/', views.get_order_by_id, name='get_order_by_id'),
+    path('user/', get_user_orders, name='get_user_orders'),
+    path('user', get_user_orders, name='get_user_orders_no_slash'),
+    path('<int:pk>/', get_order_by_id, name='get_order_by_id'),
 ]
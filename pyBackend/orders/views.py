@@ -3,13 +3,23 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.core.paginator import Paginator
-from django.db.models import Q, Sum, Count
-from django.http import HttpResponse
-from .models import Order, OrderItem, AdminNote
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from .models import Order, AdminNote
 from products.models import Product
-from .serializers import OrderSerializer, OrderCreateSerializer, AdminNoteSerializer
-import csv
-from decimal import Decimal
+from ecommerce_api.conditional import make_etag, not_modified, set_validators
+from ecommerce_api.pagination import paginate_by_cursor, InvalidCursor
+from .checkout import place_order, CheckoutError, ProductNotFound, InsufficientStock
+from .stats import daily_order_stats
+from .export import iter_orders_csv
+from .serializers import (
+    OrderSerializer, OrderCreateSerializer, AdminNoteSerializer, OrderGridSerializer,
+    get_order_serializer_class, wants_summary, wants_grid,
+)
+from .fast_serializers import serialize_orders
+from products.fast_serializers import use_fast_serializers
+from jobs.queue import enqueue
 
 
 @api_view(['POST'])
@@ -25,54 +35,19 @@ def create_order(request):
         items_data = serializer.validated_data['items']
         shipping_address = serializer.validated_data['shipping_address']
         
-        # Calculate total and validate stock
-        total_amount = Decimal('0.00')
-        order_items = []
-        
-        for item_data in items_data:
-            try:
-                product = Product.objects.get(pk=item_data['product'])
-                
-                if product.stock < item_data['quantity']:
-                    return Response({
-                        'message': f'{product.name} is out of stock. Available: {product.stock}'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-                
-                item_total = Decimal(str(product.price)) * item_data['quantity']
-                total_amount += item_total
-                
-                order_items.append({
-                    'product': product,
-                    'product_name': product.name,
-                    'quantity': item_data['quantity'],
-                    'price': product.price
-                })
-                
-            except Product.DoesNotExist:
-                return Response({'message': f'Product not found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        # Create order
-        order = Order.objects.create(
-            user=request.user,
-            total_amount=total_amount,
-            shipping_address=shipping_address
-        )
-        
-        # Create order items and update stock
-        for item_data in order_items:
-            OrderItem.objects.create(
-                order=order,
-                product=item_data['product'],
-                product_name=item_data['product_name'],
-                quantity=item_data['quantity'],
-                price=item_data['price']
-            )
-            
-            # Update stock
-            product = item_data['product']
-            product.stock -= item_data['quantity']
-            product.save()
+        try:
+            order = place_order(request.user, items_data, shipping_address)
+        except ProductNotFound:
+            return Response({'message': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+        except InsufficientStock as e:
+            return Response({
+                'message': str(e),
+                'shortfalls': e.shortfalls
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except CheckoutError as e:
+            return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
+        order = Order.objects.with_details().get(pk=order.pk)
         serializer = OrderSerializer(order)
         return Response({'order': serializer.data}, status=status.HTTP_201_CREATED)
     
@@ -84,9 +59,22 @@ def create_order(request):
 @permission_classes([IsAuthenticated])
 def get_user_orders(request):
     """Get all orders for current user"""
-    orders = Order.objects.filter(user=request.user).prefetch_related('items', 'admin_notes')
-    serializer = OrderSerializer(orders, many=True)
-    return Response(serializer.data)
+    orders = Order.objects.filter(user=request.user)
+    summary = wants_summary(request)
+    
+    # Conditional GET: one aggregate instead of loading and serializing the history
+    count, linked, last_modified = orders.version()
+    etag = make_etag('orders', request.user.pk, summary, count, linked, last_modified)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    
+    if use_fast_serializers('get_user_orders'):
+        data = serialize_orders(orders, summary=summary)
+    else:
+        serializer_class = get_order_serializer_class(request)
+        data = serializer_class(orders.with_details(), many=True).data
+    return set_validators(Response(data), etag, last_modified)
 
 
 @api_view(['GET'])
@@ -94,7 +82,7 @@ def get_user_orders(request):
 def get_order_by_id(request, pk):
     """Get single order by ID"""
     try:
-        order = Order.objects.get(pk=pk, user=request.user)
+        order = Order.objects.with_details().get(pk=pk, user=request.user)
         serializer = OrderSerializer(order)
         return Response(serializer.data)
     except Order.DoesNotExist:
@@ -109,13 +97,20 @@ def get_all_orders(request):
     if request.user.role != 'admin':
         return Response({'message': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
     
-    orders = Order.objects.all().prefetch_related('items', 'admin_notes')
+    # ?view=grid: just the columns of the admin order table, from the
+    # orders table alone (no items, notes or products)
+    if wants_grid(request):
+        orders = Order.objects.all()
+        serializer_class = OrderGridSerializer
+    else:
+        orders = Order.objects.with_details()
+        serializer_class = get_order_serializer_class(request)
     
     # Search by order ID or customer email
     search = request.GET.get('search', '')
     if search:
         orders = orders.filter(
-            Q(order_id__icontains=search) | Q(user__email__icontains=search)
+            Q(order_id__icontains=search) | Q(customer_email__icontains=search)
         )
     
     # Filter by status
@@ -127,10 +122,19 @@ def get_all_orders(request):
     page = int(request.GET.get('page', 1))
     limit = int(request.GET.get('limit', 10))
     
+    # Cursor (keyset) pagination - opt in with ?cursor=
+    if 'cursor' in request.GET:
+        try:
+            page_items, pagination = paginate_by_cursor(orders, request.GET['cursor'], limit)
+        except InvalidCursor:
+            return Response({'message': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = serializer_class(page_items, many=True)
+        return Response({'orders': serializer.data, 'pagination': pagination})
+    
     paginator = Paginator(orders, limit)
     page_obj = paginator.get_page(page)
     
-    serializer = OrderSerializer(page_obj, many=True)
+    serializer = serializer_class(page_obj, many=True)
     
     return Response({
         'orders': serializer.data,
@@ -151,7 +155,7 @@ def get_admin_order_by_id(request, pk):
         return Response({'message': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
     
     try:
-        order = Order.objects.get(pk=pk)
+        order = Order.objects.with_details().get(pk=pk)
         serializer = OrderSerializer(order)
         return Response({'order': serializer.data})
     except Order.DoesNotExist:
@@ -166,13 +170,14 @@ def update_order_status(request, pk):
         return Response({'message': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
     
     try:
-        order = Order.objects.get(pk=pk)
+        order = Order.objects.with_details().get(pk=pk)
         new_status = request.data.get('status')
         
         if new_status not in dict(Order.STATUS_CHOICES):
             return Response({'message': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
         
         order.status = new_status
+        # Order.save() queues the stats update and the status event
         order.save()
         
         serializer = OrderSerializer(order)
@@ -195,7 +200,9 @@ def add_admin_note(request, pk):
         if not note_text:
             return Response({'message': 'Note is required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        note = AdminNote.objects.create(order=order, note=note_text)
+        with transaction.atomic():
+            note = AdminNote.objects.create(order=order, note=note_text)
+            enqueue('orders.jobs.admin_note_added', {'note': note.pk})
         serializer = AdminNoteSerializer(note)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     except Order.DoesNotExist:
@@ -209,15 +216,13 @@ def get_dashboard_stats(request):
     if request.user.role != 'admin':
         return Response({'message': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
     
-    total_orders = Order.objects.count()
-    pending_orders = Order.objects.filter(status='Pending').count()
-    total_revenue = Order.objects.aggregate(total=Sum('total_amount'))['total'] or 0
-    total_products = Product.objects.filter(is_deleted=False).count()
+    stats = daily_order_stats()
+    total_products = Product.active.count()
     
     # Orders by status - format as array to match Express API
     orders_by_status = []
     for status_choice, _ in Order.STATUS_CHOICES:
-        count = Order.objects.filter(status=status_choice).count()
+        count = stats['by_status'].get(status_choice, 0)
         if count > 0:  # Only include statuses with orders
             orders_by_status.append({
                 '_id': status_choice,
@@ -225,15 +230,15 @@ def get_dashboard_stats(request):
             })
     
     # Recent orders
-    recent_orders = Order.objects.select_related('user').order_by('-created_at')[:5]
+    recent_orders = Order.objects.order_by('-created_at')[:5]
     recent_orders_data = []
     for order in recent_orders:
         recent_orders_data.append({
             '_id': str(order.id),
             'order_id': order.order_id,
             'user': {
-                'name': order.user.name,
-                'email': order.user.email
+                'name': order.customer_name,
+                'email': order.customer_email
             },
             'totalAmount': float(order.total_amount),
             'status': order.status,
@@ -241,9 +246,12 @@ def get_dashboard_stats(request):
         })
     
     return Response({
-        'totalOrders': total_orders,
-        'pendingOrders': pending_orders,
-        'totalRevenue': float(total_revenue),
+        'totalOrders': stats['total_orders'],
+        'pendingOrders': stats['by_status'].get('Pending', 0),
+        'totalRevenue': float(stats['revenue']),
+        'revenueToday': float(stats['revenue_windows']['today']),
+        'revenueLast7Days': float(stats['revenue_windows']['last7Days']),
+        'revenueLast30Days': float(stats['revenue_windows']['last30Days']),
         'totalProducts': total_products,
         'ordersByStatus': orders_by_status,
         'recentOrders': recent_orders_data
@@ -264,19 +272,11 @@ def export_orders_csv(request):
     else:
         orders = Order.objects.all()
     
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="orders.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Order ID', 'Customer Email', 'Total Amount', 'Status', 'Created At'])
-    
-    for order in orders:
-        writer.writerow([
-            order.order_id,
-            order.user.email,
-            order.total_amount,
-            order.status,
-            order.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        ])
+    include_items = str(request.data.get('includeItems', 'false')).lower() == 'true'
     
+    response = StreamingHttpResponse(
+        iter_orders_csv(orders, include_items=include_items),
+        content_type='text/csv'
+    )
+    response['Content-Disposition'] = 'attachment; filename="orders.csv"'
     return response
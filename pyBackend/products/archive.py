@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Product, ArchivedProduct
+
+
+ARCHIVE_FIELDS = [
+    'id', 'name', 'slug', 'description', 'price', 'category', 'weight',
+    'stock', 'images', 'created_at', 'updated_at', 'deleted_at',
+]
+
+
+def archivable_products(days=None, now=None):
+    """Soft-deleted products whose deletion is older than the cutoff"""
+    if days is None:
+        days = settings.PRODUCT_ARCHIVE_AFTER_DAYS
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return Product.objects.filter(is_deleted=True, deleted_at__lt=cutoff)
+
+
+def archive_deleted_products(days=None, batch_size=1000, now=None):
+    """Move long-deleted products to archived_products in batches.
+
+    Each batch is copied and removed in one transaction. Deleting the
+    product sets OrderItem.product to NULL; the item keeps its
+    product_name/price snapshot; the product queryset's delete() updates
+    the facet counters and invalidates the product caches. Returns the
+    number of products archived.
+    """
+    queryset = archivable_products(days, now).order_by('deleted_at', 'pk')
+    archived = 0
+    while True:
+        with transaction.atomic():
+            rows = list(queryset.select_for_update().values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                break
+            ArchivedProduct.objects.bulk_create([ArchivedProduct(**row) for row in rows])
+            Product.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        archived += len(rows)
+    return archived
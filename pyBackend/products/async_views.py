@@ -0,0 +1,100 @@
+import math
+
+from asgiref.sync import sync_to_async
+from django.views.decorators.http import require_GET
+
+from ecommerce_api.async_views import json_response
+from ecommerce_api.conditional import make_etag, not_modified, row_versions, set_validators
+from ecommerce_api.pagination import paginate_by_cursor, InvalidCursor
+from .cache import product_cache, response_cache
+from .detail import aload_product, aresolve_slug
+from .fast_serializers import PRODUCT_FIELDS, aserialize_products, serialize_products
+from .models import Product
+from .search import search_products
+
+
+# Async (ASGI) versions of the public catalog views in products.views.
+# They return the same JSON and share the response cache; enable them per
+# route with settings.ASYNC_VIEWS.
+
+
+@require_GET
+async def get_products(request):
+    """Get all products with search, filter, and pagination"""
+    search = request.GET.get('search', '').strip()
+    category = request.GET.get('category', '')
+    page = int(request.GET.get('page', 1))
+    limit = int(request.GET.get('limit', 10))
+    cursor = request.GET.get('cursor')
+
+    cache_key = await response_cache.amake_key(
+        'list', search=search.lower(), category=category, page=page, limit=limit, cursor=cursor
+    )
+    cached = await response_cache.aget(cache_key)
+    if cached is not None:
+        etag, last_modified, data = cached
+        return not_modified(request, etag, last_modified) or set_validators(json_response(data), etag, last_modified)
+
+    products = Product.active.all()
+    if search:
+        products = search_products(products, search)
+    if category:
+        products = products.filter(category=category)
+
+    if cursor is not None:
+        try:
+            page_items, pagination = await sync_to_async(paginate_by_cursor)(
+                products.values(*PRODUCT_FIELDS), cursor, limit
+            )
+        except InvalidCursor:
+            return json_response({'message': 'Invalid cursor'}, status=400)
+        versions, last_modified = row_versions(page_items)
+        etag = make_etag('products', search.lower(), category, limit, cursor, pagination, versions)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        data = {'products': serialize_products(page_items), 'pagination': pagination}
+        await response_cache.aset(cache_key, (etag, last_modified, data))
+        return set_validators(json_response(data), etag, last_modified)
+
+    total, last_modified = await products.aversion()
+    etag = make_etag('products', search.lower(), category, page, limit, total, last_modified)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    # Same page clamping as Paginator.get_page()
+    pages = max(1, math.ceil(total / limit))
+    page_number = page if 1 <= page <= pages else pages
+    offset = (page_number - 1) * limit
+
+    data = {
+        'products': await aserialize_products(products[offset:offset + limit]),
+        'pagination': {
+            'page': page,
+            'limit': limit,
+            'total': total,
+            'pages': pages
+        }
+    }
+    await response_cache.aset(cache_key, (etag, last_modified, data))
+    return set_validators(json_response(data), etag, last_modified)
+
+
+def _detail_response(request, cached):
+    if cached is None:
+        return json_response({'message': 'Product not found'}, status=404)
+    etag, last_modified, data = cached
+    return not_modified(request, etag, last_modified) or set_validators(json_response(data), etag, last_modified)
+
+
+@require_GET
+async def get_product_by_id(request, pk):
+    """Get single product by ID"""
+    return _detail_response(request, await product_cache.aget(pk, aload_product))
+
+
+@require_GET
+async def get_product_by_slug(request, slug):
+    """Get single product by slug"""
+    return _detail_response(request, await product_cache.aget_by_slug(slug, aresolve_slug, aload_product))
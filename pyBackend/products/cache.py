@@ -0,0 +1,497 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class LRUBackend:
+    """Bounded in-process LRU store with per-entry TTL"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._version = 1
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def get_version(self):
+        return self._version
+
+    # In-process, so nothing to wait for
+    async def aget(self, key):
+        return self.get(key)
+
+    async def aset(self, key, value, timeout=None):
+        self.set(key, value, timeout)
+
+    async def aget_version(self):
+        return self.get_version()
+
+    def incr_version(self):
+        with self._lock:
+            self._version += 1
+            # Entries stamped with older versions can never be hit again
+            self._data.clear()
+            return self._version
+
+    def size(self):
+        return len(self._data)
+
+
+class DjangoCacheBackend:
+    """Store backed by a CACHES alias (file, Redis, memcached...).
+
+    The version counter lives in the shared cache so a bump from one worker
+    invalidates every worker's entries.
+    """
+
+    version_key = 'products:cache-version'
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+        self.evictions = None
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.cache.set(key, value, timeout)
+
+    def get_version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            self.cache.add(self.version_key, 1, None)
+            version = self.cache.get(self.version_key, 1)
+        return version
+
+    async def aget(self, key):
+        return await self.cache.aget(key)
+
+    async def aset(self, key, value, timeout=None):
+        await self.cache.aset(key, value, timeout)
+
+    async def aget_version(self):
+        version = await self.cache.aget(self.version_key)
+        if version is None:
+            await self.cache.aadd(self.version_key, 1, None)
+            version = await self.cache.aget(self.version_key, 1)
+        return version
+
+    def incr_version(self):
+        try:
+            return self.cache.incr(self.version_key)
+        except ValueError:
+            self.cache.add(self.version_key, 2, None)
+            return self.cache.get(self.version_key)
+
+    def size(self):
+        return None
+
+
+class ResponseCache:
+    """Read-through cache for serialized catalog responses.
+
+    Keys are stamped with a catalog version; invalidate() bumps the version
+    so every cached list and detail response goes stale at once.
+    """
+
+    def __init__(self, backend, timeout=300, prefix='products'):
+        self.backend = backend
+        self.timeout = timeout
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, version, view, params):
+        normalized = '&'.join(f'{name}={params[name]}' for name in sorted(params))
+        return f'{self.prefix}:v{version}:{view}:{normalized}'
+
+    def make_key(self, view, **params):
+        return self._key(self.backend.get_version(), view, params)
+
+    async def amake_key(self, view, **params):
+        return self._key(await self.backend.aget_version(), view, params)
+
+    def _count(self, value):
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get(self, key):
+        return self._count(self.backend.get(key))
+
+    async def aget(self, key):
+        return self._count(await self.backend.aget(key))
+
+    def _timeout(self):
+        """Timeout for a new entry; 0 means do not store it"""
+        from ecommerce_api.replicas import read_from_replica
+
+        timeout = self.timeout
+        if read_from_replica():
+            # A lagging replica can return rows from before the last
+            # invalidate(), which would be cached under the new version
+            cap = settings.REPLICA_ROUTING['CACHE_TIMEOUT']
+            timeout = min(timeout, cap) if timeout else cap
+        return timeout
+
+    def set(self, key, value):
+        timeout = self._timeout()
+        if timeout:
+            self.backend.set(key, value, timeout)
+
+    async def aset(self, key, value):
+        timeout = self._timeout()
+        if timeout:
+            await self.backend.aset(key, value, timeout)
+
+    def invalidate(self):
+        self.backend.incr_version()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.backend.evictions,
+            'size': self.backend.size(),
+            'version': self.backend.get_version(),
+        }
+
+
+class SingleFlight:
+    """Coalesces concurrent loads of the same key.
+
+    The first caller of do(key, function) runs function; callers arriving
+    for the key while it runs wait for it and get its result (or its
+    exception) instead of running their own copy. ado() does the same for
+    coroutine functions, among callers on the same event loop.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event()}
+            else:
+                self.coalesced += 1
+        if not leader:
+            call['done'].wait()
+            if 'error' in call:
+                raise call['error']
+            return call['result']
+        try:
+            call['result'] = function()
+            return call['result']
+        except BaseException as error:
+            call['error'] = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+
+    async def ado(self, key, function):
+        # Futures belong to one loop; under WSGI each request has its own
+        loop = asyncio.get_running_loop()
+        key = (loop, key)
+        future = self._futures.get(key)
+        if future is not None:
+            self.coalesced += 1
+            result, error = await asyncio.shield(future)
+            if error is not None:
+                raise error
+            return result
+        future = self._futures[key] = loop.create_future()
+        try:
+            result = await function()
+        except BaseException as error:
+            future.set_result((None, error))
+            raise
+        else:
+            future.set_result((result, None))
+            return result
+        finally:
+            del self._futures[key]
+
+
+class ProductDetailCache:
+    """Two-tier cache of product detail responses, by pk and by slug.
+
+    A small per-process LRUBackend with a short TTL sits in front of a
+    CACHES alias shared by all workers. Concurrent misses on one product
+    are coalesced into a single load per process.
+
+    invalidate(pks) drops single products rather than the whole catalog.
+    Every shared entry carries the product's stamp as it was before the
+    load. Invalidating sets a new stamp, so a load that raced with a write
+    cannot bring the old row back. Other processes' local copies can lag by
+    up to local_timeout seconds.
+
+    load(pk) returns (slug, value), or None when there is no such product.
+    Slugs are resolved to pks with resolve(slug) and the mapping is cached
+    too; it is ignored once the product's slug no longer matches.
+    """
+
+    def __init__(self, local, shared, timeout=3600, local_timeout=5, prefix='product-detail'):
+        self.local = local
+        self.shared = shared
+        self.timeout = timeout
+        self.local_timeout = local_timeout
+        self.prefix = prefix
+        self.flight = SingleFlight()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _key(self, pk):
+        return f'{self.prefix}:{pk}'
+
+    def _stamp_key(self, pk):
+        return f'{self.prefix}:{pk}:stamp'
+
+    def _slug_key(self, slug):
+        return f'{self.prefix}:slug:{slug}'
+
+    def _cached(self, pk):
+        """(slug, value) of a cached product, or None"""
+        key, stamp_key = self._key(pk), self._stamp_key(pk)
+        entry = self.local.get(key)
+        if entry is not None:
+            self.local_hits += 1
+            return entry
+        stored = self.shared.get_many([key, stamp_key])
+        if key in stored and stored[key][0] == stored.get(stamp_key):
+            self.shared_hits += 1
+            entry = stored[key][1:]
+            self.local.set(key, entry, self.local_timeout)
+            return entry
+        return None
+
+    async def _acached(self, pk):
+        key, stamp_key = self._key(pk), self._stamp_key(pk)
+        entry = self.local.get(key)
+        if entry is not None:
+            self.local_hits += 1
+            return entry
+        stored = await self.shared.aget_many([key, stamp_key])
+        if key in stored and stored[key][0] == stored.get(stamp_key):
+            self.shared_hits += 1
+            entry = stored[key][1:]
+            self.local.set(key, entry, self.local_timeout)
+            return entry
+        return None
+
+    def _stamp(self, pk):
+        """The product's current stamp, created on first use"""
+        stamp_key = self._stamp_key(pk)
+        self.shared.add(stamp_key, uuid.uuid4().hex, None)
+        return self.shared.get(stamp_key)
+
+    async def _astamp(self, pk):
+        stamp_key = self._stamp_key(pk)
+        await self.shared.aadd(stamp_key, uuid.uuid4().hex, None)
+        return await self.shared.aget(stamp_key)
+
+    def _store(self, pk, stamp, entry):
+        if self.timeout:
+            self.shared.set(self._key(pk), (stamp, *entry), self.timeout)
+            # Skip the local copy too if the product changed during the load
+            if self.shared.get(self._stamp_key(pk)) == stamp:
+                self.local.set(self._key(pk), entry, self.local_timeout)
+
+    async def _astore(self, pk, stamp, entry):
+        if self.timeout:
+            await self.shared.aset(self._key(pk), (stamp, *entry), self.timeout)
+            if await self.shared.aget(self._stamp_key(pk)) == stamp:
+                self.local.set(self._key(pk), entry, self.local_timeout)
+
+    def _cached_pk(self, slug):
+        key = self._slug_key(slug)
+        pk = self.local.get(key)
+        if pk is None:
+            pk = self.shared.get(key)
+            if pk is not None:
+                self.local.set(key, pk, self.local_timeout)
+        return pk
+
+    async def _acached_pk(self, slug):
+        key = self._slug_key(slug)
+        pk = self.local.get(key)
+        if pk is None:
+            pk = await self.shared.aget(key)
+            if pk is not None:
+                self.local.set(key, pk, self.local_timeout)
+        return pk
+
+    def _remember_pk(self, slug, pk):
+        if self.timeout:
+            self.shared.set(self._slug_key(slug), pk, self.timeout)
+            self.local.set(self._slug_key(slug), pk, self.local_timeout)
+
+    async def _aremember_pk(self, slug, pk):
+        if self.timeout:
+            await self.shared.aset(self._slug_key(slug), pk, self.timeout)
+            self.local.set(self._slug_key(slug), pk, self.local_timeout)
+
+    def _load(self, pk, load):
+        # Another caller may have filled it while this one waited
+        entry = self._cached(pk)
+        if entry is None:
+            stamp = self._stamp(pk)  # before the read, see the class docstring
+            entry = load(pk)
+            if entry is not None:
+                self._store(pk, stamp, entry)
+        return entry
+
+    async def _aload(self, pk, load):
+        entry = await self._acached(pk)
+        if entry is None:
+            stamp = await self._astamp(pk)
+            entry = await load(pk)
+            if entry is not None:
+                await self._astore(pk, stamp, entry)
+        return entry
+
+    def _entry(self, pk, load):
+        entry = self._cached(pk)
+        if entry is None:
+            self.misses += 1
+            entry = self.flight.do(self._key(pk), lambda: self._load(pk, load))
+        return entry
+
+    async def _aentry(self, pk, load):
+        entry = await self._acached(pk)
+        if entry is None:
+            self.misses += 1
+            entry = await self.flight.ado(self._key(pk), lambda: self._aload(pk, load))
+        return entry
+
+    def get(self, pk, load):
+        """The cached value for pk, loading it on a miss"""
+        entry = self._entry(pk, load)
+        return entry[1] if entry is not None else None
+
+    async def aget(self, pk, load):
+        entry = await self._aentry(pk, load)
+        return entry[1] if entry is not None else None
+
+    def get_by_slug(self, slug, resolve, load):
+        """The cached value for the product with this slug"""
+        pk = self._cached_pk(slug)
+        entry = self._entry(pk, load) if pk is not None else None
+        if entry is None or entry[0] != slug:
+            pk = self.flight.do(self._slug_key(slug), lambda: resolve(slug))
+            if pk is None:
+                return None
+            self._remember_pk(slug, pk)
+            entry = self._entry(pk, load)
+        # The slug may have changed between resolve() and load()
+        return entry[1] if entry is not None and entry[0] == slug else None
+
+    async def aget_by_slug(self, slug, resolve, load):
+        pk = await self._acached_pk(slug)
+        entry = await self._aentry(pk, load) if pk is not None else None
+        if entry is None or entry[0] != slug:
+            pk = await self.flight.ado(self._slug_key(slug), lambda: resolve(slug))
+            if pk is None:
+                return None
+            await self._aremember_pk(slug, pk)
+            entry = await self._aentry(pk, load)
+        return entry[1] if entry is not None and entry[0] == slug else None
+
+    def invalidate(self, pks):
+        """Forget the given products (other processes' local copies expire
+        within local_timeout). Call it after the write has committed."""
+        pks = list(pks)
+        for pk in pks:
+            self.local.delete(self._key(pk))
+        self.shared.set_many({self._stamp_key(pk): uuid.uuid4().hex for pk in pks}, None)
+        self.shared.delete_many([self._key(pk) for pk in pks])
+
+    def stats(self):
+        return {
+            'localHits': self.local_hits,
+            'sharedHits': self.shared_hits,
+            'misses': self.misses,
+            'coalesced': self.flight.coalesced,
+            'localSize': self.local.size(),
+            'localEvictions': self.local.evictions,
+        }
+
+
+def build_response_cache():
+    """Create the product response cache from settings.PRODUCT_CACHE"""
+    options = getattr(settings, 'PRODUCT_CACHE', {})
+    backend_name = options.get('BACKEND', 'locmem')
+    if backend_name == 'locmem':
+        backend = LRUBackend(max_entries=options.get('MAX_ENTRIES', 1024))
+    else:
+        backend = DjangoCacheBackend(alias=options.get('ALIAS', 'default'))
+    return ResponseCache(backend, timeout=options.get('TIMEOUT', 300))
+
+
+def is_process_local(cache):
+    """True for cache backends that other worker processes cannot see"""
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+def build_product_cache():
+    """Create the product detail cache from settings.PRODUCT_DETAIL_CACHE"""
+    options = getattr(settings, 'PRODUCT_DETAIL_CACHE', {})
+    shared = caches[options.get('ALIAS', 'default')]
+    timeout = options.get('TIMEOUT', 3600)
+    local_timeout = options.get('LOCAL_TIMEOUT', 5)
+    if is_process_local(shared):
+        # Invalidations could not reach other workers' copies, so keep
+        # entries only as long as the local tier would
+        timeout = min(timeout, local_timeout)
+    return ProductDetailCache(
+        LRUBackend(max_entries=options.get('LOCAL_MAX_ENTRIES', 1024)),
+        shared,
+        timeout=timeout,
+        local_timeout=local_timeout,
+    )
+
+
+response_cache = build_response_cache()
+product_cache = build_product_cache()
@@ -0,0 +1,39 @@
+"""
+Loaders for the product detail cache (products.cache.product_cache).
+
+A cached detail is the (etag, last_modified, data) of a live product's
+response, built from one .values() row. The sync and async views share the
+loaders, so either may fill the cache for the other.
+
+Loads always read the primary database: invalidation happens when a write
+commits there, and a replica that has not caught up yet would put the old
+row back in the cache under the new stamp.
+"""
+from django.db import DEFAULT_DB_ALIAS
+
+from ecommerce_api.conditional import make_etag
+from .fast_serializers import PRODUCT_FIELDS, product_to_dict
+from .models import Product
+
+
+def product_detail(row):
+    etag = make_etag('product', row['id'], row['updated_at'])
+    return row['slug'], (etag, row['updated_at'], {'product': product_to_dict(row)})
+
+
+def load_product(pk):
+    row = Product.active.using(DEFAULT_DB_ALIAS).values(*PRODUCT_FIELDS).filter(pk=pk).first()
+    return product_detail(row) if row is not None else None
+
+
+async def aload_product(pk):
+    row = await Product.active.using(DEFAULT_DB_ALIAS).values(*PRODUCT_FIELDS).filter(pk=pk).afirst()
+    return product_detail(row) if row is not None else None
+
+
+def resolve_slug(slug):
+    return Product.active.using(DEFAULT_DB_ALIAS).filter(slug=slug).values_list('pk', flat=True).first()
+
+
+async def aresolve_slug(slug):
+    return await Product.active.using(DEFAULT_DB_ALIAS).filter(slug=slug).values_list('pk', flat=True).afirst()
@@ -0,0 +1,124 @@
+from bisect import bisect_right
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When
+
+from ecommerce_api.counters import add_to_counter
+from .fast_serializers import format_decimal
+from .models import Product, ProductFacetCount
+from .search import search_products
+
+
+_CENTS = Decimal('0.01')
+
+
+def price_bounds():
+    """Lower bounds of the price-range buckets, ascending"""
+    return sorted(Decimal(str(bound)).quantize(_CENTS) for bound in settings.PRODUCT_PRICE_BUCKETS)
+
+
+def price_floor(price, bounds=None):
+    """Lower bound of the bucket a price falls in"""
+    bounds = bounds or price_bounds()
+    return bounds[max(0, bisect_right(bounds, Decimal(str(price))) - 1)]
+
+
+def price_floor_expression(bounds=None):
+    """price_floor() as a SQL expression, for grouping products by bucket"""
+    bounds = bounds or price_bounds()
+    return Case(
+        *[When(price__gte=bound, then=Value(bound)) for bound in reversed(bounds[1:])],
+        default=Value(bounds[0]),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def facet_key(category, price, is_deleted):
+    """Counter row a product belongs to, or None if it is not listed"""
+    if is_deleted:
+        return None
+    return (category, price_floor(price))
+
+
+def stored_facet_key(pk):
+    """facet_key() of the row as currently stored"""
+    row = Product.objects.filter(pk=pk).values_list('category', 'price', 'is_deleted').first()
+    return facet_key(*row) if row else None
+
+
+def adjust_facet_counts(deltas):
+    """Apply a Counter of {facet key: change}; call inside the write's transaction"""
+    # Fixed order so concurrent writers lock counter rows in the same sequence
+    for key in sorted(key for key, delta in deltas.items() if key is not None and delta):
+        add_to_counter(ProductFacetCount, {'category': key[0], 'price_floor': key[1]}, product_count=deltas[key])
+
+
+def record_facet_change(old_key, new_key):
+    """Move one product between counter rows"""
+    if old_key != new_key:
+        adjust_facet_counts(Counter({old_key: -1, new_key: 1}))
+
+
+def rebuild_facet_counts(product_model=Product, counts_model=ProductFacetCount):
+    """Recompute the facet counter table from the products table"""
+    rows = product_model.objects.filter(is_deleted=False).annotate(
+        floor=price_floor_expression()
+    ).values('category', 'floor').annotate(count=Count('id')).order_by()
+    with transaction.atomic():
+        counts_model.objects.all().delete()
+        counts_model.objects.bulk_create([
+            counts_model(category=row['category'], price_floor=row['floor'], product_count=row['count'])
+            for row in rows
+        ], batch_size=1000)
+
+
+def _price_ranges(counts, bounds):
+    ranges = []
+    for i, bound in enumerate(bounds):
+        upper = bounds[i + 1] if i + 1 < len(bounds) else None
+        ranges.append({
+            'min': format_decimal(bound),
+            'max': format_decimal(upper) if upper is not None else None,
+            'count': counts.get(bound, 0),
+        })
+    return ranges
+
+
+def product_facets(search='', category=''):
+    """Category and price-range counts for the storefront filter sidebar.
+
+    Category counts cover the whole search so the shopper can switch
+    category; price ranges also honour the selected category. Without a
+    search both come from the counter table, which has one row per
+    (category, price bucket) however many products there are.
+    """
+    bounds = price_bounds()
+
+    if search:
+        products = search_products(Product.active.all(), search)
+        category_rows = products.values('category').annotate(count=Count('id')).order_by()
+        if category:
+            products = products.filter(category=category)
+        price_rows = products.annotate(floor=price_floor_expression(bounds)).values('floor').annotate(
+            count=Count('id')
+        ).order_by()
+    else:
+        counters = ProductFacetCount.objects.filter(product_count__gt=0)
+        category_rows = counters.values('category').annotate(count=Sum('product_count')).order_by()
+        if category:
+            counters = counters.filter(category=category)
+        price_rows = counters.values(floor=F('price_floor')).annotate(count=Sum('product_count')).order_by()
+
+    categories = sorted(
+        ({'category': row['category'], 'count': row['count']} for row in category_rows if row['count']),
+        key=lambda row: row['category'],
+    )
+    price_counts = {Decimal(row['floor']).quantize(_CENTS): row['count'] for row in price_rows}
+    return {
+        'total': sum(row['count'] for row in categories),
+        'categories': categories,
+        'priceRanges': _price_ranges(price_counts, bounds),
+    }
@@ -0,0 +1,81 @@
+"""
+Plain-function serializers for hot read endpoints.
+
+They build the same dicts as the DRF serializers, field for field and in
+the same order, but work from .values() rows so no model instances or
+serializer fields are created. Which endpoints use them is controlled by
+settings.FAST_SERIALIZER_ENDPOINTS.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+from ecommerce_api.profiling import timed
+
+
+PRODUCT_FIELDS = (
+    'id', 'name', 'slug', 'description', 'price', 'category', 'weight',
+    'stock', 'images', 'is_deleted', 'created_at', 'updated_at',
+)
+
+_CENTS = Decimal('0.01')
+
+
+def use_fast_serializers(endpoint):
+    """True if the named view should use the fast serialization path"""
+    return endpoint in getattr(settings, 'FAST_SERIALIZER_ENDPOINTS', ())
+
+
+def format_decimal(value):
+    """Match DRF DecimalField(decimal_places=2) output"""
+    if value is None:
+        return ''
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value).strip())
+    return f'{value.quantize(_CENTS):f}'
+
+
+def format_datetime(value):
+    """Match DRF DateTimeField ISO 8601 output"""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def product_to_dict(row, prefix=''):
+    """Build ProductSerializer's output from a .values() row.
+
+    prefix lets the row come from a join, e.g. 'product__' on order items.
+    """
+    return {
+        'id': row[prefix + 'id'],
+        '_id': row[prefix + 'id'],
+        'name': row[prefix + 'name'],
+        'slug': row[prefix + 'slug'],
+        'description': row[prefix + 'description'],
+        'price': format_decimal(row[prefix + 'price']),
+        'category': row[prefix + 'category'],
+        'weight': format_decimal(row[prefix + 'weight']),
+        'stock': row[prefix + 'stock'],
+        'images': row[prefix + 'images'],
+        'is_deleted': row[prefix + 'is_deleted'],
+        'created_at': format_datetime(row[prefix + 'created_at']),
+        'updated_at': format_datetime(row[prefix + 'updated_at']),
+    }
+
+
+@timed('serialize')
+def serialize_products(products):
+    """Serialize a Product queryset, or rows already fetched with PRODUCT_FIELDS"""
+    if hasattr(products, 'values'):
+        products = products.values(*PRODUCT_FIELDS)
+    return [product_to_dict(row) for row in products]
+
+
+async def aserialize_products(products):
+    """Async counterpart of serialize_products for a Product queryset"""
+    return [product_to_dict(row) async for row in products.values(*PRODUCT_FIELDS)]
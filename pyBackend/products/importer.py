@@ -0,0 +1,218 @@
+import codecs
+import csv
+import json
+from collections import Counter
+from functools import partial
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .cache import product_cache, response_cache
+from .facets import adjust_facet_counts, facet_key
+from .models import Product
+from .serializers import ProductSerializer
+
+
+CHUNK_SIZE = 1000
+
+# Slug stems looked up per query when resolving collisions
+STEM_BATCH_SIZE = 200
+
+SLUG_MAX_LENGTH = Product._meta.get_field('slug').max_length
+
+UPSERT_FIELDS = ['name', 'description', 'price', 'category', 'weight', 'stock', 'images', 'is_deleted', 'deleted_at', 'updated_at']
+
+
+def _parse_images(value):
+    value = (value or '').strip()
+    if not value:
+        return []
+    if value.startswith('['):
+        return json.loads(value)
+    return [url.strip() for url in value.split('|') if url.strip()]
+
+
+def iter_csv_rows(stream):
+    """Yield product dicts from a CSV byte stream with a header row.
+
+    The images column holds a JSON array or URLs separated by "|".
+    """
+    reader = csv.DictReader(codecs.iterdecode(stream, 'utf-8-sig'))
+    for row in reader:
+        row = {key.strip(): value for key, value in row.items() if key}
+        if 'images' in row:
+            try:
+                row['images'] = _parse_images(row['images'])
+            except ValueError:
+                pass  # left as a string so validation reports it for this row
+        yield row
+
+
+def iter_ndjson_rows(stream):
+    """Yield product dicts from a newline-delimited JSON byte stream"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def _base_slug(row, data):
+    slug = slugify(row.get('slug') or data['name']) or 'product'
+    return slug[:SLUG_MAX_LENGTH]
+
+
+def _with_suffix(base, n):
+    suffix = f'-{n}'
+    return base[:SLUG_MAX_LENGTH - len(suffix)] + suffix
+
+
+def _resolve_unique_slugs(bases, taken):
+    """Assign every base slug a free slug, adding -2, -3... on collision.
+
+    Collisions against the database are resolved with one query for every
+    stored slug starting with one of the bases, so suffixed variants that
+    already exist (shirt-2) are skipped as well as the bases themselves.
+    Prefixes are matched as slug ranges, which (unlike LIKE) can use the
+    slug index.
+    """
+    # Room is left for a "-n" suffix, so match on the truncated stem
+    stems = sorted({base[:SLUG_MAX_LENGTH - 4] for base in bases})
+    existing = set()
+    # In groups: SQLite limits how deep an OR of conditions may nest
+    for start in range(0, len(stems), STEM_BATCH_SIZE):
+        match = Q()
+        for stem in stems[start:start + STEM_BATCH_SIZE]:
+            match |= Q(slug__gte=stem, slug__lt=stem + '\uffff')
+        existing.update(Product.objects.filter(match).order_by().values_list('slug', flat=True))
+
+    slugs = []
+    for base in bases:
+        slug = base
+        n = 2
+        while slug in existing or slug in taken:
+            slug = _with_suffix(base, n)
+            n += 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+class ProductImporter:
+    """Validate and insert products in batches, collecting per-row errors.
+
+    In upsert mode rows are matched on slug and existing products are
+    updated in place; otherwise every valid row creates a new product with
+    a unique slug.
+    """
+
+    def __init__(self, upsert=False, chunk_size=CHUNK_SIZE):
+        self.upsert = upsert
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self._taken = set()
+
+    def run(self, rows):
+        rows = iter(rows)
+        start = 1
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self._import_chunk(chunk, start)
+            start += len(chunk)
+            self.rows += len(chunk)
+        if self.created or self.updated:
+            response_cache.invalidate()
+        return self
+
+    def _validate(self, chunk, start):
+        valid = []
+        for row_number, row in enumerate(chunk, start):
+            if not isinstance(row, dict):
+                self.errors.append({'row': row_number, 'errors': {'non_field_errors': ['Invalid row']}})
+                continue
+            serializer = ProductSerializer(data=row)
+            if serializer.is_valid():
+                valid.append((row_number, row, serializer.validated_data))
+            else:
+                self.errors.append({'row': row_number, 'errors': serializer.errors})
+        return valid
+
+    def _import_chunk(self, chunk, start):
+        valid = self._validate(chunk, start)
+        if not valid:
+            return
+
+        bases = [_base_slug(row, data) for _, row, data in valid]
+        if self.upsert:
+            # Last row wins when the same slug appears twice in one chunk
+            by_slug = {base: (row_number, data) for base, (row_number, _, data) in zip(bases, valid)}
+            slugs = list(by_slug)
+            numbered = list(by_slug.values())
+        else:
+            slugs = _resolve_unique_slugs(bases, self._taken)
+            numbered = [(row_number, data) for row_number, _, data in valid]
+
+        now = timezone.now()
+        products = [
+            Product(slug=slug, deleted_at=now if data.get('is_deleted') else None, **data)
+            for slug, (_, data) in zip(slugs, numbered)
+        ]
+        try:
+            self._save(products)
+        except IntegrityError:
+            # e.g. a slug taken by a concurrent import: retry row by row so
+            # only the offending rows fail
+            for (row_number, _), product in zip(numbered, products):
+                product.pk, product._state.adding = None, True
+                try:
+                    self._save([product])
+                except IntegrityError as error:
+                    self.errors.append({'row': row_number, 'errors': {'non_field_errors': [str(error)]}})
+
+    def _save(self, products):
+        slugs = [product.slug for product in products]
+        facet_deltas = Counter(facet_key(p.category, p.price, p.is_deleted) for p in products)
+        existing = set()
+
+        with transaction.atomic():
+            if self.upsert:
+                # Products being overwritten leave their current facet rows
+                for pk, *stored in Product.objects.filter(slug__in=slugs).values_list(
+                    'pk', 'category', 'price', 'is_deleted'
+                ):
+                    existing.add(pk)
+                    facet_deltas[facet_key(*stored)] -= 1
+                Product.objects.bulk_create(
+                    products,
+                    update_conflicts=True,
+                    unique_fields=['slug'],
+                    update_fields=UPSERT_FIELDS,
+                )
+                transaction.on_commit(partial(product_cache.invalidate, existing))
+            else:
+                Product.objects.bulk_create(products)
+            adjust_facet_counts(facet_deltas)
+
+        self.updated += len(existing)
+        self.created += len(products) - len(existing)
+
+    def report(self):
+        return {
+            'message': f'{self.created + self.updated} products imported successfully',
+            'count': self.created + self.updated,
+            'created': self.created,
+            'updated': self.updated,
+            'failed': len(self.errors),
+            'errors': self.errors,
+        }
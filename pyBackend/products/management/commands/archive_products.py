@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from products.archive import archivable_products, archive_deleted_products
+
+
+class Command(BaseCommand):
+    help = 'Move products soft-deleted more than --days ago to the archived_products table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.PRODUCT_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='only count the products that would move')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            total = archivable_products(options['days']).count()
+            self.stdout.write(f'{total} products deleted more than {options["days"]} days ago')
+            return
+        total = archive_deleted_products(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} products'))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:20
+
+from django.db import migrations, models
+
+from products.facets import rebuild_facet_counts
+
+
+def backfill_facet_counts(apps, schema_editor):
+    rebuild_facet_counts(apps.get_model('products', 'Product'), apps.get_model('products', 'ProductFacetCount'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=100)),
+                ('price_floor', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('product_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'product_facet_counts',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_deleted', 'category', 'created_at'], name='products_category_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productfacetcount',
+            unique_together={('category', 'price_floor')},
+        ),
+        migrations.RunPython(backfill_facet_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_archive_deleted_products'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_listed_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_live_category_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['-created_at', '-id', 'updated_at', 'is_deleted'], name='products_listed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['category', '-created_at', '-id', 'updated_at', 'is_deleted'], name='products_live_category_idx'),
+        ),
+    ]
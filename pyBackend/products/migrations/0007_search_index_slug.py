@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from products.search import create_search_index, drop_search_index
+
+
+def rebuild_search_index(apps, schema_editor):
+    # The FTS5 columns, its triggers and the GIN expression can't be altered
+    # in place, so the index is recreated with the current definition.
+    drop_search_index(schema_editor.connection)
+    create_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_version_covering_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_index, migrations.RunPython.noop),
+    ]
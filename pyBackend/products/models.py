@@ -1,5 +1,97 @@
-from django.db import models
+from collections import Counter
+from functools import partial
+
+from django.db import models, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
 from django.utils.text import slugify
+from .cache import product_cache, response_cache
+
+
+# Fields that decide which facet counter row a product belongs to
+FACET_FIELDS = {'category', 'price', 'is_deleted'}
+
+# pk__in lookups per query when reading back updated rows
+PK_BATCH_SIZE = 1000
+
+
+class ProductQuerySet(models.QuerySet):
+    def active(self):
+        """Products shown on the storefront"""
+        return self.filter(is_deleted=False)
+
+    def visible(self, include_deleted=False):
+        """Admin lists: live products, or everything with include_deleted"""
+        return self if include_deleted else self.active()
+
+    def version(self):
+        """(row count, newest updated_at) of the filtered set, for ETags.
+
+        Every save bumps updated_at and removals lower the count, so the
+        pair changes whenever a list built from these rows would.
+        """
+        row = self.aggregate(count=Count('pk'), modified=Max('updated_at'))
+        return row['count'], row['modified']
+
+    async def aversion(self):
+        row = await self.aaggregate(count=Count('pk'), modified=Max('updated_at'))
+        return row['count'], row['modified']
+
+    def _facet_keys(self):
+        from .facets import facet_key
+
+        rows = self.order_by().values_list('pk', 'category', 'price', 'is_deleted')
+        return {pk: facet_key(category, price, is_deleted) for pk, category, price, is_deleted in rows}
+
+    def _invalidate_on_commit(self, pks):
+        transaction.on_commit(partial(product_cache.invalidate, pks), using=self.db)
+        transaction.on_commit(response_cache.invalidate, using=self.db)
+
+    def update(self, **kwargs):
+        """Bulk update that keeps the facet counters and product caches in
+        step, as save() does. Costs one extra query for the affected pks, or
+        two when a facet field changes."""
+        from .facets import adjust_facet_counts
+
+        with transaction.atomic(using=self.db):
+            if FACET_FIELDS & kwargs.keys():
+                old_keys = self._facet_keys()
+                pks = list(old_keys)
+            else:
+                pks = list(self.order_by().values_list('pk', flat=True))
+            updated = super().update(**kwargs)
+            if FACET_FIELDS & kwargs.keys():
+                deltas = Counter()
+                for start in range(0, len(pks), PK_BATCH_SIZE):
+                    batch = pks[start:start + PK_BATCH_SIZE]
+                    for pk, key in self.model.objects.filter(pk__in=batch)._facet_keys().items():
+                        deltas[old_keys[pk]] -= 1
+                        deltas[key] += 1
+                adjust_facet_counts(deltas)
+            self._invalidate_on_commit(pks)
+        return updated
+
+    def delete(self):
+        """Bulk delete that keeps the facet counters and product caches in
+        step, as Product.delete() does"""
+        from .facets import adjust_facet_counts
+
+        with transaction.atomic(using=self.db):
+            old_keys = self._facet_keys()
+            result = super().delete()
+            deltas = Counter()
+            deltas.subtract(old_keys.values())
+            adjust_facet_counts(deltas)
+            self._invalidate_on_commit(list(old_keys))
+        return result
+
+
+class ActiveProductManager(models.Manager.from_queryset(ProductQuerySet)):
+    """Live products only. The filter matches the partial indexes below, so
+    storefront lists and counts never read soft-deleted rows."""
+
+    def get_queryset(self):
+        return super().get_queryset().active()
 
 
 class Product(models.Model):
@@ -12,20 +104,121 @@ class Product(models.Model):
     stock = models.IntegerField(default=0)
     images = models.JSONField(default=list)  # Store array of image URLs
     is_deleted = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # objects stays the default manager so admin screens, checkout and the
+    # importer still see soft-deleted rows; storefront code uses active
+    objects = ProductQuerySet.as_manager()
+    active = ActiveProductManager()
+
     class Meta:
         db_table = 'products'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['name', 'description']),
+            # Storefront listing and cursor pages: newest first, not deleted
+            # updated_at rides along so version() is answered from the index
+            models.Index(
+                fields=['-created_at', '-id', 'updated_at', 'is_deleted'], name='products_listed_idx',
+                condition=models.Q(is_deleted=False),
+            ),
+            # Category pages and live counts. is_deleted is redundant under the
+            # condition but lets SQLite treat the index as covering
+            models.Index(
+                fields=['category', '-created_at', '-id', 'updated_at', 'is_deleted'], name='products_live_category_idx',
+                condition=models.Q(is_deleted=False),
+            ),
+            # Archival job: only soft-deleted rows, oldest deletion first
+            models.Index(fields=['deleted_at'], name='products_deleted_at_idx', condition=models.Q(is_deleted=True)),
         ]
 
     def save(self, *args, **kwargs):
+        from .facets import facet_key, record_facet_change, stored_facet_key
+
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if self.is_deleted != (self.deleted_at is not None):
+            self.deleted_at = timezone.now() if self.is_deleted else None
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = {*update_fields, 'deleted_at'}
+        track_facets = update_fields is None or {'category', 'price', 'is_deleted'} & set(update_fields)
+        with transaction.atomic():
+            old_key = stored_facet_key(self.pk) if track_facets and self.pk else None
+            super().save(*args, **kwargs)
+            if track_facets:
+                record_facet_change(old_key, facet_key(self.category, self.price, self.is_deleted))
+            transaction.on_commit(partial(product_cache.invalidate, [self.pk]))
+            transaction.on_commit(response_cache.invalidate)
+
+    def delete(self, *args, **kwargs):
+        from .facets import record_facet_change, stored_facet_key
+
+        with transaction.atomic():
+            pk, old_key = self.pk, stored_facet_key(self.pk)
+            result = super().delete(*args, **kwargs)
+            record_facet_change(old_key, None)
+            transaction.on_commit(partial(product_cache.invalidate, [pk]))
+            transaction.on_commit(response_cache.invalidate)
+        return result
+
+    def soft_delete(self):
+        """Hide the product from the storefront; archive_products moves it
+        to the archived_products table once PRODUCT_ARCHIVE_AFTER_DAYS pass"""
+        self.is_deleted = True
+        self.save()
+
+    def __str__(self):
+        return self.name
+
+
+class ProductFacetCount(models.Model):
+    """Listed (not deleted) products per category and price bucket.
+
+    Kept up to date by Product.save()/delete(), the product queryset's
+    update()/delete() and the bulk importer so the filter sidebar never has
+    to count the products table. Rebuild with
+    products.facets.rebuild_facet_counts() after changing
+    PRODUCT_PRICE_BUCKETS.
+    """
+    category = models.CharField(max_length=100)
+    price_floor = models.DecimalField(max_digits=10, decimal_places=2)
+    product_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'product_facet_counts'
+        unique_together = ('category', 'price_floor')
+
+    def __str__(self):
+        return f"{self.category} from {self.price_floor}: {self.product_count}"
+
+
+class ArchivedProduct(models.Model):
+    """Cold storage for products that stayed soft-deleted past
+    PRODUCT_ARCHIVE_AFTER_DAYS.
+
+    Rows keep their original id. Order items referencing an archived
+    product lose the foreign key (SET_NULL) but still carry their own
+    product_name/price snapshot, so order history is unaffected.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=200)
+    slug = models.CharField(max_length=50)
+    description = models.TextField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    category = models.CharField(max_length=100)
+    weight = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    stock = models.IntegerField(default=0)
+    images = models.JSONField(default=list)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    deleted_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'archived_products'
+        ordering = ['-archived_at']
 
     def __str__(self):
         return self.name
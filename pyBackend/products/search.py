@@ -0,0 +1,145 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+# Postgres: the search predicate must match the expression of the GIN index
+# created in migration 0007 so the planner can use it. Slug hyphens become
+# spaces so "blue-shirt-2" is indexed as its words.
+PG_SEARCH_VECTOR = (
+    "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, '') "
+    "|| ' ' || replace(coalesce(slug, ''), '-', ' '))"
+)
+
+FTS_TABLE = 'products_fts'
+
+
+def tokenize(search):
+    """Split a raw search string into lowercase word tokens"""
+    return re.findall(r'\w+', search.lower())
+
+
+def fts_match(tokens):
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def ts_query_string(tokens):
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+def search_condition(search, using='default'):
+    """search_products() as a Q, for OR-ing with other lookups.
+
+    Matches the same rows through the same index, without the relevance
+    order.
+    """
+    tokens = tokenize(search)
+    if not tokens:
+        return Q(pk__in=[])
+
+    vendor = connections[using].vendor
+
+    if vendor == 'sqlite':
+        return Q(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [fts_match(tokens)]))
+
+    if vendor == 'postgresql':
+        return Q(pk__in=RawSQL(
+            f"SELECT id FROM products WHERE {PG_SEARCH_VECTOR} @@ to_tsquery('english', %s)",
+            [ts_query_string(tokens)],
+        ))
+
+    return Q(name__icontains=search) | Q(description__icontains=search) | Q(slug__icontains=search)
+
+
+def search_products(queryset, search):
+    """Filter a Product queryset by full-text search, ordered by relevance.
+
+    Every token is matched as a prefix against the name, description and
+    slug, so "wire head" finds "Wireless Headphones". Uses the FTS5 table on SQLite and the tsvector
+    GIN index on Postgres; other backends fall back to icontains.
+    """
+    tokens = tokenize(search)
+    if not tokens:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'sqlite':
+        match = fts_match(tokens)
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = products.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'bm25({FTS_TABLE})'},
+            order_by=['search_rank', '-created_at'],
+        )
+
+    if vendor == 'postgresql':
+        ts_query = ts_query_string(tokens)
+        return queryset.extra(
+            where=[f"{PG_SEARCH_VECTOR} @@ to_tsquery('english', %s)"],
+            params=[ts_query],
+            select={'search_rank': f"-ts_rank({PG_SEARCH_VECTOR}, to_tsquery('english', %s))"},
+            select_params=[ts_query],
+            order_by=['search_rank', '-created_at'],
+        )
+
+    return queryset.filter(
+        Q(name__icontains=search) | Q(description__icontains=search) | Q(slug__icontains=search)
+    )
+
+
+def create_search_index(connection):
+    """Create the full-text index and its sync triggers for the given connection"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "name, description, slug, content='products', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+            # Triggers keep the index in sync for save(), bulk_create() and
+            # queryset update()s alike; soft-deleted rows stay indexed and are
+            # filtered out by the outer query.
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON products BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, name, description, slug) VALUES (new.id, new.name, new.description, new.slug); "
+                "END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON products BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, slug) VALUES ('delete', old.id, old.name, old.description, old.slug); "
+                "END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description, slug ON products BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, slug) VALUES ('delete', old.id, old.name, old.description, old.slug); "
+                f"INSERT INTO {FTS_TABLE}(rowid, name, description, slug) VALUES (new.id, new.name, new.description, new.slug); "
+                "END"
+            )
+            rebuild_search_index(connection)
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS products_search_idx ON products USING GIN ({PG_SEARCH_VECTOR})"
+            )
+
+
+def drop_search_index(connection):
+    """Drop the full-text index and its triggers"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS products_search_idx')
+
+
+def rebuild_search_index(connection):
+    """Rebuild the SQLite FTS index from the products table"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
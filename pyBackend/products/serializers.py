@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from ecommerce_api.profiling import ProfiledSerializerMixin
 from .models import Product
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     _id = serializers.IntegerField(source='id', read_only=True)
     
     class Meta:
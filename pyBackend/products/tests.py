@@ -1,3 +1,164 @@
+import asyncio
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import F
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tests.query_plans import QueryPlanAssertions, seed
+from users.models import User
+from .cache import DjangoCacheBackend, LRUBackend, ProductDetailCache, ResponseCache, product_cache, response_cache
+from .detail import aload_product, aresolve_slug
+from .facets import product_facets, rebuild_facet_counts
+from .models import Product
+
+
+class FacetCounterTests(TestCase):
+    """Queryset updates and deletes keep the facet counters and product
+    caches in step, like Product.save()/delete()"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for n in range(12):
+            Product.objects.create(name=f'Product {n}', description='d', price=5 + n * 40, category=f'C{n % 3}')
+
+    def assertCountersMatch(self):
+        facets = product_facets()
+        rebuild_facet_counts()
+        self.assertEqual(facets, product_facets())
+
+    def assertInvalidates(self, write, pks):
+        with mock.patch.object(product_cache, 'invalidate') as invalidate, \
+                mock.patch.object(response_cache, 'invalidate') as invalidate_list:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                write()
+                invalidate.assert_not_called()
+            self.assertTrue(callbacks)
+        self.assertEqual(sorted(pk for call in invalidate.call_args_list for pk in call.args[0]), sorted(pks))
+        invalidate_list.assert_called()
+
+    def test_delete(self):
+        queryset = Product.objects.filter(category='C0')
+        pks = list(queryset.values_list('pk', flat=True))
+        self.assertInvalidates(queryset.delete, pks)
+        self.assertEqual(product_facets()['total'], 8)
+        self.assertCountersMatch()
+
+    def test_update_facet_fields(self):
+        for kwargs in [{'category': 'C9'}, {'price': F('price') * 3}, {'is_deleted': True}, {'is_deleted': False}]:
+            with self.subTest(**kwargs):
+                queryset = Product.objects.filter(category__in=['C1', 'C9'])
+                pks = list(queryset.values_list('pk', flat=True))
+                self.assertInvalidates(lambda: queryset.update(**kwargs), pks)
+                self.assertCountersMatch()
+
+    def test_update_other_fields(self):
+        queryset = Product.objects.filter(category='C2')
+        pks = list(queryset.values_list('pk', flat=True))
+        self.assertInvalidates(lambda: queryset.update(stock=F('stock') + 1), pks)
+        self.assertCountersMatch()
+
+
+class AdminSearchTests(TestCase):
+    """Admin product search matches slugs through the full-text index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email='admin@example.com', name='Admin', password='x', role='admin')
+        Product.objects.create(name='Blue Shirt', description='Cotton', price=5, category='C', slug='shirt-2')
+        Product.objects.create(name='Desk Lamp', description='Bright', price=5, category='C', slug='legacy-sku-99')
+
+    def search(self, search):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/admin/products/', {'search': search})
+        return [product['slug'] for product in response.json()['products']]
+
+    def test_slug(self):
+        self.assertEqual(self.search('sku-99'), ['legacy-sku-99'])
+        self.assertEqual(self.search('shirt-2'), ['shirt-2'])
+
+    def test_slug_update(self):
+        Product.objects.filter(slug='legacy-sku-99').update(slug='lamp-2')
+        self.assertEqual(self.search('sku-99'), [])
+        self.assertEqual(self.search('lamp-2'), ['lamp-2'])
+
+
+class EventLoopCheckedCache(LocMemCache):
+    """LocMemCache that fails when a synchronous call is made from a running
+    event loop, where a network cache (Redis) would block it"""
+
+    def __init__(self):
+        super().__init__('event-loop-checked', {})
+
+    def _check(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        raise AssertionError('synchronous cache call on the event loop')
+
+    def get(self, *args, **kwargs):
+        self._check()
+        return super().get(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        self._check()
+        return super().set(*args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        self._check()
+        return super().add(*args, **kwargs)
+
+    def get_many(self, *args, **kwargs):
+        self._check()
+        return super().get_many(*args, **kwargs)
+
+
+class AsyncCacheTests(TestCase):
+    """The async views reach the shared cache through its async API only"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Lamp', description='d', price=5, category='C')
+
+    async def test_product_detail_cache(self):
+        cache = ProductDetailCache(LRUBackend(max_entries=0), EventLoopCheckedCache())
+        for _ in range(2):
+            value = await cache.aget(self.product.pk, aload_product)
+            self.assertEqual(value[2]['product']['name'], 'Lamp')
+            value = await cache.aget_by_slug(self.product.slug, aresolve_slug, aload_product)
+            self.assertEqual(value[2]['product']['name'], 'Lamp')
+        self.assertEqual(cache.shared_hits, 3)
+
+    async def test_response_cache(self):
+        backend = DjangoCacheBackend()
+        backend.cache = EventLoopCheckedCache()
+        cache = ResponseCache(backend)
+        key = await cache.amake_key('list', page=1)
+        await cache.aset(key, 'data')
+        self.assertEqual(await cache.aget(key), 'data')
+
+
+class ProductQueryPlanTests(QueryPlanAssertions, TestCase):
+    """get_products reads the products table through its indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin, cls.customer = seed(products=5000, users=1, orders=0)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
 
-# Create your tests here.
+    def test_get_products(self):
+        for url in [
+            '/api/products/',
+            '/api/products/?page=5&limit=12',
+            '/api/products/?category=Category 3',
+            '/api/products/?search=product 12',
+            '/api/products/?cursor=',
+        ]:
+            with self.subTest(url=url):
+                self.assertNoFullScans(self.client, url)
@@ -1,8 +1,17 @@
 from django.urls import path
-from . import views
+from ecommerce_api.async_views import select_view
+from . import views, async_views
+
+get_products = select_view('get_products', views.get_products, async_views.get_products)
+get_product_by_id = select_view('get_product_by_id', views.get_product_by_id, async_views.get_product_by_id)
+get_product_by_slug = select_view('get_product_by_slug', views.get_product_by_slug, async_views.get_product_by_slug)
 
 urlpatterns = [
-    path('', views.get_products, name='get_products'),
-    path('<int:pk>/', views.get_product_by_id, name='get_product_by_id'),
-    path('<int:pk>', views.get_product_by_id, name='get_product_by_id_no_slash'),
+    path('', get_products, name='get_products'),
+    path('facets/', views.get_product_facets, name='get_product_facets'),
+    path('facets', views.get_product_facets, name='get_product_facets_no_slash'),
+    path('<int:pk>/', get_product_by_id, name='get_product_by_id'),
+    path('<int:pk>', get_product_by_id, name='get_product_by_id_no_slash'),
+    path('<slug:slug>/', get_product_by_slug, name='get_product_by_slug'),
+    path('<slug:slug>', get_product_by_slug, name='get_product_by_slug_no_slash'),
 ]
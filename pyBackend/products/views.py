@@ -3,59 +3,128 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.core.paginator import Paginator
-from django.db.models import Q
 from .models import Product
+from ecommerce_api.conditional import make_etag, not_modified, row_versions, set_validators
+from ecommerce_api.pagination import paginate_by_cursor, InvalidCursor
 from .serializers import ProductSerializer
+from .search import search_condition, search_products
+from .cache import product_cache, response_cache
+from .detail import load_product, resolve_slug
+from .fast_serializers import PRODUCT_FIELDS, serialize_products, use_fast_serializers
+from .importer import ProductImporter, iter_csv_rows, iter_ndjson_rows
+from .facets import product_facets
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_products(request):
     """Get all products with search, filter, and pagination"""
-    products = Product.objects.filter(is_deleted=False)
+    search = request.GET.get('search', '').strip()
+    category = request.GET.get('category', '')
+    page = int(request.GET.get('page', 1))
+    limit = int(request.GET.get('limit', 10))
+    cursor = request.GET.get('cursor')
+    
+    cache_key = response_cache.make_key(
+        'list', search=search.lower(), category=category, page=page, limit=limit, cursor=cursor
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        etag, last_modified, data = cached
+        return not_modified(request, etag, last_modified) or set_validators(Response(data), etag, last_modified)
+    
+    products = Product.active.all()
     
     # Search
-    search = request.GET.get('search', '')
     if search:
-        products = products.filter(
-            Q(name__icontains=search) | Q(description__icontains=search)
-        )
+        products = search_products(products, search)
     
     # Category filter
-    category = request.GET.get('category', '')
     if category:
         products = products.filter(category=category)
     
-    # Pagination
-    page = int(request.GET.get('page', 1))
-    limit = int(request.GET.get('limit', 10))
+    fast = use_fast_serializers('get_products')
+    if fast:
+        products = products.values(*PRODUCT_FIELDS)
+    
+    # Cursor (keyset) pagination - opt in with ?cursor=
+    if cursor is not None:
+        try:
+            page_items, pagination = paginate_by_cursor(products, cursor, limit)
+        except InvalidCursor:
+            return Response({'message': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        # No COUNT here, so validate on the page's own row versions
+        versions, last_modified = row_versions(page_items)
+        etag = make_etag('products', search.lower(), category, limit, cursor, pagination, versions)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        products_data = serialize_products(page_items) if fast else ProductSerializer(page_items, many=True).data
+        data = {'products': products_data, 'pagination': pagination}
+        response_cache.set(cache_key, (etag, last_modified, data))
+        return set_validators(Response(data), etag, last_modified)
     
+    # Conditional GET: the count Paginator needs anyway, plus max(updated_at)
+    total, last_modified = products.version()
+    etag = make_etag('products', search.lower(), category, page, limit, total, last_modified)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    
+    # Pagination
     paginator = Paginator(products, limit)
+    paginator.count = total  # already counted by version()
     page_obj = paginator.get_page(page)
     
-    serializer = ProductSerializer(page_obj, many=True)
+    products_data = serialize_products(page_obj) if fast else ProductSerializer(page_obj, many=True).data
     
-    return Response({
-        'products': serializer.data,
+    data = {
+        'products': products_data,
         'pagination': {
             'page': page,
             'limit': limit,
             'total': paginator.count,
             'pages': paginator.num_pages
         }
-    })
+    }
+    response_cache.set(cache_key, (etag, last_modified, data))
+    return set_validators(Response(data), etag, last_modified)
+
+
+def _detail_response(request, cached):
+    if cached is None:
+        return Response({'message': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+    etag, last_modified, data = cached
+    return not_modified(request, etag, last_modified) or set_validators(Response(data), etag, last_modified)
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_product_by_id(request, pk):
     """Get single product by ID"""
-    try:
-        product = Product.objects.get(pk=pk, is_deleted=False)
-        serializer = ProductSerializer(product)
-        return Response({'product': serializer.data})
-    except Product.DoesNotExist:
-        return Response({'message': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+    return _detail_response(request, product_cache.get(pk, load_product))
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_product_by_slug(request, slug):
+    """Get single product by slug"""
+    return _detail_response(request, product_cache.get_by_slug(slug, resolve_slug, load_product))
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_product_facets(request):
+    """Get category and price-range counts for the filter sidebar"""
+    search = request.GET.get('search', '').strip()
+    category = request.GET.get('category', '')
+    
+    cache_key = response_cache.make_key('facets', search=search.lower(), category=category)
+    data = response_cache.get(cache_key)
+    if data is None:
+        data = product_facets(search, category)
+        response_cache.set(cache_key, data)
+    return Response(data)
 
 
 # Admin endpoints
@@ -75,19 +144,14 @@ def get_all_products_admin(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     # GET - List products with pagination and filters
-    products = Product.objects.all()
-    
-    # Include deleted products option
-    include_deleted = request.GET.get('includeDeleted', 'false')
-    if include_deleted.lower() != 'true':
-        products = products.filter(is_deleted=False)
+    # Soft-deleted products only with ?includeDeleted=true
+    include_deleted = request.GET.get('includeDeleted', 'false').lower() == 'true'
+    products = Product.objects.visible(include_deleted)
     
     # Search
     search = request.GET.get('search', '')
     if search:
-        products = products.filter(
-            Q(name__icontains=search) | Q(description__icontains=search) | Q(slug__icontains=search)
-        )
+        products = products.filter(search_condition(search, products.db))
     
     # Category filter
     category = request.GET.get('category', '')
@@ -98,6 +162,15 @@ def get_all_products_admin(request):
     page = int(request.GET.get('page', 1))
     limit = int(request.GET.get('limit', 10))
     
+    # Cursor (keyset) pagination - opt in with ?cursor=
+    if 'cursor' in request.GET:
+        try:
+            page_items, pagination = paginate_by_cursor(products, request.GET['cursor'], limit)
+        except InvalidCursor:
+            return Response({'message': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = ProductSerializer(page_items, many=True)
+        return Response({'products': serializer.data, 'pagination': pagination})
+    
     paginator = Paginator(products.order_by('-created_at'), limit)
     page_obj = paginator.get_page(page)
     
@@ -138,8 +211,7 @@ def admin_product_detail(request, pk):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     else:  # DELETE
-        product.is_deleted = True
-        product.save()
+        product.soft_delete()
         serializer = ProductSerializer(product)
         return Response({
             'message': 'Product deleted successfully',
@@ -188,8 +260,7 @@ def delete_product(request, pk):
     
     try:
         product = Product.objects.get(pk=pk)
-        product.is_deleted = True
-        product.save()
+        product.soft_delete()
         return Response({'message': 'Product deleted successfully'})
     except Product.DoesNotExist:
         return Response({'message': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -202,18 +273,27 @@ def bulk_import_products(request):
     if request.user.role != 'admin':
         return Response({'message': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
     
-    products_data = request.data.get('products', [])
+    upsert = request.GET.get('upsert', 'false').lower() == 'true'
+    content_type = request.content_type.split(';')[0].strip()
+    
+    # CSV and NDJSON bodies are parsed as a stream, row by row
+    if content_type == 'text/csv':
+        rows = iter_csv_rows(request._request)
+    elif content_type in ('application/x-ndjson', 'application/jsonl'):
+        rows = iter_ndjson_rows(request._request)
+    else:
+        rows = request.data.get('products', [])
+        if not rows:
+            return Response({'message': 'No products provided'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    importer = ProductImporter(upsert=upsert).run(rows)
     
-    if not products_data:
+    if not importer.rows:
         return Response({'message': 'No products provided'}, status=status.HTTP_400_BAD_REQUEST)
     
-    created_products = []
-    for product_data in products_data:
-        serializer = ProductSerializer(data=product_data)
-        if serializer.is_valid():
-            created_products.append(serializer.save())
+    report = importer.report()
+    if not report['count'] and importer.errors:
+        report['message'] = 'No products imported'
+        return Response(report, status=status.HTTP_400_BAD_REQUEST)
     
-    return Response({
-        'message': f'{len(created_products)} products imported successfully',
-        'count': len(created_products)
-    }, status=status.HTTP_201_CREATED)
+    return Response(report, status=status.HTTP_201_CREATED)
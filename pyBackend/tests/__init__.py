@@ -0,0 +1 @@
+"""Helpers shared by the app test modules"""
@@ -0,0 +1,114 @@
+"""
+Query plan checks for the list endpoints, used by the products and orders
+tests.
+
+QueryPlanAssertions.assertNoFullScans requests a URL, runs EXPLAIN QUERY
+PLAN on every SELECT it issues and fails if any plan reads a large table
+with a full scan. The planner only picks the indexes once it has
+statistics for tables of a realistic size, so seed() fills the test
+database and runs ANALYZE.
+"""
+import random
+import re
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from orders.models import AdminNote, Order, OrderItem
+from orders.stats import rebuild_daily_stats
+from products.cache import response_cache
+from products.facets import rebuild_facet_counts
+from products.models import Product
+from users.models import User
+
+
+# Small by construction (one row per day/status or category/bucket)
+SMALL_TABLES = {'daily_order_stats', 'product_facet_counts', 'django_migrations'}
+
+# "SCAN t USING [COVERING] INDEX i" walks an index and a virtual table scan
+# is an FTS lookup; a bare "SCAN t" reads every row of the table
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+
+def seed(products, users, orders):
+    rng = random.Random(14)
+    admin = User.objects.create_user(email='admin@example.com', name='Admin', password='admin', role='admin')
+    customers = User.objects.bulk_create([
+        User(email=f'user{i}@example.com', name=f'User {i}', password='!') for i in range(users)
+    ])
+    catalog = Product.objects.bulk_create([
+        Product(
+            name=f'Product {i}', slug=f'product-{i}', description='Query plan product',
+            price=rng.randint(100, 150000) / 100, category=f'Category {i % 25}',
+            stock=rng.randint(0, 100), is_deleted=rng.random() < 0.1,
+        )
+        for i in range(products)
+    ])
+    address = {'fullName': 'Plan', 'address': '1 Main St', 'city': 'X', 'zipCode': '1', 'country': 'X', 'phone': '1'}
+    statuses = [choice for choice, _ in Order.STATUS_CHOICES]
+    created = [
+        Order(
+            user=rng.choice(customers), order_id=f'ORD-PLAN-{i}', total_amount=rng.randint(100, 50000) / 100,
+            status=rng.choice(statuses), shipping_address=address, item_count=2,
+        )
+        for i in range(orders)
+    ]
+    for order in created:
+        order.customer_email, order.customer_name = order.user.email, order.user.name
+    Order.objects.bulk_create(created)
+    now = timezone.now()
+    for order in created:
+        order.created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+    Order.objects.bulk_update(created, ['created_at'], batch_size=1000)
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, product_name=product.name, quantity=1, price=product.price)
+        for order in created
+        for product in rng.sample(catalog, 2)
+    ], batch_size=1000)
+    AdminNote.objects.bulk_create([AdminNote(order=order, note='Checked') for order in created[::10]])
+    rebuild_daily_stats()
+    rebuild_facet_counts()
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return admin, customers[0]
+
+
+def capture_selects(client, url):
+    statements = []
+
+    def record(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        response = client.get(url)
+    return response.status_code, statements
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    return [
+        line for line in plan
+        for table in FULL_SCAN.findall(line.strip())
+        if table not in SMALL_TABLES
+    ]
+
+
+class QueryPlanAssertions:
+    """TestCase mixin for checking the plans of an endpoint's queries"""
+
+    def assertNoFullScans(self, client, url):
+        response_cache.invalidate()
+        status, statements = capture_selects(client, url)
+        self.assertEqual(status, 200, url)
+        self.assertTrue(statements, url)
+        for sql, params in statements:
+            plan = explain(sql, params)
+            self.assertFalse(full_scans(plan), f'{url}\n  {sql}\n    ' + '\n    '.join(plan))
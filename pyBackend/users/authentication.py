@@ -0,0 +1,82 @@
+import copy
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from products.cache import LRUBackend
+from .models import User
+
+
+USER_CLAIMS = ('email', 'name', 'role', 'is_active')
+
+# Per-process cache of authenticated users, keyed by user id
+user_cache = LRUBackend(max_entries=10000)
+
+
+def invalidate_cached_user(user_id):
+    user_cache.delete(str(user_id))
+
+
+class UserClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens also carry the user's email, name,
+    role and is_active flag"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        options = settings.JWT_USER_RESOLUTION
+        if options['USER_FROM_CLAIMS']:
+            # The claims are trusted until the token expires
+            access.set_exp(lifetime=options['CLAIMS_ACCESS_TOKEN_LIFETIME'])
+        return access
+
+
+def user_from_claims(validated_token):
+    """Build a User from the token claims without querying the users table"""
+    user = User(
+        id=int(validated_token[api_settings.USER_ID_CLAIM]),
+        **{claim: validated_token[claim] for claim in USER_CLAIMS}
+    )
+    user._state.adding = False
+    user.from_token = True
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that avoids loading the user row on every request.
+
+    See settings.JWT_USER_RESOLUTION: users come either straight from the
+    token claims, or from a short-TTL per-process cache in front of the
+    usual lookup by id.
+    """
+
+    def get_user(self, validated_token):
+        options = settings.JWT_USER_RESOLUTION
+
+        if options['USER_FROM_CLAIMS'] and all(claim in validated_token for claim in USER_CLAIMS):
+            user = user_from_claims(validated_token)
+            if not user.is_active:
+                raise AuthenticationFailed('User is inactive', code='user_inactive')
+            return user
+
+        ttl = options['USER_CACHE_TTL']
+        if not ttl:
+            return super().get_user(validated_token)
+
+        user_id = str(validated_token.get(api_settings.USER_ID_CLAIM))
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user, ttl)
+        # Each request gets its own copy so views can't mutate the cached one
+        return copy.copy(user)
@@ -1,18 +1,44 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.core.exceptions import PermissionDenied
+from .hashing import hashing_pool
 
 User = get_user_model()
 
 
 class EmailBackend(ModelBackend):
+    """Email logins, hashed in the hashing pool.
+
+    A failed email login raises PermissionDenied, which stops authenticate()
+    there: ModelBackend would otherwise check the same password again,
+    inline in the request worker. Logins without an email (the Django
+    admin's username form) still fall through to ModelBackend.
+    """
+
     def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
         try:
             user = User.objects.get(email=email)
-            if user.check_password(password):
-                return user
         except User.DoesNotExist:
-            return None
-        return None
+            # Hash anyway so response time doesn't reveal which emails exist
+            hashing_pool.check_dummy_password(password)
+            raise PermissionDenied
+        if hashing_pool.check_password(password, user.password):
+            self._upgrade_hash(user, password)
+            return user
+        raise PermissionDenied
+
+    def _upgrade_hash(self, user, password):
+        """Re-hash when the hasher or its iteration count changed, like User.check_password"""
+        try:
+            must_update = identify_hasher(user.password).must_update(user.password)
+        except ValueError:
+            return
+        if must_update:
+            user.password = hashing_pool.make_password(password)
+            user.save(update_fields=['password'])
 
     def get_user(self, user_id):
         try:
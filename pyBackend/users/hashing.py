@@ -0,0 +1,99 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full; the caller should answer 503"""
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def _check_password(password, encoded):
+    return hashers.check_password(password, encoded)
+
+
+def _make_password(password):
+    return hashers.make_password(password)
+
+
+class HashingPool:
+    """Bounded process pool for password hashing.
+
+    PBKDF2 is CPU-bound, so running it in the request worker lets a burst of
+    logins starve every other request. Hashes run in WORKERS processes
+    instead, and at most MAX_QUEUE hashes may be queued or running; further
+    callers get HashingBusy straight away. With WORKERS = 0 hashing runs
+    inline but the queue limit still applies.
+    """
+
+    def __init__(self, workers=2, max_queue=16, timeout=10):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._dummy_hash = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'ecommerce_api.settings'),),
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy('Too many password checks in progress')
+        try:
+            if not self.workers:
+                return fn(*args)
+            future = self._get_executor().submit(fn, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except FuturesTimeout:
+                future.cancel()
+                raise HashingBusy('Password check timed out')
+        finally:
+            self._slots.release()
+
+    def check_password(self, password, encoded):
+        return self._run(_check_password, password, encoded)
+
+    def make_password(self, password):
+        return self._run(_make_password, password)
+
+    def check_dummy_password(self, password):
+        """Spend the same time as a real check, for emails that don't exist"""
+        if self._dummy_hash is None:
+            self._dummy_hash = self.make_password(os.urandom(16).hex())
+        self.check_password(password, self._dummy_hash)
+        return False
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def build_hashing_pool():
+    options = getattr(settings, 'PASSWORD_HASHING', {})
+    return HashingPool(
+        workers=options.get('WORKERS', 2),
+        max_queue=options.get('MAX_QUEUE', 16),
+        timeout=options.get('TIMEOUT', 10),
+    )
+
+
+hashing_pool = build_hashing_pool()
@@ -48,6 +48,22 @@ class User(AbstractBaseUser, PermissionsMixin):
         db_table = 'users'
         ordering = ['-created_at']
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        super().save(*args, **kwargs)
+        from .authentication import invalidate_cached_user
+        invalidate_cached_user(self.pk)
+        if not adding and (update_fields is None or {'email', 'name'} & set(update_fields)):
+            # Orders keep a copy of the customer's email and name
+            from orders.summary import sync_customer
+            sync_customer(self)
+
+    def delete(self, *args, **kwargs):
+        from .authentication import invalidate_cached_user
+        invalidate_cached_user(self.pk)
+        return super().delete(*args, **kwargs)
+
     def __str__(self):
         return self.email
 
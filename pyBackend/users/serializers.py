@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import User, ShippingAddress
 from django.contrib.auth.password_validation import validate_password
+from .hashing import hashing_pool
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -18,11 +19,13 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         fields = ['email', 'name', 'password']
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            email=validated_data['email'],
+        user = User(
+            email=User.objects.normalize_email(validated_data['email']),
             name=validated_data['name'],
-            password=validated_data['password']
         )
+        # Hash in the hashing pool rather than in the request worker
+        user.password = hashing_pool.make_password(validated_data['password'])
+        user.save()
         return user
 
 
@@ -1,3 +1,69 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .authentication import UserClaimsRefreshToken
+from .models import User
+
+
+class LoginHashingTests(TestCase):
+    """Login password checks run in the hashing pool, never in the request
+    process, including the failed ones"""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(email='user@example.com', name='User', password='Right@12345')
+
+    def setUp(self):
+        # The login throttles count attempts in the default cache
+        cache.clear()
+
+    def login(self, email, password):
+        encode = mock.patch.object(PBKDF2PasswordHasher, 'encode', autospec=True, side_effect=PBKDF2PasswordHasher.encode)
+        verify = mock.patch.object(PBKDF2PasswordHasher, 'verify', autospec=True, side_effect=PBKDF2PasswordHasher.verify)
+        with encode as encoded, verify as verified:
+            response = APIClient().post('/api/auth/login', {'email': email, 'password': password}, format='json')
+        self.assertEqual(encoded.call_count + verified.call_count, 0, 'hashed in the request process')
+        return response
+
+    def test_wrong_password(self):
+        self.assertEqual(self.login('user@example.com', 'Wrong@12345').status_code, 401)
+
+    def test_unknown_email(self):
+        self.assertEqual(self.login('nobody@example.com', 'Wrong@12345').status_code, 401)
+
+    def test_right_password(self):
+        response = self.login('user@example.com', 'Right@12345')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['email'], 'user@example.com')
+
+
+@override_settings(JWT_USER_RESOLUTION={**settings.JWT_USER_RESOLUTION, 'USER_FROM_CLAIMS': True})
+class ClaimsAuthenticationTests(TestCase):
+    """With USER_FROM_CLAIMS the user comes from a shorter-lived access token"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', name='User', password='x')
+
+    def get_profile(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client.get('/api/auth/profile/')
+
+    def test_access_token_lifetime(self):
+        access = UserClaimsRefreshToken.for_user(self.user).access_token
+        lifetime = settings.JWT_USER_RESOLUTION['CLAIMS_ACCESS_TOKEN_LIFETIME']
+        self.assertEqual(access['exp'] - access['iat'], lifetime.total_seconds())
+        self.assertLess(lifetime, settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'])
+        self.assertIs(access['is_active'], True)
+        self.assertEqual(self.get_profile(access).status_code, 200)
+
+    def test_inactive(self):
+        self.user.is_active = False
+        access = UserClaimsRefreshToken.for_user(self.user).access_token
+        self.assertEqual(self.get_profile(access).status_code, 401)
@@ -1,20 +1,32 @@
 from rest_framework import status, generics
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from .models import User
 from .serializers import UserSerializer, UserRegistrationSerializer
+from .authentication import UserClaimsRefreshToken
+from .hashing import HashingBusy
+from .throttling import LoginIPThrottle, LoginEmailThrottle
+
+
+def server_busy():
+    response = Response({'message': 'Server busy, please try again'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = '1'
+    return response
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle])
 def register(request):
     serializer = UserRegistrationSerializer(data=request.data)
     if serializer.is_valid():
-        user = serializer.save()
-        refresh = RefreshToken.for_user(user)
+        try:
+            user = serializer.save()
+        except HashingBusy:
+            return server_busy()
+        refresh = UserClaimsRefreshToken.for_user(user)
         user_data = UserSerializer(user).data
         
         return Response({
@@ -34,6 +46,7 @@ def register(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginEmailThrottle])
 def login(request):
     email = request.data.get('email')
     password = request.data.get('password')
@@ -41,10 +54,13 @@ def login(request):
     if not email or not password:
         return Response({'message': 'Email and password are required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    user = authenticate(request, email=email, password=password)
+    try:
+        user = authenticate(request, email=email, password=password)
+    except HashingBusy:
+        return server_busy()
     
     if user is not None:
-        refresh = RefreshToken.for_user(user)
+        refresh = UserClaimsRefreshToken.for_user(user)
         user_data = UserSerializer(user).data
         
         return Response({
@@ -59,12 +75,16 @@ def login(request):
 @permission_classes([IsAuthenticated])
 def get_profile(request):
     user = request.user
+    if getattr(user, 'from_token', False):
+        # Claims-only users don't carry every profile field
+        user = User.objects.get(pk=user.pk)
     serializer = UserSerializer(user)
     return Response(serializer.data)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginEmailThrottle])
 def admin_login(request):
     email = request.data.get('email')
     password = request.data.get('password')
@@ -72,10 +92,13 @@ def admin_login(request):
     if not email or not password:
         return Response({'message': 'Email and password are required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    user = authenticate(request, email=email, password=password)
+    try:
+        user = authenticate(request, email=email, password=password)
+    except HashingBusy:
+        return server_busy()
     
     if user is not None and user.role == 'admin':
-        refresh = RefreshToken.for_user(user)
+        refresh = UserClaimsRefreshToken.for_user(user)
         user_data = UserSerializer(user).data
         
         return Response({